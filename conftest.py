@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_files(settings, tmp_path):
+    """Загрузки и задачи миниатюр из тестов не попадают в дерево проекта."""
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.THUMBNAIL_QUEUE_DIR = str(tmp_path / "thumbnail_queue")
@@ -0,0 +1,23 @@
+import os
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+    django.setup()
+
+
+def percentile(values, fraction):
+    """Перцентиль с линейной интерполяцией.
+
+    Совпадает с statistics.quantiles(method="inclusive"), которого нет
+    в Python 3.7 из матрицы CI.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
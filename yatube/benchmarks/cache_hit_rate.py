@@ -0,0 +1,81 @@
+"""Доля попаданий в кэш страниц при N процессах-воркерах.
+
+Каждый воркер обслуживает поток запросов к страницам с распределением,
+близким к Zipf: несколько популярных страниц и длинный хвост. Промах
+означает рендер страницы и запись в кэш. Сравниваются LocMemCache в
+каждом процессе и общий кэш на локальном сервере с протоколом Redis.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.cache_hit_rate --workers 4 --requests 5000
+"""
+import argparse
+import multiprocessing
+import random
+
+from . import setup
+
+PAGES: int = 500
+TIMEOUT: int = 60
+
+
+def make_cache(kind, location):
+    from django.core.cache.backends.locmem import LocMemCache
+
+    from core.cache.backends import RedisCache
+
+    if kind == "shared":
+        return RedisCache(location, {"TIMEOUT": TIMEOUT})
+    return LocMemCache(f"bench-{kind}", {"TIMEOUT": TIMEOUT})
+
+
+def work(args):
+    kind, location, requests, seed = args
+    setup()
+    cache = make_cache(kind, location)
+    generator = random.Random(seed)
+    weights = [1 / rank for rank in range(1, PAGES + 1)]
+    pages = generator.choices(range(PAGES), weights, k=requests)
+    hits = 0
+    for page in pages:
+        key = f"page:{page}"
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, "<html>" + "x" * 2048)
+    return hits
+
+
+def measure(kind, location, workers, requests):
+    make_cache(kind, location).clear()
+    jobs = [(kind, location, requests, seed) for seed in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        hits = sum(pool.map(work, jobs))
+    return hits / (workers * requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=5000)
+    options = parser.parse_args()
+
+    setup()
+    from core.cache.server import CacheServer
+
+    server = CacheServer(("127.0.0.1", 0))
+    server.start_in_thread()
+    try:
+        for workers in sorted({1, options.workers}):
+            for kind in ("locmem", "shared"):
+                rate = measure(
+                    kind, server.location, workers, options.requests
+                )
+                print(f"{kind:>7} workers={workers:<3} hit rate={rate:.1%}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
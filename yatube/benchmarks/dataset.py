@@ -0,0 +1,99 @@
+"""Синтетический набор данных для бенчмарков представлений.
+
+Тексты генерирует Faker, группы — mixer, а основной объём (посты,
+комментарии, подписки) идёт потоком записей через posts.importer —
+тем же путём, что и `manage.py import_yatube`, поэтому счётчики,
+поисковый индекс и ленты подписок после генерации согласованы.
+
+Распределения скошены, как на живом сайте: авторство постов и выбор
+авторов для подписки подчиняются закону Ципфа (несколько очень
+популярных авторов и длинный хвост), комментарии тяготеют к свежим
+постам.
+"""
+import random
+from datetime import timedelta
+
+ZIPF_EXPONENT: float = 1.1
+HISTORY_DAYS: int = 3 * 365
+GROUPS: int = 50
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def records(users, posts, comments, follows_per_user, group_slugs, seed):
+    """Записи в формате export_yatube для Importer.run()."""
+    from django.utils import timezone
+    from faker import Faker
+
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    generator = random.Random(seed)
+    usernames = [f"user{index}" for index in range(users)]
+    weights = zipf_weights(users)
+
+    start = timezone.now() - timedelta(days=HISTORY_DAYS)
+    step = HISTORY_DAYS * 24 * 60 * 60 / max(posts, 1)
+    for post_id in range(1, posts + 1):
+        yield {
+            "model": "posts",
+            "id": post_id,
+            "author": generator.choices(usernames, weights)[0],
+            "group": (
+                generator.choice(group_slugs)
+                if generator.random() < 0.6
+                else None
+            ),
+            "text": fake.paragraph(nb_sentences=3),
+            "pub_date": (
+                start + timedelta(seconds=post_id * step)
+            ).isoformat(),
+            "image": "",
+        }
+
+    for comment_id in range(1, comments + 1):
+        age = int(generator.expovariate(20 / max(posts, 1)))
+        yield {
+            "model": "comments",
+            "id": comment_id,
+            "post": max(1, posts - age),
+            "author": generator.choice(usernames),
+            "text": fake.sentence(),
+            "created": timezone.now().isoformat(),
+        }
+
+    follow_id = 0
+    for username in usernames:
+        count = int(generator.expovariate(1 / follows_per_user)) + 1
+        authors = set(generator.choices(usernames, weights, k=count))
+        for author in sorted(authors - {username}):
+            follow_id += 1
+            yield {
+                "model": "follows",
+                "id": follow_id,
+                "user": username,
+                "author": author,
+            }
+
+
+def generate(users, posts, comments, follows_per_user, seed=0, report=None):
+    from mixer.backend.django import mixer
+
+    from posts.importer import Importer
+    from posts.models import Group
+
+    groups = mixer.cycle(GROUPS).blend(
+        Group, slug=mixer.sequence("bench-group-{0}")
+    )
+    importer = Importer(batch_size=1000, report=report)
+    importer.run(
+        records(
+            users,
+            posts,
+            comments,
+            follows_per_user,
+            [group.slug for group in groups],
+            seed,
+        )
+    )
@@ -0,0 +1,127 @@
+"""Запросы в секунду с пулом соединений к БД и без него.
+
+Несколько потоков (--threads) гоняют через тестовый клиент Django
+post_detail от вошедших пользователей: сессия, пост и комментарии —
+несколько быстрых запросов к БД, где доля подключения заметна. После
+каждого запроса Django закрывает «старые» соединения, как в бою.
+
+Варианты:
+
+- connect — django.db.backends.sqlite3 с CONN_MAX_AGE = 0: новое
+  соединение на каждый запрос;
+- persistent — то же с CONN_MAX_AGE = 60: соединение живёт в потоке;
+- pool — core.db.backends.sqlite3: соединения возвращаются в пул.
+
+Для пула выводится и медиана ожидания соединения из пула.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.db_pool --database /tmp/bench.sqlite3
+"""
+import argparse
+import os
+import threading
+import time
+
+from . import setup
+
+VARIANTS: dict = {
+    "connect": ("django.db.backends.sqlite3", 0),
+    "persistent": ("django.db.backends.sqlite3", 60),
+    "pool": ("core.db.backends.sqlite3", 0),
+}
+
+
+def prepare(clients):
+    from django.core.management import call_command
+    from django.test import Client
+
+    from posts.models import Post, User
+
+    from .dataset import generate
+
+    call_command("migrate", verbosity=0)
+    if not Post.objects.exists():
+        generate(200, 2000, 1000, 5)
+    post_ids = list(Post.objects.values_list("pk", flat=True)[:500])
+    logged_in = []
+    for user in User.objects.order_by("pk")[:clients]:
+        client = Client()
+        client.force_login(user)
+        logged_in.append(client)
+    return logged_in, post_ids
+
+
+def work(client, post_ids, requests, errors):
+    from django.db import connections
+
+    for index in range(requests):
+        post_id = post_ids[index % len(post_ids)]
+        response = client.get(f"/posts/{post_id}/")
+        if response.status_code != 200:
+            errors.append(response.status_code)
+    connections.close_all()
+
+
+def measure(engine, max_age, clients, post_ids, requests):
+    from django.db import connections
+
+    connections.close_all()
+    connections.databases["default"].update(
+        ENGINE=engine, CONN_MAX_AGE=max_age
+    )
+    errors = []
+    threads = [
+        threading.Thread(
+            target=work, args=(client, post_ids, requests, errors)
+        )
+        for client in clients
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(clients) * requests / elapsed, len(errors)
+
+
+def pool_wait_ms():
+    from core.metrics.store import collect
+
+    values = collect()
+    count = values.get(
+        'yatube_db_pool_wait_seconds_count{alias="default"}', 0
+    )
+    total = values.get('yatube_db_pool_wait_seconds_sum{alias="default"}', 0)
+    return total / count * 1000 if count else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    options = parser.parse_args()
+
+    os.environ["YATUBE_DB_PATH"] = os.path.abspath(options.database)
+    setup()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    settings.DEBUG = False
+    setup_test_environment()
+    clients, post_ids = prepare(options.threads)
+
+    for name, (engine, max_age) in VARIANTS.items():
+        rate, errors = measure(
+            engine, max_age, clients, post_ids, options.requests
+        )
+        line = f"{name:>10} {rate:8.1f} запросов/с errors={errors}"
+        if name == "pool":
+            line += f" ожидание пула {pool_wait_ms():.3f}ms в среднем"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
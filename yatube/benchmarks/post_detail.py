@@ -0,0 +1,129 @@
+"""Задержка и число запросов страницы поста: прежний путь и PostDetail.
+
+«naive» повторяет прежний post_detail: пост без select_related и все
+комментарии поста, авторы которых подгружаются по одному при рендере.
+«loader» — posts.read_models.PostDetail: два запроса при любом числе
+комментариев. Оба варианта рендерят posts/post_detail.html.
+
+Замеры идут на «горячем» посте с --hot-comments комментариями
+(недостающие досоздаются) и на случайных постах набора данных.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.post_detail --database /tmp/bench.sqlite3
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from . import percentile, setup
+
+
+def naive_context(post_id):
+    from django.shortcuts import get_object_or_404
+
+    from posts.models import Post
+
+    post = get_object_or_404(Post, pk=post_id)
+    return {"post": post, "comments": post.comments.all(), "order": "new"}
+
+
+def loader_context(post_id):
+    from posts.read_models import PostDetail
+
+    return PostDetail.load(post_id, "new").context()
+
+
+VARIANTS: dict = {"naive": naive_context, "loader": loader_context}
+
+
+def prepare(hot_comments):
+    from django.core.management import call_command
+    from django.db.models import F
+
+    from posts.models import Comment, Post, User
+
+    from .dataset import generate
+
+    call_command("migrate", verbosity=0)
+    if not Post.objects.exists():
+        generate(200, 2000, 1000, 5)
+    hot = Post.objects.order_by("-comments_count").first()
+    missing = hot_comments - hot.comments_count
+    if missing > 0:
+        authors = list(User.objects.values_list("pk", flat=True)[:200])
+        Comment.objects.bulk_create(
+            Comment(
+                post=hot,
+                author_id=authors[index % len(authors)],
+                text=f"Комментарий {index}",
+            )
+            for index in range(missing)
+        )
+        Post.objects.filter(pk=hot.pk).update(
+            comments_count=F("comments_count") + missing
+        )
+    return hot.pk, list(Post.objects.values_list("pk", flat=True))
+
+
+def measure(make_context, post_ids, requests):
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import connection
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from core.metrics.middleware import QueryTimer
+    from posts.forms import CommentForm
+
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    latencies, queries = [], []
+    for index in range(requests):
+        post_id = post_ids[index % len(post_ids)]
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            context = {**make_context(post_id), "form": CommentForm()}
+            render_to_string("posts/post_detail.html", context, request)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(timer.count)
+    return (
+        statistics.median(latencies),
+        percentile(latencies, 0.99),
+        max(queries),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--hot-comments", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+
+    os.environ["YATUBE_DB_PATH"] = os.path.abspath(options.database)
+    setup()
+    from django.conf import settings
+
+    # Без DEBUG не включается debug_toolbar и не копится лог SQL.
+    settings.DEBUG = False
+    hot_id, post_ids = prepare(options.hot_comments)
+    generator = random.Random(options.seed)
+    workloads = {
+        "hot": [hot_id],
+        "random": generator.sample(post_ids, min(len(post_ids), 500)),
+    }
+    for workload, ids in workloads.items():
+        for name, make_context in VARIANTS.items():
+            p50, p99, queries = measure(make_context, ids, options.requests)
+            print(
+                f"{workload:>6} {name:>6} p50={p50:8.2f}ms "
+                f"p99={p99:8.2f}ms queries={queries}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Время до первого ответа нового процесса с yatube.wsgi.application.
+
+Для каждого профиля настроек бенчмарк --runs раз запускает чистый
+интерпретатор, который импортирует yatube.wsgi и отдаёт один запрос
+(--path) напрямую через WSGI. Меряются запуск процесса целиком, импорт
+приложения с django.setup() и сам первый запрос; выводятся медианы.
+Если медиана полного времени профиля production больше --ceiling-ms,
+запуск завершается с кодом 1.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.startup --database /tmp/bench.sqlite3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from . import setup
+
+PROFILES: tuple = ("development", "production")
+PROJECT_DIR: str = os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+
+CHILD: str = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {project_dir!r})
+from yatube.wsgi import application
+loaded = time.perf_counter()
+statuses = []
+environ = {{
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": {path!r},
+    "QUERY_STRING": "",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80",
+    "HTTP_HOST": "localhost",
+    "wsgi.url_scheme": "http",
+    "wsgi.input": sys.stdin.buffer,
+    "wsgi.errors": sys.stderr,
+}}
+b"".join(application(environ, lambda status, headers: statuses.append(status)))
+print(json.dumps({{
+    "import_ms": (loaded - started) * 1000,
+    "request_ms": (time.perf_counter() - loaded) * 1000,
+    "status": statuses[0],
+}}))
+"""
+
+
+def run(profile, path, database):
+    environ = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=f"yatube.settings.{profile}",
+        YATUBE_DB_PATH=database,
+        YATUBE_SECRET_KEY=os.getenv("YATUBE_SECRET_KEY", "startup-benchmark"),
+    )
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            CHILD.format(project_dir=PROJECT_DIR, path=path),
+        ],
+        env=environ,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    result = json.loads(completed.stdout.splitlines()[-1])
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def measure(profile, path, database, runs):
+    results = [run(profile, path, database) for _ in range(runs)]
+    summary = {
+        metric: round(statistics.median(row[metric] for row in results), 1)
+        for metric in ("total_ms", "import_ms", "request_ms")
+    }
+    summary["status"] = results[-1]["status"]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--profile", action="append", choices=PROFILES, dest="profiles"
+    )
+    parser.add_argument("--ceiling-ms", type=float, default=1500)
+    options = parser.parse_args()
+
+    database = os.path.abspath(options.database)
+    os.environ["YATUBE_DB_PATH"] = database
+    setup()
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+    results = {}
+    for profile in options.profiles or PROFILES:
+        results[profile] = row = measure(
+            profile, options.path, database, options.runs
+        )
+        print(
+            f"{profile:>11} total={row['total_ms']:8.1f}ms "
+            f"import={row['import_ms']:8.1f}ms "
+            f"first_request={row['request_ms']:8.1f}ms "
+            f"status={row['status']}"
+        )
+
+    production = results.get("production")
+    if production and production["total_ms"] > options.ceiling_ms:
+        print(
+            f"ПРЕВЫШЕН ПОТОЛОК: {production['total_ms']}ms "
+            f"> {options.ceiling_ms}ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Время рендера posts/index.html с 10 карточками при разных загрузчиках.
+
+Сравниваются:
+
+- filesystem — загрузчики без кэша, как было при DEBUG: каждый
+  рендер заново читает и разбирает base.html, card.html, paginator.html
+  и остальные шаблоны;
+- debug — core.template_loader.Loader при DEBUG: шаблоны из памяти,
+  перед выдачей сверяется mtime файла;
+- production — тот же загрузчик без DEBUG и без проверки mtime.
+
+Кэш фрагментов карточек отключён (DummyCache), чтобы каждый рендер
+включал все 10 card.html. Посты собираются в памяти, база не нужна.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.templates --renders 500
+"""
+import argparse
+import json
+import statistics
+import time
+
+from . import percentile, setup
+
+CARDS: int = 10
+BASE_LOADERS: list = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+VARIANTS: dict = {
+    "filesystem": (BASE_LOADERS, True),
+    "debug": ([("core.template_loader.Loader", BASE_LOADERS)], True),
+    "production": ([("core.template_loader.Loader", BASE_LOADERS)], False),
+}
+
+
+def make_page():
+    from django.core.paginator import Paginator
+    from django.utils import timezone
+
+    from posts.constants import CARD_THUMBNAIL, IMAGE_VARIANTS
+    from posts.models import Group, Post, User
+
+    group = Group(pk=1, title="Группа", slug="group")
+    now = timezone.now()
+    thumbnails = json.dumps(
+        {
+            CARD_THUMBNAIL: {
+                "url": "/media/cache/card.jpg",
+                "width": 960,
+                "height": 339,
+            },
+            IMAGE_VARIANTS: {
+                "image/webp": [
+                    {"url": f"/media/posts/card-{width}w.webp", "width": width}
+                    for width in (320, 640, 960)
+                ],
+            },
+        }
+    )
+    posts = [
+        Post(
+            pk=index,
+            text="Текст поста " * 20,
+            author=User(
+                pk=index, username=f"author{index}", first_name="Автор"
+            ),
+            group=group,
+            pub_date=now,
+            updated_at=now,
+            image="posts/card.jpg",
+            thumbnails=thumbnails,
+        )
+        for index in range(1, CARDS + 1)
+    ]
+    return Paginator(posts, CARDS).page(1)
+
+
+def measure(loaders, debug, renders):
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory, override_settings
+
+    templates = [
+        {
+            **settings.TEMPLATES[0],
+            "OPTIONS": {
+                **settings.TEMPLATES[0]["OPTIONS"],
+                "loaders": loaders,
+                "debug": debug,
+            },
+        }
+    ]
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    context = {"page_obj": make_page(), "to_show_groups": True}
+    timings = []
+    with override_settings(TEMPLATES=templates):
+        render_to_string("posts/index.html", context, request)
+        for _ in range(renders):
+            started = time.perf_counter()
+            render_to_string("posts/index.html", context, request)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), percentile(timings, 0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=500)
+    options = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    dummy_cache = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        }
+    }
+    with override_settings(CACHES=dummy_cache):
+        for name, (loaders, debug) in VARIANTS.items():
+            p50, p99 = measure(loaders, debug, options.renders)
+            print(f"{name:>11} p50={p50:7.3f}ms p99={p99:7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Задержка, число запросов к БД и аллокации представлений posts.
+
+Бенчмарк работает с отдельной базой (--database), при первом запуске
+мигрирует её и заполняет синтетическим набором данных
+(benchmarks.dataset), затем гоняет через тестовый клиент Django
+index, group_posts, profile, post_detail, follow_index, add_comment и
+post_create. Запросы на запись выполняются в транзакции с откатом,
+поэтому набор данных между запусками не меняется.
+
+Для каждого сценария выводятся p50/p99 задержки, максимум запросов к
+БД на запрос и медиана пиковых аллокаций (tracemalloc, отдельным
+проходом). С --save-baseline результат пишется в JSON, с --baseline
+сравнивается с ним: рост задержки или аллокаций больше --tolerance
+либо любой рост числа запросов завершает запуск с кодом 1.
+
+Запуск из каталога yatube/:
+
+    python -m benchmarks.views --database /tmp/bench.sqlite3 \\
+        --save-baseline benchmarks/baseline.json
+    python -m benchmarks.views --database /tmp/bench.sqlite3 \\
+        --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from . import percentile, setup
+
+SCENARIOS: tuple = (
+    "index",
+    "group_posts",
+    "profile",
+    "post_detail",
+    "follow_index",
+    "add_comment",
+    "post_create",
+)
+WRITES: frozenset = frozenset(("add_comment", "post_create"))
+SAMPLE_SIZE: int = 1000
+READERS: int = 20
+
+
+class Workload:
+    """Выборки объектов, к которым обращаются сценарии."""
+
+    def __init__(self, generator):
+        from django.test import Client
+        from django.urls import reverse
+        from mixer.backend.django import mixer
+
+        from posts.models import Group, Post, User
+
+        self.generator = generator
+        self.reverse = reverse
+        self.group_slugs = list(
+            Group.objects.values_list("slug", flat=True)[:SAMPLE_SIZE]
+        )
+        popular = list(
+            User.objects.filter(counters__posts_count__gt=0)
+            .order_by("-counters__posts_count")
+            .values_list("username", "counters__posts_count")[:SAMPLE_SIZE]
+        )
+        self.authors = [username for username, _ in popular]
+        self.author_weights = [count for _, count in popular]
+        self.last_post_id = Post.objects.order_by("-pk").values_list(
+            "pk", flat=True
+        ).first()
+        self.readers = []
+        for user in User.objects.filter(
+            counters__following_count__gt=0
+        ).order_by("?")[:READERS]:
+            client = Client()
+            client.force_login(user)
+            self.readers.append(client)
+        self.writer = Client()
+        self.writer.force_login(
+            User.objects.filter(username="bench-writer").first()
+            or mixer.blend(User, username="bench-writer")
+        )
+        self.anonymous = Client()
+
+    def post_id(self):
+        # Свежие посты читают чаще старых.
+        age = int(self.generator.expovariate(20 / self.last_post_id))
+        return max(1, self.last_post_id - age)
+
+    def request(self, scenario):
+        """(клиент, метод, url, данные) для очередного запроса."""
+        choose = self.generator.choice
+        if scenario == "index":
+            return self.anonymous, "get", self.reverse("posts:index"), None
+        if scenario == "group_posts":
+            slug = choose(self.group_slugs)
+            return (
+                self.anonymous,
+                "get",
+                self.reverse("posts:group_list", args=[slug]),
+                None,
+            )
+        if scenario == "profile":
+            username = self.generator.choices(
+                self.authors, self.author_weights
+            )[0]
+            return (
+                self.anonymous,
+                "get",
+                self.reverse("posts:profile", args=[username]),
+                None,
+            )
+        if scenario == "post_detail":
+            return (
+                choose(self.readers),
+                "get",
+                self.reverse("posts:post_detail", args=[self.post_id()]),
+                None,
+            )
+        if scenario == "follow_index":
+            return (
+                choose(self.readers),
+                "get",
+                self.reverse("posts:follow_index"),
+                None,
+            )
+        if scenario == "add_comment":
+            return (
+                self.writer,
+                "post",
+                self.reverse("posts:add_comment", args=[self.post_id()]),
+                {"text": "Комментарий из бенчмарка"},
+            )
+        return (
+            self.writer,
+            "post",
+            self.reverse("posts:post_create"),
+            {"text": "Пост из бенчмарка", "group": ""},
+        )
+
+
+def send(workload, scenario):
+    from django.db import transaction
+
+    client, method, url, data = workload.request(scenario)
+    if scenario not in WRITES:
+        return getattr(client, method)(url, data)
+    with transaction.atomic():
+        response = getattr(client, method)(url, data)
+        transaction.set_rollback(True)
+    return response
+
+
+def measure(workload, scenario, requests, alloc_samples):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries, errors = [], [], 0
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(workload, scenario)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        errors += response.status_code >= 400
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_samples):
+            # clear_traces сбрасывает и пик; reset_peak есть только с 3.9.
+            tracemalloc.clear_traces()
+            baseline = tracemalloc.get_traced_memory()[0]
+            send(workload, scenario)
+            allocations.append(
+                (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+            )
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "queries": max(queries),
+        "alloc_kib": round(statistics.median(allocations or [0]), 1),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    for scenario, expected in baseline.items():
+        actual = results.get(scenario)
+        if actual is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "alloc_kib"):
+            if actual[metric] > expected[metric] * (1 + tolerance):
+                yield scenario, metric, expected[metric], actual[metric]
+        if actual["queries"] > expected["queries"]:
+            yield scenario, "queries", expected["queries"], actual["queries"]
+        if actual["errors"] > expected["errors"]:
+            yield scenario, "errors", expected["errors"], actual["errors"]
+
+
+def prepare(options):
+    from django.core.management import call_command
+
+    from posts.models import Post
+
+    from .dataset import generate
+
+    call_command("migrate", verbosity=0)
+    if Post.objects.exists():
+        return
+    print(
+        f"Генерация: {options.users} пользователей, {options.posts} постов",
+        file=sys.stderr,
+    )
+    generate(
+        options.users,
+        options.posts,
+        options.comments,
+        options.follows,
+        seed=options.seed,
+        report=lambda name, total, rate: print(
+            f"{name}: {total} строк, {rate:.0f} строк/с",
+            end="\r",
+            file=sys.stderr,
+        ),
+    )
+    print(file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--comments", type=int, default=300_000)
+    parser.add_argument("--follows", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, dest="scenarios"
+    )
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    options = parser.parse_args()
+
+    os.environ["YATUBE_DB_PATH"] = os.path.abspath(options.database)
+    setup()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    # Без DEBUG не включается debug_toolbar и не копится лог SQL.
+    settings.DEBUG = False
+    setup_test_environment()
+    prepare(options)
+
+    workload = Workload(random.Random(options.seed))
+    results = {}
+    for scenario in options.scenarios or SCENARIOS:
+        results[scenario] = measure(
+            workload, scenario, options.requests, options.alloc_samples
+        )
+        row = results[scenario]
+        print(
+            f"{scenario:>13} p50={row['p50_ms']:8.2f}ms "
+            f"p99={row['p99_ms']:8.2f}ms queries={row['queries']:<3} "
+            f"alloc={row['alloc_kib']:8.1f}KiB errors={row['errors']}"
+        )
+
+    if options.save_baseline:
+        with open(options.save_baseline, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as source:
+            baseline = json.load(source)
+        failed = list(regressions(results, baseline, options.tolerance))
+        for scenario, metric, expected, actual in failed:
+            print(f"РЕГРЕССИЯ {scenario}.{metric}: {expected} -> {actual}")
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import pickle
+import threading
+from urllib.parse import urlparse
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .resp import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(location, options):
+    url = urlparse(location if "://" in location else f"redis://{location}")
+    db = int(url.path.lstrip("/") or 0)
+    key = (url.hostname, url.port or 6379, db)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                *key,
+                max_connections=options.get("MAX_CONNECTIONS", 50),
+                timeout=options.get("SOCKET_TIMEOUT", 5),
+                wait=options.get("POOL_WAIT", 5),
+            )
+        return _pools[key]
+
+
+def dumps(value):
+    if type(value) is int:
+        return str(value).encode()
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data):
+    if data is None:
+        return None
+    try:
+        return int(data)
+    except ValueError:
+        return pickle.loads(data)
+
+
+class RedisCache(BaseCache):
+    """Общий для всех процессов кэш поверх протокола Redis (RESP).
+
+    Работает и с настоящим Redis, и с локальной заменой из
+    core.cache.server. Целые числа хранятся как есть, чтобы incr()
+    выполнялся на сервере атомарно.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._pool = get_pool(server, params.get("OPTIONS", {}))
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def _timeout(self, timeout):
+        if timeout == DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
+
+    def _expiry(self, timeout):
+        timeout = self._timeout(timeout)
+        if timeout is None:
+            return ()
+        return ("PX", max(int(timeout * 1000), 1))
+
+    def _expired(self, timeout):
+        timeout = self._timeout(timeout)
+        return timeout is not None and timeout <= 0
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _execute(self, *args):
+        with self._pool.connection() as connection:
+            return connection.execute(*args)
+
+    def _pipeline(self, commands):
+        with self._pool.connection() as connection:
+            return connection.pipeline(commands)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        if self._expired(timeout):
+            return False
+        reply = self._execute(
+            "SET", key, dumps(value), *self._expiry(timeout), "NX"
+        )
+        return reply == "OK"
+
+    def get(self, key, default=None, version=None):
+        data = self._execute("GET", self._key(key, version))
+        return default if data is None else loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        if self._expired(timeout):
+            self._execute("DEL", key)
+            return
+        self._execute("SET", key, dumps(value), *self._expiry(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if not expiry:
+            return bool(self._execute("PERSIST", key)) or self.has_key(key)
+        return bool(self._execute("PEXPIRE", key, expiry[1]))
+
+    def delete(self, key, version=None):
+        self._execute("DEL", self._key(key, version))
+
+    def has_key(self, key, version=None):
+        return bool(self._execute("EXISTS", self._key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = [self._key(key, version) for key in keys]
+        values = self._execute("MGET", *made)
+        return {
+            key: loads(data)
+            for key, data in zip(keys, values)
+            if data is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        expiry = self._expiry(timeout)
+        self._pipeline(
+            [
+                ("SET", self._key(key, version), dumps(value), *expiry)
+                for key, value in data.items()
+            ]
+        )
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._execute("DEL", *keys)
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self._execute("EXISTS", key):
+            raise ValueError("Key '%s' not found" % key)
+        return self._execute("INCRBY", key, delta)
+
+    def clear(self):
+        self._execute("FLUSHDB")
+
+    def close(self, **kwargs):
+        # Соединения переиспользуются между запросами: закрывать их после
+        # каждого ответа значило бы отказаться от пула.
+        pass
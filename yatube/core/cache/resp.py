@@ -0,0 +1,159 @@
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+
+CRLF: bytes = b"\r\n"
+
+
+class ResponseError(Exception):
+    pass
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def encode_command(*args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(stream):
+    line = stream.readline()
+    if not line.endswith(CRLF):
+        raise ConnectionError("Соединение с кэшем закрыто")
+    prefix, rest = line[:1], line[1:-2]
+    if prefix == b"+":
+        return rest.decode()
+    if prefix == b"-":
+        raise ResponseError(rest.decode())
+    if prefix == b":":
+        return int(rest)
+    if prefix == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return stream.read(length + 2)[:-2]
+    if prefix == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise ResponseError(f"Неизвестный ответ: {line!r}")
+
+
+class Connection:
+    def __init__(self, host, port, db=0, timeout=None):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile("rb")
+        if db:
+            self.execute("SELECT", db)
+
+    def execute(self, *args):
+        self.sock.sendall(encode_command(*args))
+        return read_reply(self.stream)
+
+    def pipeline(self, commands):
+        """Отправляет команды одним пакетом и читает ответы по порядку."""
+        self.sock.sendall(
+            b"".join(encode_command(*command) for command in commands)
+        )
+        replies, error = [], None
+        for _ in commands:
+            # Ответы дочитываются и после ошибки, иначе следующая
+            # команда на этом соединении получила бы чужой ответ.
+            try:
+                replies.append(read_reply(self.stream))
+            except ResponseError as exc:
+                replies.append(None)
+                error = error or exc
+        if error is not None:
+            raise error
+        return replies
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+
+class ConnectionPool:
+    """Пул соединений одного процесса.
+
+    После fork (например, gunicorn с --preload) пул пересоздаётся, чтобы
+    дочерние процессы не делили сокеты родителя.
+    """
+
+    def __init__(
+        self, host, port, db=0, max_connections=50, timeout=5, wait=5
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.wait = wait
+        self.created = 0
+        self.waits = 0
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    def _acquire(self):
+        if self.pid != os.getpid():
+            self._reset()
+        if not self._slots.acquire(blocking=False):
+            self.waits += 1
+            if not self._slots.acquire(timeout=self.wait):
+                raise PoolTimeout("Нет свободных соединений с кэшем")
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            connection = Connection(
+                self.host, self.port, self.db, self.timeout
+            )
+        except OSError:
+            self._slots.release()
+            raise
+        self.created += 1
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Соединение на время блока; слот освобождается при любом исходе.
+
+        После ошибки сокета соединение закрывается, иначе — например,
+        после ResponseError, когда ответ уже прочитан целиком, —
+        возвращается в пул.
+        """
+        connection = self._acquire()
+        try:
+            yield connection
+        except OSError:
+            connection.close()
+            connection = None
+            raise
+        finally:
+            if connection is not None:
+                self._idle.put(connection)
+            self._slots.release()
+
+    def disconnect(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
@@ -0,0 +1,163 @@
+import socketserver
+import threading
+import time
+
+from .resp import ResponseError, read_reply
+
+
+class Store:
+    """Хранилище локального сервера: словарь с ленивым истечением."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.databases = {}
+
+    def db(self, number):
+        return self.databases.setdefault(number, {})
+
+    @staticmethod
+    def _alive(db, key):
+        item = db.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.monotonic():
+            del db[key]
+            return None
+        return item
+
+
+class Session:
+    def __init__(self, store):
+        self.store = store
+        self.number = 0
+
+    def execute(self, name, *args):
+        handler = getattr(self, f"cmd_{name.decode().lower()}", None)
+        if handler is None:
+            raise ResponseError(f"ERR unknown command '{name.decode()}'")
+        with self.store.lock:
+            return handler(self.store.db(self.number), *args)
+
+    def cmd_ping(self, db, *args):
+        return "PONG"
+
+    def cmd_select(self, db, number):
+        self.number = int(number)
+        return "OK"
+
+    def cmd_get(self, db, key):
+        item = Store._alive(db, key)
+        return None if item is None else item[0]
+
+    def cmd_mget(self, db, *keys):
+        return [self.cmd_get(db, key) for key in keys]
+
+    def cmd_set(self, db, key, value, *options):
+        options = [option.upper() for option in options]
+        expires = None
+        if b"PX" in options:
+            milliseconds = int(options[options.index(b"PX") + 1])
+            expires = time.monotonic() + milliseconds / 1000
+        if b"EX" in options:
+            seconds = int(options[options.index(b"EX") + 1])
+            expires = time.monotonic() + seconds
+        if b"NX" in options and Store._alive(db, key) is not None:
+            return None
+        db[key] = (value, expires)
+        return "OK"
+
+    def cmd_del(self, db, *keys):
+        return sum(db.pop(key, None) is not None for key in keys)
+
+    def cmd_exists(self, db, *keys):
+        return sum(Store._alive(db, key) is not None for key in keys)
+
+    def cmd_incrby(self, db, key, delta):
+        item = Store._alive(db, key)
+        value, expires = item if item else (b"0", None)
+        try:
+            value = int(value) + int(delta)
+        except ValueError:
+            raise ResponseError("ERR value is not an integer")
+        db[key] = (str(value).encode(), expires)
+        return value
+
+    def cmd_pexpire(self, db, key, milliseconds):
+        item = Store._alive(db, key)
+        if item is None:
+            return 0
+        db[key] = (item[0], time.monotonic() + int(milliseconds) / 1000)
+        return 1
+
+    def cmd_persist(self, db, key):
+        item = Store._alive(db, key)
+        if item is None or item[1] is None:
+            return 0
+        db[key] = (item[0], None)
+        return 1
+
+    def cmd_dbsize(self, db):
+        return len(db)
+
+    def cmd_flushdb(self, db):
+        db.clear()
+        return "OK"
+
+
+def encode_reply(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, ResponseError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(
+            encode_reply(item) for item in value
+        )
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        session = Session(self.server.store)
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            try:
+                reply = session.execute(*command)
+            except ResponseError as error:
+                reply = error
+            except (TypeError, ValueError, IndexError):
+                reply = ResponseError("ERR syntax error")
+            self.wfile.write(encode_reply(reply))
+
+
+class CacheServer(socketserver.ThreadingTCPServer):
+    """Минимальный сервер с протоколом Redis для разработки и тестов.
+
+    Понимает ровно те команды, которые использует RedisCache. В
+    продакшене вместо него работает настоящий Redis.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 6379)):
+        super().__init__(address, RequestHandler)
+        self.store = Store()
+
+    @property
+    def location(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
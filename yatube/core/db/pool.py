@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from core.metrics.registry import Counter, Histogram
+
+POOL_MAX_SIZE: int = 10
+POOL_TIMEOUT: float = 5.0
+POOL_CHECK_AFTER: float = 30.0
+
+WAIT_SECONDS = Histogram(
+    "yatube_db_pool_wait_seconds",
+    "Ожидание соединения из пула.",
+    ("alias",),
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+CHECKOUTS = Counter(
+    "yatube_db_pool_checkouts_total",
+    "Выдачи соединений из пула: reused, created, replaced, timeout.",
+    ("alias", "result"),
+)
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений DB-API, общий для потоков процесса.
+
+    Свободные соединения выдаются в порядке LIFO, чтобы работали самые
+    «тёплые». Соединение, пролежавшее без дела дольше check_after
+    секунд, перед выдачей проверяется запросом SELECT 1 и при ошибке
+    заменяется новым. Если заняты все max_size соединений, acquire()
+    ждёт не дольше timeout и бросает PoolTimeout.
+    """
+
+    def __init__(
+        self,
+        alias,
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT,
+        check_after=POOL_CHECK_AFTER,
+    ):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.size = 0
+        self._idle = deque()
+        self._condition = threading.Condition()
+
+    def acquire(self, connect):
+        started = time.monotonic()
+        with self._condition:
+            while not self._idle and self.size >= self.max_size:
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    CHECKOUTS.inc(alias=self.alias, result="timeout")
+                    raise PoolTimeout(
+                        f"Нет свободного соединения за {self.timeout} с"
+                    )
+                self._condition.wait(remaining)
+            if self._idle:
+                raw, released_at = self._idle.pop()
+            else:
+                raw, released_at = None, None
+                self.size += 1
+        WAIT_SECONDS.observe(time.monotonic() - started, alias=self.alias)
+        if raw is not None:
+            if (
+                time.monotonic() - released_at < self.check_after
+                or self._is_usable(raw)
+            ):
+                CHECKOUTS.inc(alias=self.alias, result="reused")
+                return raw
+            self._close(raw)
+            result = "replaced"
+        else:
+            result = "created"
+        try:
+            raw = connect()
+        except Exception:
+            self._forget()
+            raise
+        CHECKOUTS.inc(alias=self.alias, result=result)
+        return raw
+
+    def release(self, raw, reusable=True):
+        if not reusable:
+            self._close(raw)
+            self._forget()
+            return
+        with self._condition:
+            self._idle.append((raw, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            idle, self._idle = self._idle, deque()
+            self.size -= len(idle)
+            self._condition.notify_all()
+        for raw, _ in idle:
+            self._close(raw)
+
+    def _forget(self):
+        with self._condition:
+            self.size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _is_usable(raw):
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _close(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(settings_dict, alias):
+    """Пул процесса для базы; после fork и смены NAME (тесты) — новый."""
+    key = (os.getpid(), alias, settings_dict["NAME"])
+    pool = _pools.get(key)
+    if pool is None:
+        options = settings_dict.get("POOL", {})
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    alias,
+                    max_size=options.get("MAX_SIZE", POOL_MAX_SIZE),
+                    timeout=options.get("TIMEOUT", POOL_TIMEOUT),
+                    check_after=options.get("CHECK_AFTER", POOL_CHECK_AFTER),
+                )
+    return pool
+
+
+class PooledDatabaseWrapperMixin:
+    """Подмешивается к DatabaseWrapper бэкенда Django.
+
+    Вместо открытия соединение берётся из пула, а при закрытии (конец
+    запроса при CONN_MAX_AGE = 0 или по истечении CONN_MAX_AGE)
+    возвращается в него после отката незавершённой транзакции.
+    Соединение, закрытое внутри atomic, после ошибки отката или
+    не прошедшее is_usable() после ошибки БД, в пул не возвращается.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.settings_dict, self.alias)
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(
+                conn_params
+            )
+        )
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Как close_if_unusable_or_obsolete: после ошибки БД соединение
+        # могло оборваться, и следующий запрос получил бы его из пула.
+        reusable = not self.in_atomic_block and (
+            not self.errors_occurred or self.is_usable()
+        )
+        if reusable:
+            try:
+                self.connection.rollback()
+            except Exception:
+                reusable = False
+        self.pool.release(self.connection, reusable)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Сводка сэмплирующего профайлера по видам или стеки "
+        "для flame graph"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--folded",
+            action="store_true",
+            help="Вывести стеки в формате flamegraph.pl/speedscope",
+        )
+        parser.add_argument("--view", help="Только этот вид (posts:index)")
+        parser.add_argument(
+            "--clear", action="store_true", help="Удалить собранные профили"
+        )
+
+    def handle(self, *args, **options):
+        directory = settings.PROFILE_DIR
+        if options["clear"]:
+            profiling.clear_samples(directory)
+            return
+        samples = profiling.read_samples(directory)
+        if options["folded"]:
+            stacks = profiling.folded_stacks(samples, options["view"])
+            for stack, count in stacks.most_common():
+                self.stdout.write(f"{stack} {count}")
+            return
+        views = profiling.summarize(samples)
+        for view_name, view in sorted(
+            views.items(), key=lambda item: -item[1]["wall_ms"]
+        ):
+            if options["view"] and view_name != options["view"]:
+                continue
+            requests = view["requests"]
+            parts = ", ".join(
+                f"{name} {total / requests:.1f}ms"
+                for name, total in view["categories"].most_common()
+            )
+            self.stdout.write(
+                f"{view_name}: {requests} запросов, "
+                f"в среднем {view['wall_ms'] / requests:.1f}ms ({parts})"
+            )
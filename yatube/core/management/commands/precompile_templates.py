@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from core.template_loader import precompile
+
+
+class Command(BaseCommand):
+    help = (
+        "Компилирует все шаблоны проекта: ошибка синтаксиса в любом "
+        "шаблоне останавливает выкладку"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        compiled, errors = precompile(engines["django"].engine)
+        elapsed = (time.perf_counter() - started) * 1000
+        for name, error in errors:
+            self.stderr.write(f"{name}: {error}")
+        if errors:
+            raise CommandError(f"Шаблонов с ошибками: {len(errors)}")
+        self.stdout.write(
+            f"Скомпилировано шаблонов: {len(compiled)} за {elapsed:.0f}ms"
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.cache.server import CacheServer
+
+
+class Command(BaseCommand):
+    help = "Запускает локальный сервер кэша с протоколом Redis"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=6379)
+
+    def handle(self, *args, **options):
+        server = CacheServer((options["host"], options["port"]))
+        self.stdout.write(f"Кэш слушает {server.location}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
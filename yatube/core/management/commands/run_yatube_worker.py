@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import get_table, run_worker
+
+
+class Command(BaseCommand):
+    help = "Выполняет отложенные задачи из TASKS_DB в пуле потоков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать текущие задачи и выйти",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TASKS_DB:
+            raise CommandError(
+                "TASKS_DB не задан: задачи выполняются сразу в запросе"
+            )
+        table = get_table()
+        self.stdout.write(f"Очередь задач: {table.path}")
+        try:
+            run_worker(
+                table,
+                threads=options["threads"],
+                poll_interval=options["poll_interval"],
+                once=options["once"],
+            )
+        except KeyboardInterrupt:
+            pass
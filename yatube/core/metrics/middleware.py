@@ -0,0 +1,66 @@
+import time
+
+from django.db import connection
+
+from .registry import Counter, Histogram
+
+REQUESTS = Counter(
+    "yatube_http_requests_total",
+    "Обработанные запросы по виду и коду ответа.",
+    ("view", "status"),
+)
+LATENCY = Histogram(
+    "yatube_http_request_duration_seconds",
+    "Время обработки запроса по виду.",
+    ("view",),
+)
+DB_QUERIES = Counter(
+    "yatube_db_queries_total", "Запросы к БД по виду.", ("view",)
+)
+DB_SECONDS = Counter(
+    "yatube_db_query_seconds_total",
+    "Суммарное время запросов к БД по виду.",
+    ("view",),
+)
+
+
+class QueryTimer:
+    """Обёртка connection.execute_wrapper: число и время запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Счётчики и гистограммы запросов для /metrics.
+
+    Стоит сразу после профайлера, поэтому задержка включает остальные
+    middleware. Запись значения — сложение в mmap под блокировкой
+    потока, без системных вызовов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        REQUESTS.inc(view=view_name, status=response.status_code)
+        LATENCY.observe(elapsed, view=view_name)
+        DB_QUERIES.inc(timer.count, view=view_name)
+        DB_SECONDS.inc(timer.seconds, view=view_name)
+        return response
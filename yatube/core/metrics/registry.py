@@ -0,0 +1,99 @@
+import re
+
+from .store import get_store
+
+REGISTRY = []
+DEFAULT_BUCKETS: tuple = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+LE_RE = re.compile(r'le="([^"]*)"')
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Metric:
+    kind = "untyped"
+    suffixes = ("",)
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, suffix, labels, extra=()):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: ожидались метки {self.labelnames}"
+            )
+        pairs = [(name, labels[name]) for name in self.labelnames]
+        return f"{self.name}{suffix}{_labels(pairs + list(extra))}"
+
+    def owns(self, key):
+        sample = key.split("{", 1)[0]
+        return any(sample == self.name + suffix for suffix in self.suffixes)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        get_store().add(self._key("", labels), amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+    suffixes = ("_bucket", "_sum", "_count")
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        store = get_store()
+        for bound in self.buckets:
+            # Нулевое сложение заводит корзину, чтобы в выводе были все.
+            store.add(
+                self._key("_bucket", labels, [("le", repr(bound))]),
+                int(value <= bound),
+            )
+        store.add(self._key("_bucket", labels, [("le", "+Inf")]), 1)
+        store.add(self._key("_sum", labels), value)
+        store.add(self._key("_count", labels), 1)
+
+
+def _sample_order(key):
+    match = LE_RE.search(key)
+    bound = float(match.group(1)) if match else 0.0
+    series = LE_RE.sub("", key).split("{", 1)
+    labels = series[1] if len(series) > 1 else ""
+    return labels, series[0], bound
+
+
+def exposition(values):
+    """Текстовый формат Prometheus 0.0.4 для значений store.collect()."""
+    lines = []
+    for metric in REGISTRY:
+        keys = sorted(filter(metric.owns, values), key=_sample_order)
+        if not keys:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{key} {values[key]!r}" for key in keys)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,186 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+INITIAL_SIZE: int = 64 * 1024
+READ_ATTEMPTS: int = 100
+READ_RETRY_DELAY: float = 0.001
+# Заголовок: занятые байты и номер записи (seqlock). Нечётный номер —
+# владелец файла посреди записи.
+HEADER = struct.Struct("<QQ")
+LENGTH = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+
+
+def _entries(buffer, used):
+    """(ключ, значение, смещение значения) записей файла метрик.
+
+    Запись: длина ключа (uint32), ключ, выравнивание до 8 байт, double.
+    """
+    position = HEADER.size
+    while position < used:
+        (length,) = LENGTH.unpack_from(buffer, position)
+        key_start = position + LENGTH.size
+        key = bytes(buffer[key_start:key_start + length]).decode()
+        value_position = key_start + length + (-(LENGTH.size + length) % 8)
+        (value,) = VALUE.unpack_from(buffer, value_position)
+        yield key, value, value_position
+        position = value_position + VALUE.size
+
+
+class MmapValues:
+    """Значения метрик одного процесса в файле, отображённом в память.
+
+    Пишет в файл только процесс-владелец, поэтому блокировка нужна лишь
+    между его потоками. Каждая запись окружена увеличением номера в
+    заголовке: читатель из другого процесса повторяет чтение, пока номер
+    нечётный или изменился за время чтения, и не видит недописанных
+    значений. Без path память анонимная и видна только самому процессу.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        if path is None:
+            self._file = None
+            self._map = mmap.mmap(-1, INITIAL_SIZE)
+        else:
+            self._file = open(path, "a+b")
+            if os.path.getsize(path) < INITIAL_SIZE:
+                self._file.truncate(INITIAL_SIZE)
+            self._map = mmap.mmap(
+                self._file.fileno(), os.path.getsize(path)
+            )
+        used, sequence = HEADER.unpack_from(self._map, 0)
+        self._used = used or HEADER.size
+        # Прежний владелец мог упасть посреди записи: номер делаем чётным.
+        self._sequence = sequence + sequence % 2
+        HEADER.pack_into(self._map, 0, self._used, self._sequence)
+        self._positions = {
+            key: position
+            for key, _, position in _entries(self._map, self._used)
+        }
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        if self._file is None:
+            grown = mmap.mmap(-1, size)
+            grown[:self._used] = self._map[:self._used]
+            self._map.close()
+        else:
+            self._map.close()
+            self._file.truncate(size)
+            grown = mmap.mmap(self._file.fileno(), size)
+        self._map = grown
+
+    def _position(self, key):
+        position = self._positions.get(key)
+        if position is not None:
+            return position
+        encoded = key.encode()
+        padding = -(LENGTH.size + len(encoded)) % 8
+        entry_size = LENGTH.size + len(encoded) + padding + VALUE.size
+        if self._used + entry_size > len(self._map):
+            self._grow(self._used + entry_size)
+        LENGTH.pack_into(self._map, self._used, len(encoded))
+        key_start = self._used + LENGTH.size
+        self._map[key_start:key_start + len(encoded)] = encoded
+        position = key_start + len(encoded) + padding
+        VALUE.pack_into(self._map, position, 0.0)
+        self._used += entry_size
+        self._positions[key] = position
+        return position
+
+    def _write_header(self):
+        self._sequence += 1
+        HEADER.pack_into(self._map, 0, self._used, self._sequence)
+
+    def add(self, key, amount):
+        with self._lock:
+            self._write_header()
+            try:
+                position = self._position(key)
+                (value,) = VALUE.unpack_from(self._map, position)
+                VALUE.pack_into(self._map, position, value + amount)
+            finally:
+                self._write_header()
+
+    def items(self):
+        with self._lock:
+            return {
+                key: value for key, value, _ in _entries(self._map, self._used)
+            }
+
+    def close(self):
+        self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _snapshot(path):
+    """Содержимое файла метрик, снятое не посреди записи владельца.
+
+    Если номер так и не стал чётным и неизменным, владелец, скорее
+    всего, упал посреди записи — отдаём последнее прочитанное.
+    """
+    # Без буфера: иначе seek(0) отдаст заголовок из прочитанного ранее.
+    with open(path, "rb", buffering=0) as source:
+        for _ in range(READ_ATTEMPTS):
+            source.seek(0)
+            buffer = source.read()
+            if len(buffer) < HEADER.size:
+                return buffer
+            _, sequence = HEADER.unpack_from(buffer, 0)
+            source.seek(0)
+            _, current = HEADER.unpack(source.read(HEADER.size))
+            if sequence % 2 == 0 and current == sequence:
+                return buffer
+            time.sleep(READ_RETRY_DELAY)
+    return buffer
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Значения текущего процесса; после fork открывается новый файл."""
+    directory = settings.METRICS_DIR
+    key = (os.getpid(), directory)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                path = None
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                    path = os.path.join(directory, f"{os.getpid()}.metrics")
+                store = _stores[key] = MmapValues(path)
+    return store
+
+
+def collect():
+    """Сумма значений по всем процессам, пишущим в METRICS_DIR."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return get_store().items()
+    totals = {}
+    if not os.path.isdir(directory):
+        return totals
+    for name in os.listdir(directory):
+        if not name.endswith(".metrics"):
+            continue
+        buffer = _snapshot(os.path.join(directory, name))
+        if len(buffer) < HEADER.size:
+            continue
+        used, _ = HEADER.unpack_from(buffer, 0)
+        for key, value, _ in _entries(buffer, min(used, len(buffer))):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
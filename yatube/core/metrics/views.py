@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+
+from .registry import exposition
+from .store import collect
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    return HttpResponse(exposition(collect()), content_type=CONTENT_TYPE)
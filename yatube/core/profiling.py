@@ -0,0 +1,167 @@
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Категория -> фрагменты пути к файлу. Сэмпл относится к категории
+# самого глубокого кадра стека, который под неё подходит.
+CATEGORIES: tuple = (
+    ("db", ("django/db/", "sqlite3/")),
+    ("cache", ("django/core/cache/", "core/cache/")),
+    ("thumbnails", ("posts/thumbnails", "posts/variants", "sorl/", "PIL/")),
+    ("templates", ("django/template/",)),
+)
+OTHER: str = "python"
+
+_write_lock = threading.Lock()
+
+
+def frame_label(code):
+    path = code.co_filename.replace(os.sep, "/")
+    short = "/".join(path.rsplit("/", 2)[-2:])
+    return f"{short}:{code.co_name}"
+
+
+def category(stack):
+    """stack — пути файлов от корня к листу."""
+    for path in reversed(stack):
+        for name, fragments in CATEGORIES:
+            if any(fragment in path for fragment in fragments):
+                return name
+    return OTHER
+
+
+class StackSampler(threading.Thread):
+    """Раз в interval снимает стек потока запроса.
+
+    Запускается только для выбранных запросов; остальные не платят за
+    профилирование ничего, кроме инкремента счётчика.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.categories = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels, paths = [], []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                paths.append(frame.f_code.co_filename.replace(os.sep, "/"))
+                frame = frame.f_back
+            labels.reverse()
+            paths.reverse()
+            self.stacks[";".join(labels)] += 1
+            self.categories[category(paths)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def write_sample(directory, view_name, wall_ms, sampler):
+    """Дописывает результат запроса в файл профиля текущего процесса."""
+    interval_ms = sampler.interval * 1000
+    record = {
+        "view": view_name,
+        "wall_ms": round(wall_ms, 3),
+        "categories": {
+            name: round(count * interval_ms, 3)
+            for name, count in sampler.categories.items()
+        },
+        "stacks": dict(sampler.stacks),
+    }
+    path = os.path.join(directory, f"{os.getpid()}.jsonl")
+    with _write_lock:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as output:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_samples(directory):
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".jsonl"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def clear_samples(directory):
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith(".jsonl"):
+                os.remove(os.path.join(directory, name))
+
+
+def summarize(samples):
+    """view -> {"requests", "wall_ms", "categories": {...}}."""
+    views = {}
+    for sample in samples:
+        view = views.setdefault(
+            sample["view"],
+            {"requests": 0, "wall_ms": 0.0, "categories": Counter()},
+        )
+        view["requests"] += 1
+        view["wall_ms"] += sample["wall_ms"]
+        view["categories"].update(sample["categories"])
+    return views
+
+
+def folded_stacks(samples, view_name=None):
+    """Стеки в формате flamegraph.pl / speedscope: «вид;кадр;кадр N»."""
+    stacks = Counter()
+    for sample in samples:
+        if view_name is None or sample["view"] == view_name:
+            for stack, count in sample["stacks"].items():
+                stacks[f"{sample['view']};{stack}"] += count
+    return stacks
+
+
+class SamplingProfilerMiddleware:
+    """Профилирует каждый PROFILE_SAMPLE_RATE-й запрос процесса.
+
+    Стеки снимает StackSampler, время раскладывается по категориям
+    (БД, кэш, миниатюры, шаблоны) по самому глубокому подходящему кадру
+    и копится в PROFILE_DIR по видам. При PROFILE_SAMPLE_RATE = 0
+    middleware отключается целиком.
+    """
+
+    def __init__(self, get_response):
+        self.rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+        if not self.rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.interval = settings.PROFILE_INTERVAL
+        self.directory = settings.PROFILE_DIR
+        self.counter = itertools.count(1)
+
+    def __call__(self, request):
+        if next(self.counter) % self.rate:
+            return self.get_response(request)
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        write_sample(self.directory, view_name, wall_ms, sampler)
+        return response
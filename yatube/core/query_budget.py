@@ -0,0 +1,106 @@
+import logging
+import re
+from collections import Counter
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Имя URL ("posts:index") -> допустимое число запросов к БД за запрос.
+# Заполняется приложениями через register().
+budgets = {}
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+FINGERPRINTS_IN_LOG: int = 5
+
+
+def register(mapping):
+    budgets.update(mapping)
+
+
+def fingerprint(sql):
+    """SQL без литералов и длины списков IN — одинаков для N+1-запросов."""
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = PLACEHOLDER_LIST_RE.sub("(...)", sql)
+    return " ".join(sql.split())
+
+
+class QueryRecorder:
+    """Обёртка connection.execute_wrapper: копит текст запросов.
+
+    В отличие от CaptureQueriesContext не требует DEBUG и не замеряет
+    время, поэтому годится для каждого запроса в бою.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def top(self, limit=FINGERPRINTS_IN_LOG):
+        return Counter(map(fingerprint, self.queries)).most_common(limit)
+
+
+class Usage:
+    def __init__(self, view_name, queries, budget):
+        self.view_name = view_name
+        self.queries = queries
+        self.budget = budget
+
+    @property
+    def count(self):
+        return len(self.queries.queries)
+
+    @property
+    def exceeded(self):
+        return self.budget is not None and self.count > self.budget
+
+    def __str__(self):
+        lines = [
+            f"{self.view_name}: {self.count} запросов "
+            f"при бюджете {self.budget}"
+        ]
+        lines += [f"  {times} x {sql}" for sql, times in self.queries.top()]
+        return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к БД на каждый запрос и сверяет с бюджетом вида.
+
+    Превышение пишется в лог с самыми частыми отпечатками SQL, а итог
+    кладётся в response.query_budget для тестовых проверок.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        usage = Usage(view_name, recorder, budgets.get(view_name))
+        response.query_budget = usage
+        if usage.exceeded:
+            logger.warning("Превышен бюджет запросов к БД\n%s", usage)
+        return response
+
+
+class QueryBudgetTestMixin:
+    """Проверки бюджета для TestCase: ответ должен пройти через
+    QueryBudgetMiddleware."""
+
+    def assertWithinQueryBudget(self, response):
+        usage = getattr(response, "query_budget", None)
+        if usage is None:
+            self.fail("Ответ не прошёл через QueryBudgetMiddleware")
+        if usage.budget is None:
+            self.fail(f"Для {usage.view_name} не задан бюджет запросов")
+        if usage.exceeded:
+            self.fail(f"Превышен бюджет запросов к БД\n{usage}")
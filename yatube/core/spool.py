@@ -0,0 +1,69 @@
+import json
+import os
+import time
+import uuid
+
+
+class DirectoryQueue:
+    """Очередь задач на диске, общая для нескольких процессов.
+
+    Задача — JSON-файл. Постановка пишет файл во временное имя и
+    атомарно переносит его в pending/, захват переносит файл в working/:
+    rename атомарен, поэтому одну задачу получит ровно один воркер.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = os.path.join(path, "pending")
+        self.working = os.path.join(path, "working")
+        self.failed = os.path.join(path, "failed")
+        for directory in (self.pending, self.working, self.failed):
+            os.makedirs(directory, exist_ok=True)
+
+    def put(self, payload):
+        name = f"{time.time_ns()}-{uuid.uuid4().hex}.json"
+        temporary = os.path.join(self.path, f".{name}")
+        with open(temporary, "w") as job_file:
+            json.dump(payload, job_file)
+        os.replace(temporary, os.path.join(self.pending, name))
+        return name
+
+    def __len__(self):
+        return len(os.listdir(self.pending))
+
+    def claim(self, limit):
+        claimed = []
+        for name in sorted(os.listdir(self.pending)):
+            if len(claimed) >= limit:
+                break
+            target = os.path.join(self.working, name)
+            try:
+                os.rename(os.path.join(self.pending, name), target)
+            except FileNotFoundError:
+                continue
+            with open(target) as job_file:
+                claimed.append((name, json.load(job_file)))
+        return claimed
+
+    def done(self, name):
+        os.remove(os.path.join(self.working, name))
+
+    def retry(self, name, payload):
+        with open(os.path.join(self.working, name), "w") as job_file:
+            json.dump(payload, job_file)
+        os.replace(
+            os.path.join(self.working, name), os.path.join(self.pending, name)
+        )
+
+    def fail(self, name):
+        os.replace(
+            os.path.join(self.working, name), os.path.join(self.failed, name)
+        )
+
+    def recover(self):
+        """Возвращает в очередь задачи, брошенные упавшим воркером."""
+        for name in os.listdir(self.working):
+            os.replace(
+                os.path.join(self.working, name),
+                os.path.join(self.pending, name),
+            )
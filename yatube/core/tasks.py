@@ -0,0 +1,274 @@
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from core.metrics.registry import Counter
+
+logger = logging.getLogger(__name__)
+
+TASK_ATTEMPTS: int = 5
+TASK_RETRY_DELAY: float = 2.0
+TASK_LEASE: float = 300.0
+TASK_SQLITE_TIMEOUT: float = 30.0
+
+RUNS = Counter(
+    "yatube_tasks_total",
+    "Выполнения отложенных задач: done, retry, failed.",
+    ("task", "result"),
+)
+
+# Имя задачи ("posts.jobs.fan_out") -> функция. Заполняется @task при
+# импорте модулей с задачами.
+registry = {}
+# TASKS_DB -> JobTable: схема создаётся один раз на процесс.
+_tables = {}
+
+SCHEMA: tuple = (
+    "PRAGMA journal_mode = WAL",
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        task TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        key TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_at REAL NOT NULL,
+        claimed_at REAL,
+        error TEXT
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS jobs_pending_key
+    ON jobs (key) WHERE state = 'pending'
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, run_at)",
+)
+
+
+class Job:
+    def __init__(self, pk, task, payload, attempts):
+        self.pk = pk
+        self.task = task
+        self.payload = payload
+        self.attempts = attempts
+
+
+class JobTable:
+    """Таблица задач в отдельном SQLite-файле, общая для процессов.
+
+    Задачи переживают перезапуск: захват переводит строку в running,
+    а выполнение удаляет её, поэтому брошенные упавшим воркером задачи
+    возвращаются в очередь по истечении аренды. Ключ идемпотентности
+    уникален среди ожидающих задач — повторная постановка той же
+    задачи до её запуска ничего не добавляет.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as db, db:
+            for statement in SCHEMA:
+                db.execute(statement)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=TASK_SQLITE_TIMEOUT)
+        db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    def put(self, task, payload, key, delay=0.0):
+        """Ставит задачу; False, если такая уже ждёт своей очереди."""
+        with closing(self._connect()) as db, db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO jobs (task, payload, key, run_at) "
+                "VALUES (?, ?, ?, ?)",
+                (task, json.dumps(payload), key, time.time() + delay),
+            )
+            return bool(cursor.rowcount)
+
+    def __len__(self):
+        with closing(self._connect()) as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'pending'"
+            ).fetchone()[0]
+
+    def claim(self, limit):
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            # BEGIN IMMEDIATE берёт блокировку записи до выборки: одну
+            # задачу захватит ровно один воркер.
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute(
+                "SELECT id, task, payload, attempts FROM jobs "
+                "WHERE state = 'pending' AND run_at <= ? "
+                "ORDER BY run_at, id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            db.executemany(
+                "UPDATE jobs SET state = 'running', claimed_at = ? "
+                "WHERE id = ?",
+                [(now, row[0]) for row in rows],
+            )
+        return [
+            Job(pk, task, json.loads(payload), attempts)
+            for pk, task, payload, attempts in rows
+        ]
+
+    def done(self, job):
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM jobs WHERE id = ?", (job.pk,))
+
+    def retry(self, job, error, delay):
+        with closing(self._connect()) as db, db:
+            cursor = db.execute(
+                "UPDATE OR IGNORE jobs SET state = 'pending', "
+                "attempts = attempts + 1, run_at = ?, error = ? "
+                "WHERE id = ?",
+                (time.time() + delay, error, job.pk),
+            )
+            if not cursor.rowcount:
+                # Та же задача уже поставлена заново и сделает работу.
+                db.execute("DELETE FROM jobs WHERE id = ?", (job.pk,))
+
+    def fail(self, job, error):
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "UPDATE jobs SET state = 'failed', attempts = attempts + 1, "
+                "error = ? WHERE id = ?",
+                (error, job.pk),
+            )
+
+    def recover(self, lease=TASK_LEASE):
+        """Возвращает в очередь задачи, захваченные дольше lease назад."""
+        expired = time.time() - lease
+        with closing(self._connect()) as db, db:
+            recovered = db.execute(
+                "UPDATE OR IGNORE jobs SET state = 'pending' "
+                "WHERE state = 'running' AND claimed_at < ?",
+                (expired,),
+            ).rowcount
+            # Остались те, что уже поставлены заново под тем же ключом.
+            db.execute(
+                "DELETE FROM jobs WHERE state = 'running' AND claimed_at < ?",
+                (expired,),
+            )
+        return recovered
+
+
+def task(func):
+    """Регистрирует функцию как задачу под именем «модуль.функция»."""
+    func.task_name = f"{func.__module__}.{func.__name__}"
+    registry[func.task_name] = func
+    return func
+
+
+def get_table():
+    path = settings.TASKS_DB
+    if path not in _tables:
+        _tables[path] = JobTable(path)
+    return _tables[path]
+
+
+def idempotency_key(func, payload):
+    return f"{func.task_name}:{json.dumps(payload, sort_keys=True)}"
+
+
+def enqueue(func, key=None, **payload):
+    """Откладывает func(**payload) до воркера, если задан TASKS_DB.
+
+    Задача ставится после фиксации транзакции, чтобы воркер видел
+    записанные ею строки. Без TASKS_DB функция выполняется сразу.
+    По умолчанию ключ идемпотентности — имя задачи с аргументами.
+    """
+    if not settings.TASKS_DB:
+        func(**payload)
+        return
+    key = key or idempotency_key(func, payload)
+    transaction.on_commit(
+        lambda: get_table().put(func.task_name, payload, key)
+    )
+
+
+def execute(table, job):
+    func = registry.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Неизвестная задача {job.task}")
+        func(**job.payload)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        logger.warning(
+            "Задача %s %s: попытка %s не удалась: %s",
+            job.task,
+            job.payload,
+            job.attempts + 1,
+            error,
+        )
+        if func is None or job.attempts + 1 >= TASK_ATTEMPTS:
+            table.fail(job, error)
+            RUNS.inc(task=job.task, result="failed")
+        else:
+            table.retry(job, error, TASK_RETRY_DELAY * 2 ** job.attempts)
+            RUNS.inc(task=job.task, result="retry")
+    else:
+        table.done(job)
+        RUNS.inc(task=job.task, result="done")
+
+
+def _execute_in_thread(table, job):
+    try:
+        execute(table, job)
+    finally:
+        connections.close_all()
+
+
+def drain(table=None, limit=100):
+    """Выполняет готовые задачи в текущем потоке: для тестов и отладки."""
+    if table is None:
+        table = get_table()
+    jobs = table.claim(limit)
+    for job in jobs:
+        execute(table, job)
+    return len(jobs)
+
+
+def run_worker(table=None, threads=4, poll_interval=1.0, once=False):
+    """Раздаёт задачи пулу потоков, пока его не остановят.
+
+    Задачи в основном ждут БД, а не процессор, поэтому хватает потоков
+    одного процесса; у каждого потока своё соединение с БД. Новая задача
+    захватывается, как только освобождается поток, — долгая задача не
+    держит остальные потоки без дела. С once=True воркер выходит, когда
+    готовых задач не осталось.
+    """
+    if table is None:
+        table = get_table()
+    processed = 0
+    running = set()
+    with ThreadPoolExecutor(threads) as pool:
+        while True:
+            table.recover()
+            jobs = table.claim(threads - len(running))
+            running.update(
+                pool.submit(_execute_in_thread, table, job) for job in jobs
+            )
+            if not running:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            # Пока есть свободные потоки, не ждём дольше poll_interval:
+            # за это время могли появиться новые задачи.
+            done, running = wait(
+                running,
+                timeout=None if len(running) == threads else poll_interval,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                future.result()
+            processed += len(done)
@@ -0,0 +1,87 @@
+import os
+
+from django.conf import settings
+from django.template import Template, TemplateSyntaxError
+from django.template.loaders import cached
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class Loader(cached.Loader):
+    """Кэширующий загрузчик, который в DEBUG следит за файлами.
+
+    Скомпилированные шаблоны живут в памяти процесса, как у
+    django.template.loaders.cached. При autoreload (по умолчанию равен
+    debug движка) перед выдачей из кэша сверяется mtime файла, и
+    изменённый шаблон компилируется заново; отсутствующие шаблоны не
+    запоминаются, чтобы новый файл подхватился без перезапуска.
+    """
+
+    def __init__(self, engine, loaders, autoreload=None):
+        super().__init__(engine, loaders)
+        self.autoreload = engine.debug if autoreload is None else autoreload
+        self.mtimes = {}
+
+    def _is_stale(self, cached_value):
+        if not isinstance(cached_value, Template):
+            return True
+        path = cached_value.origin.name
+        return _mtime(path) != self.mtimes.get(path)
+
+    def get_template(self, template_name, skip=None):
+        if not self.autoreload:
+            return super().get_template(template_name, skip)
+        key = self.cache_key(template_name, skip)
+        cached_value = self.get_template_cache.get(key)
+        if cached_value is not None and self._is_stale(cached_value):
+            del self.get_template_cache[key]
+            cached_value = None
+        template = super().get_template(template_name, skip)
+        if cached_value is None:
+            path = template.origin.name
+            self.mtimes[path] = _mtime(path)
+        return template
+
+    def reset(self):
+        super().reset()
+        self.mtimes.clear()
+
+
+def template_names(engine):
+    """Имена шаблонов проекта из каталогов загрузчиков движка.
+
+    Шаблоны сторонних пакетов (админка, debug_toolbar) пропускаются.
+    """
+    names = set()
+    for loader in engine.template_loaders:
+        for nested in getattr(loader, "loaders", [loader]):
+            for directory in nested.get_dirs():
+                directory = str(directory)
+                if not directory.startswith(settings.BASE_DIR):
+                    continue
+                for root, _, files in os.walk(directory):
+                    for name in files:
+                        if name.endswith((".html", ".txt")):
+                            path = os.path.relpath(
+                                os.path.join(root, name), directory
+                            )
+                            names.add(path.replace(os.sep, "/"))
+    return sorted(names)
+
+
+def precompile(engine):
+    """Компилирует все шаблоны проекта; возвращает (имена, ошибки)."""
+    compiled, errors = [], []
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors.append((name, error))
+        else:
+            compiled.append(name)
+    return compiled, errors
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ..cache.backends import RedisCache
+from ..cache.resp import ConnectionPool, ResponseError
+from ..cache.server import CacheServer
+
+
+class SharedCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = CacheServer(("127.0.0.1", 0))
+        cls.server.start_in_thread()
+        cls.location = cls.server.location
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = RedisCache(SharedCacheTests.location, {})
+        self.cache.clear()
+
+    def test_basic_operations(self):
+        """Основные операции Django-кэша работают через сервер."""
+        cache = self.cache
+        cache.set("page", {"html": "<p>Пост</p>"})
+        self.assertEqual(cache.get("page"), {"html": "<p>Пост</p>"})
+        self.assertFalse(cache.add("page", "другое"))
+        self.assertTrue(cache.add("new", "значение"))
+        self.assertEqual(cache.get("missing", "default"), "default")
+
+        cache.set_many({"a": 1, "b": [2]})
+        self.assertEqual(
+            cache.get_many(["a", "b", "c"]), {"a": 1, "b": [2]}
+        )
+        self.assertEqual(cache.incr("a", 5), 6)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+
+        cache.delete_many(["a", "b"])
+        self.assertFalse(cache.has_key("a"))
+
+    def test_timeouts(self):
+        """Записи истекают по таймауту, нулевой таймаут не сохраняет."""
+        self.cache.set("short", "value", timeout=0.05)
+        self.cache.set("zero", "value", timeout=0)
+        self.assertIsNone(self.cache.get("zero"))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("short"))
+
+    def test_data_is_shared_between_clients(self):
+        """Запись одного клиента видна клиенту с другим пулом."""
+        other = RedisCache(SharedCacheTests.location, {})
+        other._pool = ConnectionPool(
+            "127.0.0.1", SharedCacheTests.server.server_address[1]
+        )
+        self.cache.set("shared", "из воркера 1")
+        self.assertEqual(other.get("shared"), "из воркера 1")
+        other.delete("shared")
+        self.assertIsNone(self.cache.get("shared"))
+
+    def test_pool_reuses_connections(self):
+        """Пул не открывает новое соединение на каждый запрос."""
+        pool = ConnectionPool(
+            "127.0.0.1",
+            SharedCacheTests.server.server_address[1],
+            max_connections=2,
+        )
+        cache = RedisCache(SharedCacheTests.location, {})
+        cache._pool = pool
+
+        def hammer():
+            for number in range(50):
+                cache.set(f"key-{number}", number)
+
+        threads = [threading.Thread(target=hammer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(pool.created, 2)
+        self.assertEqual(cache.get("key-49"), 49)
+
+    def test_server_errors_do_not_leak_pool_slots(self):
+        """Ошибка сервера возвращает соединение и слот в пул."""
+        pool = ConnectionPool(
+            "127.0.0.1",
+            SharedCacheTests.server.server_address[1],
+            max_connections=2,
+            wait=0.1,
+        )
+        cache = RedisCache(SharedCacheTests.location, {})
+        cache._pool = pool
+        cache.set("text", "не число")
+        for _ in range(3):
+            with self.assertRaises(ResponseError):
+                cache.incr("text")
+        with self.assertRaises(ResponseError):
+            cache._pipeline(
+                [("INCRBY", cache.make_key("text"), 1), ("EXISTS", "text")]
+            )
+        self.assertEqual(cache.get("text"), "не число")
+        self.assertEqual(pool.created, 1)
@@ -0,0 +1,97 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from ..db.backends.sqlite3.base import DatabaseWrapper
+from ..db.pool import ConnectionPool, PoolTimeout
+
+DB_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    def test_released_connection_is_reused(self):
+        """Возвращённое соединение выдаётся снова без подключения."""
+        pool = ConnectionPool("test")
+        raw = pool.acquire(connect)
+        pool.release(raw)
+        self.assertIs(pool.acquire(connect), raw)
+        self.assertEqual(pool.size, 1)
+
+    def test_acquire_times_out_when_pool_is_exhausted(self):
+        """При занятом пуле acquire ждёт timeout и сдаётся."""
+        pool = ConnectionPool("test", max_size=1, timeout=0.01)
+        pool.acquire(connect)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(connect)
+
+    def test_broken_idle_connection_is_replaced(self):
+        """Соединение после простоя проверяется и заменяется при ошибке."""
+        pool = ConnectionPool("test", check_after=0)
+        raw = pool.acquire(connect)
+        pool.release(raw)
+        raw.close()
+        replacement = pool.acquire(connect)
+        self.assertIsNot(replacement, raw)
+        replacement.execute("SELECT 1")
+        self.assertEqual(pool.size, 1)
+
+    def create_wrapper(self, name):
+        return DatabaseWrapper(
+            {
+                **settings.DATABASES["default"],
+                "NAME": os.path.join(DB_DIR, name),
+                "POOL": {"MAX_SIZE": 1},
+                "TEST": {},
+                "TIME_ZONE": None,
+                "CONN_MAX_AGE": 0,
+                "AUTOCOMMIT": True,
+                "ATOMIC_REQUESTS": False,
+                "OPTIONS": {},
+            },
+            "pool-test",
+        )
+
+    def test_database_wrapper_returns_connection_to_pool(self):
+        """DatabaseWrapper при close() отдаёт соединение в пул."""
+        wrapper = self.create_wrapper("pool.sqlite3")
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(wrapper.pool.size, 1)
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, raw)
+        wrapper.close()
+        wrapper.pool.close_all()
+        self.assertEqual(wrapper.pool.size, 0)
+
+    def test_unusable_connection_after_error_is_discarded(self):
+        """После ошибки БД мёртвое соединение в пул не возвращается."""
+        wrapper = self.create_wrapper("errors.sqlite3")
+        for usable, pool_size in ((True, 1), (False, 0)):
+            with self.subTest(usable=usable):
+                with self.assertRaises(DatabaseError):
+                    with wrapper.cursor() as cursor:
+                        cursor.execute("SELECT * FROM missing_table")
+                self.assertTrue(wrapper.errors_occurred)
+                with mock.patch.object(
+                    wrapper, "is_usable", return_value=usable
+                ):
+                    wrapper.close()
+                self.assertEqual(wrapper.pool.size, pool_size)
+        wrapper.pool.close_all()
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import store
+from ..metrics.registry import Counter, Histogram, exposition
+
+METRICS_DIR = tempfile.mkdtemp()
+
+
+class MmapValuesTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+    def test_values_survive_reopen_and_growth(self):
+        """Файл растёт по мере новых ключей и читается заново."""
+        path = os.path.join(METRICS_DIR, "reopen.metrics")
+        values = store.MmapValues(path)
+        for index in range(3000):
+            values.add(f'sample{{key="{index}"}}', index)
+        values.add('sample{key="1"}', 0.5)
+        values.close()
+        self.assertGreater(os.path.getsize(path), store.INITIAL_SIZE)
+        reopened = store.MmapValues(path)
+        self.assertEqual(reopened.items()['sample{key="1"}'], 1.5)
+        reopened.add('sample{key="2999"}', 1)
+        self.assertEqual(reopened.items()['sample{key="2999"}'], 3000)
+        reopened.close()
+
+    def test_collect_sums_files_of_all_processes(self):
+        """/metrics суммирует значения всех воркеров."""
+        directory = tempfile.mkdtemp(dir=METRICS_DIR)
+        for pid in (101, 102):
+            values = store.MmapValues(
+                os.path.join(directory, f"{pid}.metrics")
+            )
+            values.add("requests", pid)
+            values.close()
+        with override_settings(METRICS_DIR=directory):
+            self.assertEqual(store.collect(), {"requests": 203.0})
+
+    def test_growth_closes_previous_anonymous_map(self):
+        """При росте анонимной памяти прежнее отображение закрывается."""
+        values = store.MmapValues()
+        previous = values._map
+        for index in range(3000):
+            values.add(f'sample{{key="{index}"}}', index)
+        self.assertTrue(previous.closed)
+        self.assertEqual(values.items()['sample{key="2999"}'], 2999)
+        values.close()
+
+    def test_collect_waits_for_write_in_progress(self):
+        """Читатель не видит значение, которое владелец ещё пишет."""
+        directory = tempfile.mkdtemp(dir=METRICS_DIR)
+        values = store.MmapValues(os.path.join(directory, "103.metrics"))
+        values.add("requests", 1)
+        position = values._positions["requests"]
+        values._write_header()
+        store.VALUE.pack_into(values._map, position, 1e300)
+
+        def finish_write(delay):
+            store.VALUE.pack_into(values._map, position, 2.0)
+            values._write_header()
+
+        with override_settings(METRICS_DIR=directory), mock.patch.object(
+            store.time, "sleep", side_effect=finish_write
+        ) as sleep:
+            self.assertEqual(store.collect(), {"requests": 2.0})
+        sleep.assert_called_once()
+        values.close()
+
+
+@override_settings(METRICS_DIR=tempfile.mkdtemp(dir=METRICS_DIR))
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_histogram_exposition(self):
+        """Гистограмма отдаёт накопительные корзины, сумму и счётчик."""
+        histogram = Histogram(
+            "test_seconds", "Тест.", ("view",), buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.5, view="a")
+        histogram.observe(2, view="a")
+        text = exposition(store.collect())
+        self.assertIn("# TYPE test_seconds histogram", text)
+        self.assertIn('test_seconds_bucket{view="a",le="0.1"} 0.0', text)
+        self.assertIn('test_seconds_bucket{view="a",le="1.0"} 1.0', text)
+        self.assertIn('test_seconds_bucket{view="a",le="+Inf"} 2.0', text)
+        self.assertIn('test_seconds_sum{view="a"} 2.5', text)
+        with self.assertRaises(ValueError):
+            Counter("test_total", "Тест.", ("view",)).inc()
+
+    def test_endpoint_reports_views_db_and_feed_cache(self):
+        """/metrics показывает запросы, БД и попадания в кэш ленты."""
+        client = Client()
+        client.get(reverse("posts:index"))
+        client.get(reverse("posts:index"))
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        self.assertIn(
+            'yatube_http_requests_total{view="posts:index",status="200"}',
+            text,
+        )
+        self.assertIn(
+            'yatube_http_request_duration_seconds_count{view="posts:index"}',
+            text,
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', text)
+        self.assertIn('yatube_feed_cache_requests_total{result="hit"}', text)
+        self.assertIn('yatube_feed_cache_requests_total{result="miss"}', text)
@@ -0,0 +1,79 @@
+import io
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import profiling
+
+PROFILE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    PROFILE_SAMPLE_RATE=2, PROFILE_INTERVAL=0.001, PROFILE_DIR=PROFILE_DIR
+)
+class SamplingProfilerTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        profiling.clear_samples(PROFILE_DIR)
+
+    def test_category_is_taken_from_deepest_frame(self):
+        """Время относится к категории самого глубокого кадра."""
+        stack = [
+            "/site-packages/django/template/base.py",
+            "/site-packages/django/db/models/query.py",
+            "/yatube/posts/views.py",
+        ]
+        self.assertEqual(profiling.category(stack), "db")
+        self.assertEqual(profiling.category(stack[:1]), "templates")
+        self.assertEqual(profiling.category(stack[2:]), profiling.OTHER)
+
+    def test_sampler_records_stack_of_target_thread(self):
+        """Сэмплер снимает стек профилируемого потока."""
+        def slow_function():
+            time.sleep(0.05)
+
+        worker = threading.Thread(target=slow_function)
+        worker.start()
+        sampler = profiling.StackSampler(worker.ident, 0.001)
+        sampler.start()
+        worker.join()
+        sampler.stop()
+        self.assertTrue(
+            any("slow_function" in stack for stack in sampler.stacks)
+        )
+
+    def test_every_nth_request_is_profiled(self):
+        """Профилируется каждый N-й запрос, отчёт группирует по видам."""
+        client = Client()
+        for _ in range(4):
+            client.get(reverse("posts:index"))
+        samples = list(profiling.read_samples(PROFILE_DIR))
+        self.assertEqual(len(samples), 2)
+        self.assertEqual(samples[0]["view"], "posts:index")
+
+        output = io.StringIO()
+        call_command("dump_profiles", stdout=output)
+        self.assertIn("posts:index: 2 запросов", output.getvalue())
+        output = io.StringIO()
+        call_command("dump_profiles", "--folded", stdout=output)
+        for line in output.getvalue().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("posts:index;"))
+            self.assertTrue(count.isdigit())
+
+    @override_settings(PROFILE_SAMPLE_RATE=0)
+    def test_disabled_profiler_writes_nothing(self):
+        """При PROFILE_SAMPLE_RATE = 0 профили не пишутся."""
+        Client().get(reverse("posts:index"))
+        self.assertEqual(list(profiling.read_samples(PROFILE_DIR)), [])
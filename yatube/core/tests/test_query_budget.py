@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..query_budget import QueryBudgetTestMixin, budgets, fingerprint
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fingerprint_hides_literals_and_list_length(self):
+        """Отпечаток одинаков для запросов, отличающихся параметрами."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s) LIMIT 21'),
+            fingerprint("SELECT * FROM \"t\" WHERE \"id\" IN (%s)  LIMIT 5"),
+        )
+        self.assertEqual(
+            fingerprint("SELECT 'a''b', 10"), fingerprint("SELECT 'c', 2.5")
+        )
+
+    def test_overrun_is_logged_with_fingerprints(self):
+        """Превышение бюджета пишется в лог вместе с отпечатками SQL."""
+        with mock.patch.dict(budgets, {"posts:index": 0}), self.assertLogs(
+            "core.query_budget", "WARNING"
+        ) as logs:
+            response = Client().get(reverse("posts:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("posts:index", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+        with self.assertRaises(AssertionError):
+            self.assertWithinQueryBudget(response)
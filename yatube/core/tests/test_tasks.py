@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from .. import tasks
+
+TASKS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+calls = []
+
+
+@tasks.task
+def remember(value):
+    calls.append(value)
+
+
+@tasks.task
+def wait_for_others(count):
+    """Ждёт, пока остальные задачи выполнятся в других потоках."""
+    for _ in range(200):
+        if len(calls) >= count:
+            break
+        threading.Event().wait(0.01)
+    calls.append(f"дождалась {len(calls)}")
+
+
+@tasks.task
+def explode():
+    raise ValueError("сбой")
+
+
+class JobTableTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TASKS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        calls.clear()
+        self.path = tempfile.mktemp(suffix=".sqlite3", dir=TASKS_DIR)
+        self.table = tasks.JobTable(self.path)
+
+    def put(self, func, **payload):
+        return self.table.put(
+            func.task_name, payload, tasks.idempotency_key(func, payload)
+        )
+
+    def test_pending_duplicates_are_ignored(self):
+        """Та же задача, пока ждёт запуска, ставится один раз."""
+        self.assertTrue(self.put(remember, value=1))
+        self.assertFalse(self.put(remember, value=1))
+        self.assertTrue(self.put(remember, value=2))
+        self.assertEqual(tasks.drain(self.table), 2)
+        self.assertEqual(sorted(calls), [1, 2])
+        self.assertTrue(self.put(remember, value=1))
+
+    def test_jobs_survive_restart(self):
+        """Новый экземпляр таблицы видит задачи, поставленные прежним."""
+        self.put(remember, value="после перезапуска")
+        self.assertEqual(tasks.drain(tasks.JobTable(self.path)), 1)
+        self.assertEqual(calls, ["после перезапуска"])
+
+    def test_failed_job_is_retried_then_parked(self):
+        """Упавшая задача откладывается с паузой, затем помечается failed."""
+        self.put(explode)
+        with mock.patch.object(tasks, "TASK_RETRY_DELAY", 0):
+            for _ in range(tasks.TASK_ATTEMPTS):
+                self.assertEqual(tasks.drain(self.table), 1)
+        self.assertEqual(tasks.drain(self.table), 0)
+        self.assertEqual(len(self.table), 0)
+
+        self.put(explode)
+        tasks.drain(self.table)
+        self.assertEqual(len(self.table), 1)
+        self.assertEqual(tasks.drain(self.table), 0)
+
+    def test_abandoned_jobs_are_recovered(self):
+        """Захваченные упавшим воркером задачи возвращаются в очередь."""
+        self.put(remember, value=1)
+        self.assertEqual(len(self.table.claim(10)), 1)
+        self.assertEqual(self.table.recover(), 0)
+        self.assertEqual(self.table.recover(lease=-1), 1)
+        self.assertEqual(tasks.drain(self.table), 1)
+
+    def test_worker_runs_jobs_in_thread_pool(self):
+        """run_worker выполняет задачи в потоках."""
+        for value in range(5):
+            self.put(remember, value=value)
+        self.assertEqual(
+            tasks.run_worker(self.table, threads=3, once=True), 5
+        )
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertEqual(len(self.table), 0)
+
+    def test_worker_claims_jobs_as_threads_free_up(self):
+        """Долгая задача не мешает остальным потокам брать новые."""
+        self.put(wait_for_others, count=6)
+        for value in range(6):
+            self.put(remember, value=value)
+        self.assertEqual(
+            tasks.run_worker(self.table, threads=2, once=True), 7
+        )
+        self.assertEqual(calls[-1], "дождалась 6")
+
+    def test_enqueue_runs_inline_without_tasks_db(self):
+        """Без TASKS_DB задача выполняется сразу."""
+        with self.settings(TASKS_DB=""):
+            tasks.enqueue(remember, value="сразу")
+        self.assertEqual(calls, ["сразу"])
+
+    def test_enqueue_waits_for_commit(self):
+        """С TASKS_DB задача ставится в таблицу после фиксации."""
+        with self.settings(TASKS_DB=self.path), mock.patch.object(
+            tasks.transaction, "on_commit"
+        ) as on_commit:
+            tasks.enqueue(remember, value="потом")
+            self.assertEqual(len(self.table), 0)
+            on_commit.call_args[0][0]()
+        self.assertEqual(calls, [])
+        self.assertEqual(len(self.table), 1)
@@ -0,0 +1,75 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.template import Context, Engine
+from django.test import TestCase, override_settings
+
+TEMPLATES_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_engine(debug):
+    return Engine(
+        dirs=[TEMPLATES_DIR],
+        debug=debug,
+        loaders=[
+            (
+                "core.template_loader.Loader",
+                ["django.template.loaders.filesystem.Loader"],
+            )
+        ],
+    )
+
+
+class TemplateLoaderTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMPLATES_DIR, ignore_errors=True)
+
+    def write(self, name, content, mtime):
+        path = os.path.join(TEMPLATES_DIR, name)
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def test_changed_file_is_recompiled_in_debug(self):
+        """В DEBUG изменённый шаблон компилируется заново."""
+        self.write("debug.html", "первая", 1_000_000)
+        engine = make_engine(debug=True)
+        template = engine.get_template("debug.html")
+        self.assertIs(engine.get_template("debug.html"), template)
+        self.write("debug.html", "вторая", 2_000_000)
+        self.assertEqual(
+            engine.get_template("debug.html").render(Context()),
+            "вторая",
+        )
+
+    def test_template_is_served_from_memory_without_debug(self):
+        """Без DEBUG файл не перечитывается."""
+        self.write("production.html", "первая", 1_000_000)
+        engine = make_engine(debug=False)
+        template = engine.get_template("production.html")
+        self.write("production.html", "вторая", 2_000_000)
+        self.assertIs(engine.get_template("production.html"), template)
+
+    def test_precompile_command(self):
+        """Команда компилирует все шаблоны и падает на ошибке."""
+        stdout = io.StringIO()
+        call_command("precompile_templates", stdout=stdout)
+        self.assertIn("Скомпилировано шаблонов", stdout.getvalue())
+        self.write("broken.html", "{% if %}", 1_000_000)
+        broken = [
+            {
+                **settings.TEMPLATES[0],
+                "DIRS": [TEMPLATES_DIR],
+            }
+        ]
+        with override_settings(TEMPLATES=broken):
+            with self.assertRaises(CommandError):
+                call_command(
+                    "precompile_templates", stderr=io.StringIO()
+                )
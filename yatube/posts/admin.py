@@ -1,20 +1,62 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
 
+from . import dataset, search
 from .models import Comment, Follow, Group, Post
 
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_action(output_format):
+    def export(modeladmin, request, queryset):
+        name = dataset.dataset_of(modeladmin.model)
+        response = StreamingHttpResponse(
+            dataset.lines(
+                name, dataset.rows(name, queryset), output_format
+            ),
+            content_type=f"{CONTENT_TYPES[output_format]}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{output_format}"'
+        )
+        return response
+
+    export.__name__ = f"export_{output_format}"
+    export.short_description = f"Выгрузить выбранные в {output_format}"
+    return export
+
+
+EXPORT_ACTIONS = tuple(map(_export_action, dataset.FORMATS))
+
+
+class IndexedSearchMixin:
+    """Поиск в админке по инвертированному индексу вместо LIKE '%...%'."""
+
+    search_lookup = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        # Админке нужны все совпадения, а не первая страница поиска.
+        found = self.search_lookup(search_term, limit=None)
+        return queryset.filter(pk__in=found), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("pk", "title", "description")
     search_fields = ("title",)
     list_filter = ("title",)
+    actions = EXPORT_ACTIONS
     empty_value_display = "-пусто-"
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
     list_editable = ("group",)
     search_fields = ("text",)
+    search_lookup = staticmethod(search.search_posts)
     list_filter = ("pub_date",)
+    actions = EXPORT_ACTIONS
     empty_value_display = "-пусто-"
 
 
@@ -22,10 +64,11 @@ class FollowAdmin(admin.ModelAdmin):
     list_display = ("pk", "user", "author")
     search_fields = ("user",)
     list_filter = ("user",)
+    actions = EXPORT_ACTIONS
     empty_value_display = "-пусто-"
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         "pk",
         "post",
@@ -34,10 +77,12 @@ class CommentAdmin(admin.ModelAdmin):
         "author",
     )
     search_fields = ("text",)
+    search_lookup = staticmethod(search.search_comments)
     list_filter = (
         "created",
         "author",
     )
+    actions = EXPORT_ACTIONS
     empty_value_display = "-пусто-"
 
 
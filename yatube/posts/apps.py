@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core import query_budget
+
+        from . import signals  # noqa: F401
+        from .constants import QUERY_BUDGETS
+
+        query_budget.register(QUERY_BUDGETS)
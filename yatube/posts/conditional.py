@@ -0,0 +1,119 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .feed_cache import SITE_SCOPE, feed_key
+from .models import Post
+from .versions import bump, current, version_key
+
+NANOSECONDS: int = 10 ** 9
+
+
+def feed_state(scope):
+    """Версии ленты: те же, что входят в ключ её кэша страниц."""
+
+    def state(*args, **kwargs):
+        return current(
+            (feed_key(scope(*args, **kwargs)), feed_key(SITE_SCOPE))
+        )
+
+    return state
+
+
+def post_meta_key(post_id):
+    return f"post_meta:{post_id}"
+
+
+def expire_post(post_id):
+    bump(version_key("post", post_id))
+
+
+def remember_post(post):
+    """После сохранения: автор и группа для post_state, новая версия."""
+    cache.set(post_meta_key(post.pk), (post.author_id, post.group_id), None)
+    expire_post(post.pk)
+
+
+def forget_post(post_id):
+    cache.delete(post_meta_key(post_id))
+    expire_post(post_id)
+
+
+def post_state(post_id):
+    """Версии страницы поста, обычно без запросов к БД.
+
+    Правки поста, миниатюры и комментарии сдвигают версию post, число
+    постов автора — author_posts, переименования — author и group.
+    Автор и группа поста берутся из кэша, при промахе — одной выборкой
+    по ключу.
+    """
+    meta = cache.get(post_meta_key(post_id))
+    if meta is None:
+        meta = (
+            Post.objects.filter(pk=post_id)
+            .order_by()
+            .values_list("author_id", "group_id")
+            .first()
+        )
+        if meta is None:
+            return None
+        cache.set(post_meta_key(post_id), meta, None)
+    author_id, group_id = meta
+    keys = [
+        version_key("post", post_id),
+        version_key("author", author_id),
+        version_key("author_posts", author_id),
+    ]
+    if group_id:
+        keys.append(version_key("group", group_id))
+    return current(keys)
+
+
+def conditional(state):
+    """ETag и Last-Modified для анонимных GET/HEAD, 304 без рендера.
+
+    state(*args, **kwargs) отдаёт словарь версий страницы (наносекунды)
+    или None, если условный ответ невозможен. ETag — хэш версий,
+    Last-Modified — самая свежая из них. Проверка идёт до кэша страниц
+    и до вида; Cache-Control: no-cache заставляет браузер каждый раз
+    переспрашивать сервер вместо того, чтобы держать устаревшую копию.
+    Ответы вошедшим пользователям персональны и не трогаются.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method not in ("GET", "HEAD")
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            versions = state(*args, **kwargs)
+            if versions is None:
+                return view(request, *args, **kwargs)
+            digest = hashlib.md5(
+                ":".join(
+                    f"{key}={value}" for key, value in sorted(versions.items())
+                ).encode()
+            ).hexdigest()
+            etag = quote_etag(digest)
+            last_modified = max(versions.values()) // NANOSECONDS
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response["ETag"] = etag
+                response["Last-Modified"] = http_date(last_modified)
+                if response.has_header("Expires"):
+                    del response["Expires"]
+                patch_cache_control(response, no_cache=True, max_age=0)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,53 @@
 POSTS_PER_PAGE: int = 10
+COMMENTS_PER_PAGE: int = 20
+# ?order= -> порядок комментариев; первый — по умолчанию.
+COMMENT_ORDERINGS: dict = {
+    "new": ("-created", "-pk"),
+    "old": ("created", "pk"),
+}
 FIRST_15: int = 15
-PAGE_CACHE_INTERVAL: int = 3
+FEED_CACHE_TIMEOUT: int = 60 * 60 * 6
+TIMELINE_LENGTH: int = 800
+TIMELINE_FAN_OUT_LIMIT: int = 5000
+POPULAR_AUTHORS_CACHE_TIMEOUT: int = 60 * 60
+CARD_CACHE_TIMEOUT: int = 60 * 60 * 24
+CARD_THUMBNAIL: str = "960x339"
+THUMBNAIL_SIZES: dict = {
+    CARD_THUMBNAIL: {"crop": "center", "upscale": True},
+}
+THUMBNAIL_JOB_ATTEMPTS: int = 3
+THUMBNAIL_REDIRECT_MAX_AGE: int = 60 * 60
+IMAGE_VARIANTS: str = "variants"
+VARIANT_WIDTHS: tuple = (320, 640, 960)
+VARIANT_FORMATS: tuple = (
+    ("image/avif", "AVIF", "avif"),
+    ("image/webp", "WEBP", "webp"),
+    ("image/jpeg", "JPEG", "jpg"),
+)
+SEARCH_RESULTS_LIMIT: int = 200
+SEARCH_POST_WEIGHT: int = 2
+SEARCH_TERM_LENGTH: int = 64
+SEARCH_FREQUENCY_CACHE_TIMEOUT: int = 60 * 10
+EXPORT_CHUNK_SIZE: int = 2000
+IMPORT_BATCH_SIZE: int = 500
+# Запросов к БД на запрос с учётом сессии и пользователя, при холодном
+# кэше; N+1 в шаблоне карточки выходит за бюджет на первой же странице.
+QUERY_BUDGETS: dict = {
+    "posts:index": 5,
+    "posts:group_list": 6,
+    "posts:profile": 7,
+    "posts:post_detail": 6,
+    "posts:post_comments": 3,
+    "posts:follow_index": 6,
+    "posts:search": 6,
+    "posts:user_fragments": 4,
+    "posts:post_thumbnail": 2,
+    "posts:post_create": 11,
+    "posts:post_edit": 11,
+    "posts:add_comment": 9,
+    "posts:profile_follow": 15,
+    "posts:profile_unfollow": 11,
+}
+UPLOAD_SIZE_BUCKETS: tuple = (
+    2 ** 14, 2 ** 16, 2 ** 18, 2 ** 20, 2 ** 21, 2 ** 22, 2 ** 23, 2 ** 24,
+)
@@ -0,0 +1,89 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from . import timeline
+from .constants import TIMELINE_FAN_OUT_LIMIT
+from .models import Comment, Follow, Group, Post, User, UserCounters
+
+
+def _shift(queryset, field, delta):
+    queryset.update(**{field: F(field) + delta})
+
+
+def post_added(post, delta=1):
+    _shift(
+        UserCounters.objects.filter(user_id=post.author_id),
+        "posts_count",
+        delta,
+    )
+    if post.group_id:
+        _shift(Group.objects.filter(pk=post.group_id), "posts_count", delta)
+
+
+def post_moved(old_group_id, new_group_id):
+    if old_group_id:
+        _shift(Group.objects.filter(pk=old_group_id), "posts_count", -1)
+    if new_group_id:
+        _shift(Group.objects.filter(pk=new_group_id), "posts_count", 1)
+
+
+def comment_added(comment, delta=1):
+    _shift(
+        Post.objects.filter(pk=comment.post_id), "comments_count", delta
+    )
+
+
+def follow_added(follow, delta=1):
+    _shift(
+        UserCounters.objects.filter(user_id=follow.user_id),
+        "following_count",
+        delta,
+    )
+    _shift(
+        UserCounters.objects.filter(user_id=follow.author_id),
+        "followers_count",
+        delta,
+    )
+
+
+def _count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def rebuild():
+    """Пересчитывает все счётчики целиком: по UPDATE на таблицу.
+
+    Затем сверяет флаги популярности с новым числом подписчиков.
+    """
+    UserCounters.objects.bulk_create(
+        (
+            UserCounters(user_id=pk)
+            for pk in User.objects.filter(counters=None).values_list(
+                "pk", flat=True
+            ).iterator()
+        ),
+        batch_size=1000,
+    )
+    UserCounters.objects.update(
+        posts_count=_count_of(Post, "author"),
+        followers_count=_count_of(Follow, "author"),
+        following_count=_count_of(Follow, "user"),
+    )
+    Group.objects.update(posts_count=_count_of(Post, "group"))
+    Post.objects.update(comments_count=_count_of(Comment, "post"))
+    outdated = UserCounters.objects.filter(
+        Q(is_popular=True, followers_count__lt=TIMELINE_FAN_OUT_LIMIT)
+        | Q(is_popular=False, followers_count__gte=TIMELINE_FAN_OUT_LIMIT)
+    ).values_list("user_id", flat=True)
+    for author_id in list(outdated):
+        if timeline.update_popularity(author_id) is False:
+            timeline.backfill_followers(author_id)
@@ -0,0 +1,120 @@
+import csv
+import json
+from datetime import datetime
+
+from .constants import EXPORT_CHUNK_SIZE
+from .models import Comment, Follow, Group, Post
+
+FORMATS: tuple = ("ndjson", "csv")
+
+# Набор данных -> (модель, ((колонка, lookup), ...)). Авторы и группы
+# выгружаются по username и slug, чтобы файл можно было загрузить
+# в другую базу с другими id.
+DATASETS: dict = {
+    "groups": (
+        Group,
+        (
+            ("id", "id"),
+            ("title", "title"),
+            ("slug", "slug"),
+            ("description", "description"),
+        ),
+    ),
+    "posts": (
+        Post,
+        (
+            ("id", "id"),
+            ("author", "author__username"),
+            ("group", "group__slug"),
+            ("text", "text"),
+            ("pub_date", "pub_date"),
+            ("image", "image"),
+        ),
+    ),
+    "comments": (
+        Comment,
+        (
+            ("id", "id"),
+            ("post", "post_id"),
+            ("author", "author__username"),
+            ("text", "text"),
+            ("created", "created"),
+        ),
+    ),
+    "follows": (
+        Follow,
+        (
+            ("id", "id"),
+            ("user", "user__username"),
+            ("author", "author__username"),
+        ),
+    ),
+}
+
+
+def dataset_of(model):
+    return next(
+        name
+        for name, (dataset_model, _) in DATASETS.items()
+        if dataset_model is model
+    )
+
+
+def columns(dataset):
+    return [column for column, _ in DATASETS[dataset][1]]
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def rows(
+    dataset,
+    queryset=None,
+    after_id=None,
+    until_id=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
+):
+    """Строки набора по возрастанию id, без загрузки таблицы в память.
+
+    after_id и until_id задают полуинтервал (after_id, until_id] —
+    прерванную выгрузку продолжают с последнего записанного id.
+    """
+    model, fields = DATASETS[dataset]
+    if queryset is None:
+        queryset = model.objects.all()
+    if after_id is not None:
+        queryset = queryset.filter(pk__gt=after_id)
+    if until_id is not None:
+        queryset = queryset.filter(pk__lte=until_id)
+    names = [column for column, _ in fields]
+    values = queryset.order_by("pk").values_list(
+        *(lookup for _, lookup in fields)
+    )
+    for row in values.iterator(chunk_size=chunk_size):
+        yield dict(zip(names, map(_plain, row)))
+
+
+def ndjson_lines(dataset, rows):
+    for row in rows:
+        yield json.dumps({"model": dataset, **row}, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(dataset, rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=columns(dataset))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def lines(dataset, rows, output_format):
+    if output_format == "csv":
+        return csv_lines(dataset, rows)
+    return ndjson_lines(dataset, rows)
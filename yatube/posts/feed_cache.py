@@ -0,0 +1,107 @@
+from functools import wraps
+
+from django.middleware.cache import CacheMiddleware
+
+from .constants import FEED_CACHE_TIMEOUT
+from .metrics import FEED_CACHE
+from .models import Group
+from .versions import bump, current, version_key
+
+SITE_SCOPE: str = "site"
+
+
+def index_scope():
+    return "index"
+
+
+def group_scope(slug):
+    return f"group:{slug}"
+
+
+def profile_scope(username):
+    return f"profile:{username}"
+
+
+def feed_key(scope):
+    return version_key("feed", scope)
+
+
+def key_prefix(scope):
+    keys = (feed_key(scope), feed_key(SITE_SCOPE))
+    versions = current(keys)
+    return f"feed:{scope}:" + ":".join(str(versions[key]) for key in keys)
+
+
+def viewer(request):
+    """Чья копия страницы: меню и кнопка подписки у каждого свои."""
+    if request.user.is_authenticated:
+        return f"user{request.user.pk}"
+    return "anonymous"
+
+
+def revalidate_in_browser(response):
+    """Копия живёт на сервере часами, но браузер её не хранит.
+
+    CacheMiddleware выставляет Expires и max-age на весь свой таймаут,
+    а сдвиг поколения сбрасывает только серверную копию — браузер
+    показывал бы старую ленту до шести часов.
+    """
+    if response.has_header("Expires"):
+        del response["Expires"]
+    response["Cache-Control"] = "private, no-cache, max-age=0"
+    return response
+
+
+def cache_feed(scope):
+    """Кэширует ленту, пока не сдвинется поколение её области.
+
+    Поколение входит в key_prefix CacheMiddleware, поэтому сдвиг одной
+    версии разом устаревает все страницы ленты (в том числе с ?cursor=)
+    для всех пользователей, а TTL можно держать в часах. Декоратор
+    работает до SessionMiddleware.process_response, и Vary: Cookie в
+    ключ не попадает, поэтому зритель входит в key_prefix явно: гости
+    делят одну копию, у вошедших — своя.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            prefix = key_prefix(scope(*args, **kwargs))
+            middleware = CacheMiddleware(
+                cache_timeout=FEED_CACHE_TIMEOUT,
+                key_prefix=f"{prefix}:{viewer(request)}",
+            )
+            response = middleware.process_request(request)
+            if response is not None:
+                FEED_CACHE.inc(result="hit")
+                return revalidate_in_browser(response)
+            if request.method in ("GET", "HEAD"):
+                FEED_CACHE.inc(result="miss")
+            response = view(request, *args, **kwargs)
+            return revalidate_in_browser(
+                middleware.process_response(request, response)
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def expire_post_feeds(post, *group_ids):
+    group_ids = {post.group_id, *group_ids} - {None}
+    scopes = [index_scope(), profile_scope(post.author.username)]
+    scopes += [
+        group_scope(slug)
+        for slug in Group.objects.filter(pk__in=group_ids).values_list(
+            "slug", flat=True
+        )
+    ]
+    bump(*(feed_key(scope) for scope in scopes))
+
+
+def expire_profile_feed(username):
+    bump(feed_key(profile_scope(username)))
+
+
+def expire_all_feeds():
+    bump(feed_key(SITE_SCOPE))
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .constants import CARD_CACHE_TIMEOUT
+from .metrics import CARD_CACHE
+from .versions import current, version_key
+
+CARD_TEMPLATE: str = "includes/card.html"
+
+
+def _versions(posts):
+    keys = {version_key("author", post.author_id) for post in posts}
+    keys |= {
+        version_key("group", post.group_id) for post in posts if post.group_id
+    }
+    return current(keys)
+
+
+def card_key(post, versions, variant):
+    group_version = (
+        versions[version_key("group", post.group_id)] if post.group_id else 0
+    )
+    return ":".join(
+        str(part)
+        for part in (
+            "card",
+            post.pk,
+            post.updated_at.timestamp(),
+            versions[version_key("author", post.author_id)],
+            group_version,
+            variant,
+        )
+    )
+
+
+def render_cards(posts, is_author_hidden=False, to_show_groups=False):
+    """Собирает карточки страницы из кэша, дорисовывая недостающие.
+
+    Ключ карточки включает updated_at поста и версии автора и группы,
+    поэтому правка поста, переименование группы или смена имени автора
+    просто приводят к промаху — старые фрагменты доживают свой таймаут.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    versions = _versions(posts)
+    variant = f"{int(bool(is_author_hidden))}{int(bool(to_show_groups))}"
+    keys = [card_key(post, versions, variant) for post in posts]
+    cached = cache.get_many(keys)
+    rendered = {}
+    for post, key in zip(posts, keys):
+        if key not in cached:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE,
+                {
+                    "post": post,
+                    "is_author_hidden": is_author_hidden,
+                    "to_show_groups": to_show_groups,
+                },
+            )
+    CARD_CACHE.inc(len(cached), result="hit")
+    CARD_CACHE.inc(len(rendered), result="miss")
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+        cached.update(rendered)
+    return [mark_safe(cached[key]) for key in keys]
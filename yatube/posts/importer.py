@@ -0,0 +1,354 @@
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from . import counters, feed_cache, search, thumbnails, timeline
+from .constants import IMPORT_BATCH_SIZE
+from .dataset import DATASETS
+from .models import (
+    Comment,
+    Follow,
+    Group,
+    ImportedComment,
+    ImportedPost,
+    Post,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream, dataset):
+    for row in csv.DictReader(stream):
+        yield {"model": dataset, **row}
+
+
+def batches(records, size):
+    """Нарезает поток записей на пачки одного набора данных."""
+    batch, dataset = [], None
+    for record in records:
+        if batch and (record["model"] != dataset or len(batch) >= size):
+            yield dataset, batch
+            batch = []
+        dataset = record["model"]
+        batch.append(record)
+    if batch:
+        yield dataset, batch
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Importer:
+    """Загружает выгрузку export_yatube пачками через bulk_create.
+
+    Сигналы при bulk_create не срабатывают, поэтому счётчики, поисковый
+    индекс, ленты подписок и очередь миниатюр обновляются одним проходом
+    в finish(), и каждая затронутая лента пересобирается один раз. id
+    постов и комментариев назначает база, а соответствие id выгрузки
+    хранится в ImportedPost и ImportedComment: комментарии находят свои
+    посты и тогда, когда наборы загружаются отдельными файлами и
+    запусками, а повторный импорт уже загруженного пропускается.
+    """
+
+    def __init__(
+        self,
+        batch_size=IMPORT_BATCH_SIZE,
+        media_from=None,
+        image_workers=4,
+        report=None,
+    ):
+        self.batch_size = batch_size
+        self.media_from = media_from
+        self.image_workers = image_workers
+        self.report = report or (lambda dataset, total, rate: None)
+        self.users = {}
+        self.groups = {}
+        self.post_ids = []
+        self.comment_ids = []
+        self.imported = dict.fromkeys(DATASETS, 0)
+        self.skipped = dict.fromkeys(DATASETS, 0)
+        self.failed_images = 0
+        self.copies = []
+        self.follow_pairs = set()
+        self.post_authors = set()
+
+    def run(self, records):
+        started = time.monotonic()
+        executor = (
+            ThreadPoolExecutor(self.image_workers) if self.media_from else None
+        )
+        try:
+            for dataset, rows in batches(records, self.batch_size):
+                if dataset not in DATASETS:
+                    raise ValueError(f"Неизвестный набор: {dataset}")
+                skipped = self.skipped[dataset]
+                with transaction.atomic():
+                    getattr(self, f"import_{dataset}")(rows, executor)
+                self.imported[dataset] += len(rows) - (
+                    self.skipped[dataset] - skipped
+                )
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.report(
+                    dataset,
+                    self.imported[dataset],
+                    sum(self.imported.values()) / elapsed,
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.failed_images = sum(
+            not future.result() for future in self.copies
+        )
+        self.finish()
+        return self.imported
+
+    def _resolve_users(self, usernames):
+        missing = set(usernames) - self.users.keys() - {None, ""}
+        if missing:
+            self._load_users(missing)
+            new = missing - self.users.keys()
+            User.objects.bulk_create(
+                User(username=username, password=make_password(None))
+                for username in new
+            )
+            self._load_users(new)
+        return self.users
+
+    def _load_users(self, usernames):
+        self.users.update(
+            User.objects.filter(username__in=usernames).values_list(
+                "username", "pk"
+            )
+        )
+
+    def _resolve_groups(self, slugs):
+        missing = set(slugs) - self.groups.keys() - {None, ""}
+        if missing:
+            self.groups.update(
+                Group.objects.filter(slug__in=missing).values_list(
+                    "slug", "pk"
+                )
+            )
+        return self.groups
+
+    def _copy_image(self, name):
+        if default_storage.exists(name):
+            return True
+        try:
+            with open(os.path.join(self.media_from, name), "rb") as source:
+                default_storage.save(name, File(source))
+        except OSError:
+            logger.warning("Не удалось скопировать картинку %s", name)
+            return False
+        return True
+
+    def import_groups(self, rows, executor):
+        groups = self._resolve_groups(row["slug"] for row in rows)
+        Group.objects.bulk_create(
+            Group(
+                title=row["title"],
+                slug=row["slug"],
+                description=row["description"],
+            )
+            for row in rows
+            if row["slug"] not in groups
+        )
+        self.groups.update(
+            Group.objects.filter(
+                slug__in=[row["slug"] for row in rows]
+            ).values_list("slug", "pk")
+        )
+
+    def import_posts(self, rows, executor):
+        users = self._resolve_users(row["author"] for row in rows)
+        groups = self._resolve_groups(row["group"] for row in rows)
+        imported = set(
+            ImportedPost.objects.filter(
+                source_id__in=[int(row["id"]) for row in rows]
+            ).values_list("source_id", flat=True)
+        )
+        source_ids, posts = [], []
+        for row in rows:
+            source_id = int(row["id"])
+            if source_id in imported:
+                self.skipped["posts"] += 1
+                continue
+            imported.add(source_id)
+            author_id = users[row["author"]]
+            self.post_authors.add(author_id)
+            source_ids.append(source_id)
+            posts.append(
+                Post(
+                    author_id=author_id,
+                    group_id=groups.get(row["group"]),
+                    text=row["text"],
+                    pub_date=parse_datetime(row["pub_date"]),
+                    image=row["image"] or "",
+                )
+            )
+            if row["image"] and executor is not None:
+                self.copies.append(
+                    executor.submit(self._copy_image, row["image"])
+                )
+        self._insert(Post, posts, "pub_date")
+        ImportedPost.objects.bulk_create(
+            ImportedPost(source_id=source_id, post_id=post.pk)
+            for source_id, post in zip(source_ids, posts)
+        )
+        self.post_ids.extend(post.pk for post in posts)
+
+    def import_comments(self, rows, executor):
+        users = self._resolve_users(row["author"] for row in rows)
+        post_ids = dict(
+            ImportedPost.objects.filter(
+                source_id__in=[int(row["post"]) for row in rows]
+            ).values_list("source_id", "post_id")
+        )
+        imported = set(
+            ImportedComment.objects.filter(
+                source_id__in=[int(row["id"]) for row in rows]
+            ).values_list("source_id", flat=True)
+        )
+        source_ids, comments = [], []
+        for row in rows:
+            source_id = int(row["id"])
+            post_id = post_ids.get(int(row["post"]))
+            if source_id in imported or post_id is None:
+                self.skipped["comments"] += 1
+                continue
+            imported.add(source_id)
+            source_ids.append(source_id)
+            comments.append(
+                Comment(
+                    post_id=post_id,
+                    author_id=users[row["author"]],
+                    text=row["text"],
+                    created=parse_datetime(row["created"]),
+                )
+            )
+        self._insert(Comment, comments, "created")
+        ImportedComment.objects.bulk_create(
+            ImportedComment(source_id=source_id, comment_id=comment.pk)
+            for source_id, comment in zip(source_ids, comments)
+        )
+        self.comment_ids.extend(comment.pk for comment in comments)
+
+    def _insert(self, model, objects, field):
+        """bulk_create с id от базы и датами из файла.
+
+        bulk_create подставляет в поле auto_now_add текущее время, поэтому
+        даты из выгрузки возвращаются одним bulk_update в той же
+        транзакции — без правки общих для процесса объектов полей.
+        """
+        if not objects:
+            return
+        dates = [getattr(obj, field) for obj in objects]
+        model.objects.bulk_create(objects)
+        if objects[0].pk is None:
+            # SQLite не возвращает id из bulk_create. Вставка держит
+            # блокировку записи до конца транзакции, поэтому последние
+            # len(objects) id — наши, в порядке вставки.
+            pks = model.objects.order_by("-pk").values_list(
+                "pk", flat=True
+            )[:len(objects)]
+            for obj, pk in zip(objects, sorted(pks)):
+                obj.pk = pk
+        for obj, date in zip(objects, dates):
+            setattr(obj, field, date)
+        model.objects.bulk_update(objects, [field])
+
+    def import_follows(self, rows, executor):
+        users = self._resolve_users(
+            username
+            for row in rows
+            for username in (row["user"], row["author"])
+        )
+        pairs = set()
+        for row in rows:
+            if not row["author"] or row["user"] == row["author"]:
+                self.skipped["follows"] += 1
+                continue
+            pairs.add((users[row["user"]], users[row["author"]]))
+        Follow.objects.bulk_create(
+            (
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in pairs
+            ),
+            ignore_conflicts=True,
+        )
+        self.follow_pairs |= pairs
+
+    def finish(self):
+        """Проход после загрузки: всё, что обычно делают сигналы."""
+        counters.rebuild()
+        self._index_new_rows()
+        self._fill_timelines()
+        self._schedule_thumbnails()
+        feed_cache.expire_all_feeds()
+
+    def _index_new_rows(self):
+        index = search.get_index()
+        for chunk in chunks(self.post_ids, self.batch_size):
+            index.add(
+                (
+                    (search.POST, pk, pk, text)
+                    for pk, text in Post.objects.filter(
+                        pk__in=chunk
+                    ).values_list("pk", "text")
+                ),
+                replace=False,
+            )
+        for chunk in chunks(self.comment_ids, self.batch_size):
+            index.add(
+                (
+                    (search.COMMENT, pk, post_id, text)
+                    for pk, post_id, text in Comment.objects.filter(
+                        pk__in=chunk
+                    ).values_list("pk", "post_id", "text")
+                ),
+                replace=False,
+            )
+
+    def _fill_timelines(self):
+        user_ids = {user_id for user_id, _ in self.follow_pairs}
+        for author_ids in chunks(self.post_authors, self.batch_size):
+            user_ids.update(
+                Follow.objects.filter(author_id__in=author_ids).values_list(
+                    "user_id", flat=True
+                )
+            )
+        timeline.rebuild(sorted(user_ids))
+
+    def _schedule_thumbnails(self):
+        queue = thumbnails.get_queue()
+        for chunk in chunks(self.post_ids, self.batch_size):
+            posts = (
+                Post.objects.filter(pk__in=chunk)
+                .exclude(image="")
+                .values_list("pk", "image")
+            )
+            for pk, image in posts:
+                queue.put({"post_id": pk, "image": image})
@@ -0,0 +1,58 @@
+"""Побочные эффекты записи, которые можно отложить до воркера.
+
+Задачи получают id, а не объекты, и перечитывают строки при запуске:
+к этому времени пост могли изменить или удалить, а подписку — снять.
+Повторный запуск безопасен: ленты пишутся с ignore_conflicts, индекс
+заменяет документ целиком.
+"""
+from core.tasks import task
+
+from . import search, timeline
+from .models import Comment, Follow, Post
+
+
+@task
+def fan_out(post_id):
+    post = (
+        Post.objects.filter(pk=post_id)
+        .only("pk", "author_id", "pub_date")
+        .first()
+    )
+    if post is not None:
+        timeline.fan_out(post)
+
+
+@task
+def backfill(user_id, author_id):
+    timeline.backfill(user_id, author_id)
+    # Подписку проверяем после вставки, а не до: если отписка прошла
+    # раньше, её forget() не застал записей, и их удаляем здесь; более
+    # поздняя отписка удалит их сама. Блокировки не нужны — в SQLite
+    # select_for_update ничего не делает.
+    follows = Follow.objects.filter(user_id=user_id, author_id=author_id)
+    if not follows.exists():
+        timeline.forget(user_id, author_id)
+
+
+@task
+def backfill_followers(author_id):
+    if not timeline.is_popular(author_id):
+        timeline.backfill_followers(author_id)
+
+
+@task
+def index_post(post_id):
+    post = Post.objects.filter(pk=post_id).only("pk", "text").first()
+    if post is not None:
+        search.index_post(post)
+
+
+@task
+def index_comment(comment_id):
+    comment = (
+        Comment.objects.filter(pk=comment_id)
+        .only("pk", "post_id", "text")
+        .first()
+    )
+    if comment is not None:
+        search.index_comment(comment)
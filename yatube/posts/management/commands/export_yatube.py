@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import dataset
+from posts.constants import EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Потоково выгружает группы, посты, комментарии и подписки"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "datasets",
+            nargs="*",
+            help=(
+                f"Что выгружать: {', '.join(dataset.DATASETS)}; "
+                "по умолчанию всё"
+            ),
+        )
+        parser.add_argument(
+            "--format", choices=dataset.FORMATS, default="ndjson"
+        )
+        parser.add_argument(
+            "--output", default="-", help="Файл или - для stdout"
+        )
+        parser.add_argument("--after-id", type=int)
+        parser.add_argument("--until-id", type=int)
+        parser.add_argument(
+            "--chunk-size", type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        names = options["datasets"] or list(dataset.DATASETS)
+        unknown = set(names) - set(dataset.DATASETS)
+        if unknown:
+            raise CommandError(f"Неизвестные наборы: {', '.join(unknown)}")
+        if options["format"] == "csv" and len(names) != 1:
+            raise CommandError("В CSV выгружается ровно один набор данных")
+        if options["output"] == "-":
+            self.export(self.stdout, names, options)
+        else:
+            with open(
+                options["output"], "w", encoding="utf-8", newline=""
+            ) as output:
+                self.export(output, names, options)
+
+    def export(self, output, names, options):
+        for name in names:
+            progress = {"rows": 0, "last_id": None}
+            rows = dataset.rows(
+                name,
+                after_id=options["after_id"],
+                until_id=options["until_id"],
+                chunk_size=options["chunk_size"],
+            )
+            output.writelines(
+                dataset.lines(
+                    name, _counted(rows, progress), options["format"]
+                )
+            )
+            self.stderr.write(
+                f"{name}: {progress['rows']} строк, "
+                f"последний id {progress['last_id']}"
+            )
+
+
+def _counted(rows, progress):
+    for row in rows:
+        progress["rows"] += 1
+        progress["last_id"] = row["id"]
+        yield row
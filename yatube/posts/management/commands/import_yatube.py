@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import dataset
+from posts.constants import IMPORT_BATCH_SIZE
+from posts.importer import Importer, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    help = "Загружает выгрузку export_yatube пачками через bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл NDJSON или CSV")
+        parser.add_argument(
+            "--format", choices=dataset.FORMATS, default="ndjson"
+        )
+        parser.add_argument(
+            "--dataset",
+            help="Набор данных CSV-файла: "
+            + ", ".join(dataset.DATASETS),
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--media-from",
+            help="Каталог MEDIA_ROOT источника, откуда копировать картинки",
+        )
+        parser.add_argument("--image-workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        if options["format"] == "csv" and (
+            options["dataset"] not in dataset.DATASETS
+        ):
+            raise CommandError("Для CSV укажите --dataset")
+        importer = Importer(
+            batch_size=options["batch_size"],
+            media_from=options["media_from"],
+            image_workers=options["image_workers"],
+            report=self.report,
+        )
+        with open(options["path"], encoding="utf-8", newline="") as source:
+            if options["format"] == "csv":
+                records = read_csv(source, options["dataset"])
+            else:
+                records = read_ndjson(source)
+            try:
+                imported = importer.run(records)
+            except (KeyError, ValueError) as error:
+                raise CommandError(f"Некорректная запись: {error}")
+        for name, total in imported.items():
+            skipped = importer.skipped[name]
+            self.stdout.write(
+                f"{name}: загружено {total}, пропущено {skipped}"
+            )
+        if importer.failed_images:
+            self.stderr.write(
+                f"Не скопировано картинок: {importer.failed_images}"
+            )
+        self.stdout.write(self.style.SUCCESS("Импорт завершён"))
+
+    def report(self, name, total, rate):
+        self.stdout.write(f"{name}: {total} строк, {rate:.0f} строк/с")
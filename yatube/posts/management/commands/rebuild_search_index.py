@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Перестраивает поисковый индекс постов и комментариев"
+
+    def handle(self, *args, **options):
+        search.rebuild(
+            search.get_index(),
+            Post.objects.values_list("pk", "text").iterator(),
+            Comment.objects.values_list("pk", "post_id", "text").iterator(),
+        )
+        self.stdout.write(self.style.SUCCESS("Поисковый индекс перестроен"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.thumbnails import get_queue, run_worker
+
+
+class Command(BaseCommand):
+    help = "Строит миниатюры загруженных картинок в пуле процессов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать текущие задачи и выйти",
+        )
+
+    def handle(self, *args, **options):
+        queue = get_queue()
+        self.stdout.write(f"Очередь миниатюр: {queue.path}")
+        try:
+            run_worker(
+                queue,
+                processes=options["processes"],
+                poll_interval=options["poll_interval"],
+                once=options["once"],
+            )
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,24 @@
+from core.metrics.registry import Counter, Histogram
+
+from .constants import UPLOAD_SIZE_BUCKETS
+
+FEED_CACHE = Counter(
+    "yatube_feed_cache_requests_total",
+    "Обращения к кэшу страниц лент (CacheMiddleware) по результату.",
+    ("result",),
+)
+CARD_CACHE = Counter(
+    "yatube_card_cache_requests_total",
+    "Обращения к кэшу фрагментов карточек по результату.",
+    ("result",),
+)
+THUMBNAIL_SECONDS = Histogram(
+    "yatube_thumbnail_build_seconds",
+    "Время построения миниатюр и вариантов картинки поста.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+UPLOAD_BYTES = Histogram(
+    "yatube_upload_bytes",
+    "Размер загруженных картинок постов.",
+    buckets=UPLOAD_SIZE_BUCKETS,
+)
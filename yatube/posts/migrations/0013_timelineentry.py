@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from posts.constants import TIMELINE_LENGTH
+
+
+def backfill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    user_ids = Follow.objects.exclude(author=None).values_list(
+        'user_id', flat=True
+    ).distinct()
+    for user_id in user_ids.iterator():
+        # Самые свежие посты всех подписок сразу: лента не длиннее
+        # TIMELINE_LENGTH, как после timeline.trim().
+        posts = Post.objects.filter(
+            author__following__user_id=user_id
+        ).order_by('-pub_date', '-pk').values_list(
+            'pk', 'pub_date'
+        )[:TIMELINE_LENGTH]
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_auto_20221201_1548'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации поста')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL, verbose_name='Владелец ленты')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи лент',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='timeline_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(updated_at=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+    ]
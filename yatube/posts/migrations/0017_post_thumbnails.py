@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Готовые миниатюры (JSON)'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:19
+
+from django.db import DatabaseError, migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'posts_search_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # Индекс остаётся пустым: его заполняет
+    # manage.py rebuild_search_index текущим стеммером, а миграция не
+    # зависит от кода приложения, который потом может измениться.
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                'post_text, comment_text, post_id UNINDEXED)'
+            )
+    except DatabaseError:
+        # SQLite собран без FTS5: поиск пойдёт по SearchPosting.
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Терм')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('comment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Comment', verbose_name='Комментарий')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Вхождение терма',
+                'verbose_name_plural': 'Вхождения термов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchposting',
+            index=models.Index(fields=['term', 'post'], name='search_term_post_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
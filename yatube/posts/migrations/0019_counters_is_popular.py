@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+from posts.constants import TIMELINE_FAN_OUT_LIMIT
+
+
+def mark_popular(apps, schema_editor):
+    UserCounters = apps.get_model('posts', 'UserCounters')
+    UserCounters.objects.filter(
+        followers_count__gte=TIMELINE_FAN_OUT_LIMIT
+    ).update(is_popular=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercounters',
+            name='is_popular',
+            field=models.BooleanField(default=False, verbose_name='Популярный автор'),
+        ),
+        migrations.RunPython(mark_popular, migrations.RunPython.noop),
+    ]
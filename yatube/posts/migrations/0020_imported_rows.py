@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_counters_is_popular'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_id', models.PositiveIntegerField(unique=True, verbose_name='id в выгрузке')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Импортированный пост',
+                'verbose_name_plural': 'Импортированные посты',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportedComment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_id', models.PositiveIntegerField(unique=True, verbose_name='id в выгрузке')),
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Comment', verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'Импортированный комментарий',
+                'verbose_name_plural': 'Импортированные комментарии',
+            },
+        ),
+    ]
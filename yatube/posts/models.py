@@ -1,17 +1,53 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
-from .constants import FIRST_15
+from .constants import (
+    CARD_THUMBNAIL,
+    FIRST_15,
+    IMAGE_VARIANTS,
+    SEARCH_TERM_LENGTH,
+)
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class DerivedFieldsMixin(models.Model):
+    """Не даёт save() затирать поля, которые обновляются в обход него.
+
+    Счётчики меняются через F(), миниатюры пишет фоновый воркер — иначе
+    правка группы или поста записала бы в БД устаревшее значение,
+    загруженное вместе с объектом.
+    """
+
+    derived_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.derived_fields
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class Group(DerivedFieldsMixin, models.Model):
     title = models.CharField(max_length=200, verbose_name="Имя сообщества")
     slug = models.SlugField(
         unique=True, verbose_name="Слаг сообщества (group/<slug>/)"
     )
     description = models.TextField(verbose_name="Описание сообщества")
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Число постов"
+    )
+
+    derived_fields = ("posts_count",)
 
     def __str__(self) -> str:
         return self.title
@@ -21,7 +57,7 @@ class Group(models.Model):
         verbose_name_plural = "Группы"
 
 
-class Post(models.Model):
+class Post(DerivedFieldsMixin, models.Model):
 
     text = models.TextField(
         verbose_name="Текст поста",
@@ -31,6 +67,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name="Дата публикации",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -49,12 +89,57 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name="Картинка", upload_to="posts/", blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Число комментариев"
+    )
+    thumbnails = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Готовые миниатюры (JSON)",
+    )
+
+    derived_fields = ("comments_count", "thumbnails")
 
     def __str__(self) -> str:
         return self.text[:FIRST_15]
 
+    def thumbnail(self, geometry):
+        if not self.thumbnails:
+            return None
+        return json.loads(self.thumbnails).get(geometry)
+
+    @property
+    def card_thumbnail(self):
+        return self.thumbnail(CARD_THUMBNAIL)
+
+    @property
+    def card_sources(self):
+        variants = self.thumbnail(IMAGE_VARIANTS) or {}
+        return [
+            {
+                "type": mime,
+                "srcset": ", ".join(
+                    f"{variant['url']} {variant['width']}w"
+                    for variant in items
+                ),
+            }
+            for mime, items in variants.items()
+        ]
+
     class Meta:
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(name="post_date_idx", fields=["-pub_date", "-id"]),
+            models.Index(
+                name="post_author_date_idx",
+                fields=["author", "-pub_date", "-id"],
+            ),
+            models.Index(
+                name="post_group_date_idx",
+                fields=["group", "-pub_date", "-id"],
+            ),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
@@ -83,6 +168,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ("-created",)
+        indexes = [
+            models.Index(
+                name="comment_post_created_idx",
+                fields=["post", "-created", "-id"],
+            ),
+        ]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
 
@@ -112,5 +203,157 @@ class Follow(models.Model):
                 name="unique_follow", fields=["user", "author"]
             ),
         ]
+        indexes = [
+            models.Index(
+                name="follow_author_user_idx", fields=["author", "user"]
+            ),
+        ]
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
+
+
+class UserCounters(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+        verbose_name="Пользователь",
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0, verbose_name="Число постов"
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0, verbose_name="Число подписчиков"
+    )
+    following_count = models.PositiveIntegerField(
+        default=0, verbose_name="Число подписок"
+    )
+    # Посты популярного автора читаются при запросе ленты, а не
+    # раскладываются по лентам подписчиков, см. posts.timeline.
+    is_popular = models.BooleanField(
+        default=False, verbose_name="Популярный автор"
+    )
+
+    def __str__(self):
+        return f"Счётчики пользователя {self.user}"
+
+    class Meta:
+        verbose_name = "Счётчики пользователя"
+        verbose_name_plural = "Счётчики пользователей"
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Владелец ленты",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост",
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации поста")
+
+    def __str__(self):
+        return f"Лента пользователя {self.user}: пост {self.post_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="unique_timeline_entry", fields=["user", "post"]
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name="timeline_user_date_idx",
+                fields=["user", "-pub_date", "-post"],
+            ),
+        ]
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи лент"
+
+
+class SearchPosting(models.Model):
+    """Вхождение терма в пост или комментарий — запасной поисковый индекс.
+
+    Используется, когда SQLite собран без FTS5.
+    """
+
+    term = models.CharField(
+        max_length=SEARCH_TERM_LENGTH, verbose_name="Терм"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Пост",
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name="Комментарий",
+    )
+    weight = models.PositiveIntegerField(verbose_name="Вес")
+
+    def __str__(self):
+        return f"{self.term}: пост {self.post_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(name="search_term_post_idx", fields=["term", "post"]),
+        ]
+        verbose_name = "Вхождение терма"
+        verbose_name_plural = "Вхождения термов"
+
+
+class ImportedPost(models.Model):
+    """id поста в выгрузке -> пост, созданный по нему импортом.
+
+    Соответствие хранится между запусками: комментарии из отдельного
+    файла находят свои посты, а повторный импорт пропускает уже
+    загруженные.
+    """
+
+    source_id = models.PositiveIntegerField(
+        unique=True, verbose_name="id в выгрузке"
+    )
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Пост",
+    )
+
+    def __str__(self):
+        return f"Пост {self.source_id} выгрузки -> {self.post_id}"
+
+    class Meta:
+        verbose_name = "Импортированный пост"
+        verbose_name_plural = "Импортированные посты"
+
+
+class ImportedComment(models.Model):
+    """id комментария в выгрузке -> комментарий, созданный импортом."""
+
+    source_id = models.PositiveIntegerField(
+        unique=True, verbose_name="id в выгрузке"
+    )
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Комментарий",
+    )
+
+    def __str__(self):
+        return f"Комментарий {self.source_id} выгрузки -> {self.comment_id}"
+
+    class Meta:
+        verbose_name = "Импортированный комментарий"
+        verbose_name_plural = "Импортированные комментарии"
@@ -0,0 +1,197 @@
+import base64
+import binascii
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+FORWARD: str = "n"
+BACKWARD: str = "p"
+LAST: str = "l"
+
+
+def encode_position(direction, moment, pk):
+    raw = direction
+    if moment is not None:
+        raw = f"{direction}|{moment.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def encode_cursor(direction, post=None):
+    if post is None:
+        return encode_position(direction, None, None)
+    return encode_position(direction, post.pub_date, post.pk)
+
+
+def decode_cursor(token):
+    """Возвращает (direction, pub_date, pk) или None для битого курсора."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        parts = base64.urlsafe_b64decode(padded).decode().split("|")
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    if parts == [LAST]:
+        return LAST, None, None
+    if len(parts) != 3 or parts[0] not in (FORWARD, BACKWARD):
+        return None
+    direction, pub_date, pk = parts
+    try:
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+def attach_cursors(page):
+    posts = page.object_list
+    page.next_cursor = (
+        encode_cursor(FORWARD, posts[len(posts) - 1])
+        if page.has_next() else None
+    )
+    page.previous_cursor = (
+        encode_cursor(BACKWARD, posts[0]) if page.has_previous() else None
+    )
+    page.last_cursor = encode_cursor(LAST) if page.has_next() else None
+    return page
+
+
+class CursorPaginator(Paginator):
+    """Пагинация по ключу (pub_date, id) без COUNT(*) и OFFSET.
+
+    Стоимость любой страницы одинакова: запрос всегда читает per_page + 1
+    строк по индексу от позиции курсора. Общее число страниц неизвестно,
+    поэтому number/num_pages описывают только окно вокруг текущей
+    страницы — этого хватает методам has_next/has_previous у Page.
+    """
+
+    key_field = "pk"
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(
+            object_list.order_by(*self.ordering()), per_page, **kwargs
+        )
+        self._num_pages = 1
+
+    @classmethod
+    def ordering(cls):
+        return ("-pub_date", f"-{cls.key_field}")
+
+    @staticmethod
+    def item(row):
+        return row
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self._forward(None)
+        direction, pub_date, pk = position
+        if direction == LAST:
+            return self._last()
+        if direction == BACKWARD:
+            page = self._backward(pub_date, pk)
+            if page.object_list:
+                return page
+            return self._forward(None)
+        return self._forward((pub_date, pk))
+
+    def _after(self, pub_date, pk):
+        return Q(pub_date__lt=pub_date) | Q(
+            pub_date=pub_date, **{f"{self.key_field}__lt": pk}
+        )
+
+    def _before(self, pub_date, pk):
+        return Q(pub_date__gt=pub_date) | Q(
+            pub_date=pub_date, **{f"{self.key_field}__gt": pk}
+        )
+
+    def _forward(self, position):
+        queryset = self.object_list
+        if position is not None:
+            queryset = queryset.filter(self._after(*position))
+        rows = list(queryset[: self.per_page + 1])
+        return self._build_page(
+            rows[: self.per_page],
+            has_previous=position is not None,
+            has_next=len(rows) > self.per_page,
+        )
+
+    def _backward(self, pub_date, pk):
+        queryset = self.object_list.filter(
+            self._before(pub_date, pk)
+        ).reverse()
+        rows = list(queryset[: self.per_page + 1])
+        return self._build_page(
+            rows[: self.per_page][::-1],
+            has_previous=len(rows) > self.per_page,
+            has_next=True,
+        )
+
+    def _last(self):
+        rows = list(self.object_list.reverse()[: self.per_page + 1])
+        return self._build_page(
+            rows[: self.per_page][::-1],
+            has_previous=len(rows) > self.per_page,
+            has_next=False,
+        )
+
+    def _build_page(self, rows, has_previous, has_next):
+        number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        posts = [self.item(row) for row in rows]
+        return attach_cursors(Page(posts, number, self))
+
+
+class TimelinePaginator(CursorPaginator):
+    """Листает записи TimelineEntry и отдаёт в страницу сами посты.
+
+    Запись хранит копию pub_date поста, поэтому курсор у обоих один и тот
+    же, а страница читается диапазоном по индексу ленты.
+    """
+
+    key_field = "post_id"
+
+    @staticmethod
+    def item(row):
+        return row.post
+
+
+def comment_page(comments, ordering, after, per_page):
+    """Комментарии после курсора after: (страница, курсор следующей).
+
+    ordering — ("-created", "-pk") или ("created", "pk"); оба порядка
+    читаются диапазоном по индексу (post, created, id) без OFFSET.
+    """
+    queryset = comments.order_by(*ordering)
+    position = decode_cursor(after) if after else None
+    if position is not None and position[0] == FORWARD:
+        _, created, pk = position
+        lookup = "lt" if ordering[0].startswith("-") else "gt"
+        queryset = queryset.filter(
+            Q(**{f"created__{lookup}": created})
+            | Q(created=created, **{f"pk__{lookup}": pk})
+        )
+    rows = list(queryset[: per_page + 1])
+    page = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        next_cursor = encode_position(FORWARD, page[-1].created, page[-1].pk)
+    return page, next_cursor
+
+
+def legacy_page(
+    object_list, per_page, number, paginator_class=CursorPaginator
+):
+    """Старые ссылки ?page=N: OFFSET-страница с курсорами на соседние."""
+    paginator = Paginator(
+        object_list.order_by(*paginator_class.ordering()), per_page
+    )
+    page = paginator.get_page(number)
+    page.object_list = [paginator_class.item(row) for row in page]
+    return attach_cursors(page)
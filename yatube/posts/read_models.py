@@ -0,0 +1,60 @@
+from django.shortcuts import get_object_or_404
+
+from .constants import COMMENT_ORDERINGS, COMMENTS_PER_PAGE
+from .models import Comment, Post
+from .paginators import comment_page
+
+COMMENT_FIELDS: tuple = (
+    "id",
+    "text",
+    "created",
+    "post_id",
+    "author_id",
+    "author__username",
+)
+
+
+class PostDetail:
+    """Данные страницы поста.
+
+    Пост с автором, счётчиками автора и группой — один запрос,
+    страница комментариев с именами авторов — второй. Число постов
+    автора и комментариев берётся из денормализованных счётчиков,
+    поэтому запросов всегда два, сколько бы ни было комментариев.
+    """
+
+    def __init__(self, post, comments, next_cursor, order):
+        self.post = post
+        self.comments = comments
+        self.next_cursor = next_cursor
+        self.order = order
+
+    @classmethod
+    def load(cls, post_id, order):
+        post = get_object_or_404(
+            Post.objects.select_related("author__counters", "group"),
+            pk=post_id,
+        )
+        comments, next_cursor = comment_page(
+            comments_of(post.pk),
+            COMMENT_ORDERINGS[order],
+            None,
+            COMMENTS_PER_PAGE,
+        )
+        return cls(post, comments, next_cursor, order)
+
+    def context(self):
+        return {
+            "post": self.post,
+            "comments": self.comments,
+            "next_cursor": self.next_cursor,
+            "order": self.order,
+        }
+
+
+def comments_of(post_id):
+    return (
+        Comment.objects.filter(post_id=post_id)
+        .select_related("author")
+        .only(*COMMENT_FIELDS)
+    )
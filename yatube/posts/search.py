@@ -0,0 +1,312 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+from .constants import (
+    SEARCH_FREQUENCY_CACHE_TIMEOUT,
+    SEARCH_POST_WEIGHT,
+    SEARCH_RESULTS_LIMIT,
+)
+from .models import SearchPosting
+from .stemming import terms
+
+POST: str = "post"
+COMMENT: str = "comment"
+FTS_TABLE: str = "posts_search_fts"
+FTS_INSERT_ROWS: int = 200
+
+_fts_tables = {}
+
+
+def has_fts_table(db):
+    if db.vendor != "sqlite":
+        return False
+    return FTS_TABLE in db.introspection.table_names()
+
+
+def create_fts_table(db):
+    """Создаёт таблицу FTS5; False, если SQLite собран без FTS5."""
+    try:
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "post_text, comment_text, post_id UNINDEXED)"
+            )
+    except DatabaseError:
+        return False
+    return True
+
+
+class FtsIndex:
+    """Индекс в виртуальной таблице FTS5, ранжирование — bm25 SQLite.
+
+    В таблицу пишутся уже приведённые к основе термы, поэтому запрос
+    проходит через тот же стеммер и находит другие словоформы.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _rowid(kind, pk):
+        return pk * 2 + (kind == COMMENT)
+
+    @staticmethod
+    def _query(query_terms):
+        return " ".join(f'"{term}"' for term in query_terms)
+
+    def add(self, documents, replace=True):
+        rows = [
+            (
+                self._rowid(kind, pk),
+                " ".join(terms(text)) if kind == POST else "",
+                " ".join(terms(text)) if kind == COMMENT else "",
+                post_id,
+            )
+            for kind, pk, post_id, text in documents
+        ]
+        # Многострочные INSERT вместо executemany: последний нельзя
+        # показать в отладочном логе SQL.
+        with self.db.cursor() as cursor:
+            for start in range(0, len(rows), FTS_INSERT_ROWS):
+                chunk = rows[start:start + FTS_INSERT_ROWS]
+                if replace:
+                    cursor.execute(
+                        f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                        f"({', '.join(['%s'] * len(chunk))})",
+                        [row[0] for row in chunk],
+                    )
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} "
+                    "(rowid, post_text, comment_text, post_id) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s)"] * len(chunk)),
+                    [value for row in chunk for value in row],
+                )
+
+    def remove(self, kind, pk):
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [self._rowid(kind, pk)],
+            )
+
+    def clear(self):
+        with self.db.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    @staticmethod
+    def _limit(sql, params, limit):
+        # limit=None — без ограничения, как срез [:None] у TokenIndex.
+        if limit is None:
+            return sql, params
+        return f"{sql} LIMIT %s", [*params, limit]
+
+    def posts(self, query_terms, limit):
+        """Лучший документ поста определяет его место в выдаче."""
+        sql, params = self._limit(
+            "SELECT post_id FROM ("
+            f"SELECT post_id, rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rank MATCH %s"
+            ") GROUP BY post_id ORDER BY MIN(rank), post_id DESC",
+            [
+                self._query(query_terms),
+                f"bm25({float(SEARCH_POST_WEIGHT)}, 1.0)",
+            ],
+            limit,
+        )
+        with self.db.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def comments(self, query_terms, limit):
+        sql, params = self._limit(
+            f"SELECT rowid FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid %% 2 = 1 ORDER BY rank",
+            [self._query(query_terms)],
+            limit,
+        )
+        with self.db.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] // 2 for row in cursor.fetchall()]
+
+
+class TokenIndex:
+    """Инвертированный индекс в обычной таблице SearchPosting.
+
+    Каждая строка — терм документа с весом tf, у постов вес умножается на
+    SEARCH_POST_WEIGHT. Поиск читает только строки запрошенных термов по
+    индексу (term, post), редкие термы весят больше частых.
+    """
+
+    def __init__(self, posting_model):
+        self.model = posting_model
+
+    def _postings(self, kind, pk, post_id, text):
+        weight = SEARCH_POST_WEIGHT if kind == POST else 1
+        comment_id = pk if kind == COMMENT else None
+        return [
+            self.model(
+                term=term,
+                post_id=post_id,
+                comment_id=comment_id,
+                weight=count * weight,
+            )
+            for term, count in Counter(terms(text)).items()
+        ]
+
+    def _documents(self, kind, pk):
+        if kind == COMMENT:
+            return self.model.objects.filter(comment_id=pk)
+        return self.model.objects.filter(post_id=pk, comment=None)
+
+    def add(self, documents, replace=True):
+        postings = []
+        for kind, pk, post_id, text in documents:
+            if replace:
+                self._documents(kind, pk).delete()
+            postings.extend(self._postings(kind, pk, post_id, text))
+        self.model.objects.bulk_create(postings)
+
+    def remove(self, kind, pk):
+        self._documents(kind, pk).delete()
+
+    def clear(self):
+        self.model.objects.all().delete()
+
+    @staticmethod
+    def _frequency_key(key, term):
+        return f"search_df:{key}:{term}"
+
+    def _frequencies(self, queryset, key, query_terms):
+        """Число документов с каждым из термов, отсутствующие пропущены.
+
+        Частоты задают только вес термов, и устаревшие на
+        SEARCH_FREQUENCY_CACHE_TIMEOUT значения ранжированию не мешают,
+        а подсчёт по всем вхождениям частого терма дорог на каждом
+        запросе.
+        """
+        cache_keys = {
+            self._frequency_key(key, term): term for term in query_terms
+        }
+        frequencies = {
+            cache_keys[cache_key]: count
+            for cache_key, count in cache.get_many(cache_keys).items()
+        }
+        missing = query_terms - frequencies.keys()
+        if missing:
+            counted = dict(
+                queryset.filter(term__in=missing)
+                .values_list("term")
+                .annotate(Count(key, distinct=True))
+            )
+            cache.set_many(
+                {
+                    self._frequency_key(key, term): count
+                    for term, count in counted.items()
+                },
+                SEARCH_FREQUENCY_CACHE_TIMEOUT,
+            )
+            frequencies.update(counted)
+        return frequencies
+
+    def _ranked(self, queryset, key, query_terms, limit):
+        query_terms = set(query_terms)
+        frequencies = self._frequencies(queryset, key, query_terms)
+        if len(frequencies) < len(query_terms):
+            return []
+        score = Sum(
+            Case(
+                *(
+                    When(term=term, then=F("weight") / Value(float(count)))
+                    for term, count in frequencies.items()
+                ),
+                output_field=FloatField(),
+            )
+        )
+        return list(
+            queryset.filter(term__in=query_terms)
+            .values(key)
+            .annotate(matched=Count("term", distinct=True), score=score)
+            .filter(matched=len(query_terms))
+            .order_by("-score", f"-{key}")
+            .values_list(key, flat=True)[:limit]
+        )
+
+    def posts(self, query_terms, limit):
+        return self._ranked(
+            self.model.objects.all(), "post_id", query_terms, limit
+        )
+
+    def comments(self, query_terms, limit):
+        return self._ranked(
+            self.model.objects.exclude(comment=None),
+            "comment_id",
+            query_terms,
+            limit,
+        )
+
+
+def index_for(db, posting_model):
+    if has_fts_table(db):
+        return FtsIndex(db)
+    return TokenIndex(posting_model)
+
+
+def get_index():
+    """Активный индекс текущей БД; наличие FTS5 проверяется один раз."""
+    name = connection.settings_dict["NAME"]
+    if name not in _fts_tables:
+        _fts_tables[name] = has_fts_table(connection)
+    if _fts_tables[name]:
+        return FtsIndex(connection)
+    return TokenIndex(SearchPosting)
+
+
+def index_post(post):
+    get_index().add([(POST, post.pk, post.pk, post.text)])
+
+
+def index_comment(comment):
+    get_index().add(
+        [(COMMENT, comment.pk, comment.post_id, comment.text)]
+    )
+
+
+def remove(kind, pk):
+    get_index().remove(kind, pk)
+
+
+def rebuild(index, posts, comments):
+    """Заполняет индекс заново.
+
+    posts — пары (pk, text), comments — тройки (pk, post_id, text).
+    """
+    index.clear()
+    index.add(((POST, pk, pk, text) for pk, text in posts), replace=False)
+    index.add(
+        (
+            (COMMENT, pk, post_id, text)
+            for pk, post_id, text in comments
+        ),
+        replace=False,
+    )
+
+
+def search_posts(query, limit=SEARCH_RESULTS_LIMIT):
+    """id постов по убыванию релевантности, с учётом их комментариев.
+
+    limit=None снимает ограничение выдачи.
+    """
+    query_terms = terms(query)
+    if not query_terms:
+        return []
+    return get_index().posts(query_terms, limit)
+
+
+def search_comments(query, limit=SEARCH_RESULTS_LIMIT):
+    query_terms = terms(query)
+    if not query_terms:
+        return []
+    return get_index().comments(query_terms, limit)
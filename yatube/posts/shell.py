@@ -0,0 +1,44 @@
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+
+# Персональная часть страницы -> шаблон. Шаблон отрисовывает корневой
+# элемент с data-user-fragment="<имя>", который скрипт оболочки
+# заменяет ответом /fragments/user/.
+NAV_FRAGMENT: str = "includes/user_nav.html"
+PAGE_FRAGMENTS: dict = {
+    "posts:profile": {"follow": "posts/includes/follow_button.html"},
+    "posts:post_detail": {
+        "edit_link": "posts/includes/edit_link.html",
+        "comment_form": "posts/includes/comment_form.html",
+    },
+}
+
+
+def public_shell(view):
+    """При EDGE_SHELL отдаёт GET/HEAD-страницу как анонимную оболочку.
+
+    request.user подменяется анонимом до вида, поэтому сессия не
+    читается, Vary: Cookie и csrf-кука не появляются, и страница у всех
+    одна: её можно держать в CDN с Cache-Control: public. Персональные
+    части шаблоны оборачивают в data-user-fragment, а скрипт из
+    base.html подменяет их ответом user_fragments.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.EDGE_SHELL or request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+        request.user = AnonymousUser()
+        request.edge_shell = True
+        response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            if response.has_header("Expires"):
+                del response["Expires"]
+            response["Cache-Control"] = (
+                f"public, max-age={settings.EDGE_SHELL_MAX_AGE}"
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,155 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.tasks import enqueue
+
+from . import (
+    conditional,
+    counters,
+    feed_cache,
+    jobs,
+    search,
+    thumbnails,
+    timeline,
+)
+from .models import Comment, Follow, Group, Post, User, UserCounters
+from .versions import bump, version_key
+
+AUTHOR_CARD_FIELDS = frozenset(("username", "first_name", "last_name"))
+
+
+@receiver(post_save, sender=User)
+def create_user_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserCounters.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def expire_author_cards(sender, instance, created, update_fields, **kwargs):
+    if created:
+        return
+    if update_fields is None or AUTHOR_CARD_FIELDS & set(update_fields):
+        bump(version_key("author", instance.pk))
+        feed_cache.expire_all_feeds()
+
+
+@receiver(post_save, sender=Group)
+def expire_group_cards(sender, instance, created, **kwargs):
+    if not created:
+        bump(version_key("group", instance.pk))
+        feed_cache.expire_all_feeds()
+
+
+@receiver(post_delete, sender=Group)
+def expire_deleted_group_feeds(sender, instance, **kwargs):
+    feed_cache.expire_all_feeds()
+
+
+def image_name(image):
+    return getattr(image, "name", image) or ""
+
+
+@receiver(post_init, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    instance._saved_group_id = instance.__dict__.get("group_id")
+    instance._saved_image = image_name(instance.__dict__.get("image"))
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.post_added(instance)
+        enqueue(jobs.fan_out, post_id=instance.pk)
+        bump(version_key("author_posts", instance.author_id))
+    elif instance._saved_group_id != instance.group_id:
+        counters.post_moved(instance._saved_group_id, instance.group_id)
+    feed_cache.expire_post_feeds(instance, instance._saved_group_id)
+    conditional.remember_post(instance)
+    instance._saved_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def schedule_post_thumbnails(sender, instance, created, raw=False, **kwargs):
+    """Миниатюры строятся при любой смене картинки: из видов, админки
+    или shell."""
+    if raw:
+        return
+    image = image_name(instance.image)
+    if created or image != instance._saved_image:
+        thumbnails.schedule(instance, created)
+    instance._saved_image = image
+
+
+@receiver(post_delete, sender=Post)
+def discount_deleted_post(sender, instance, **kwargs):
+    counters.post_added(instance, delta=-1)
+    bump(version_key("author_posts", instance.author_id))
+    feed_cache.expire_post_feeds(instance)
+    conditional.forget_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or "text" in update_fields):
+        enqueue(jobs.index_post, post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.remove(search.POST, instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment_text(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if not raw and (update_fields is None or "text" in update_fields):
+        enqueue(jobs.index_comment, comment_id=instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    search.remove(search.COMMENT, instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.comment_added(instance)
+        conditional.expire_post(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def discount_deleted_comment(sender, instance, **kwargs):
+    counters.comment_added(instance, delta=-1)
+    conditional.expire_post(instance.post_id)
+
+
+def follow_changed(follow):
+    bump(timeline.following_version(follow.user_id))
+    if timeline.update_popularity(follow.author_id) is False:
+        enqueue(jobs.backfill_followers, author_id=follow.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.author_id:
+        counters.follow_added(instance)
+        follow_changed(instance)
+        enqueue(
+            jobs.backfill,
+            user_id=instance.user_id,
+            author_id=instance.author_id,
+        )
+        feed_cache.expire_profile_feed(instance.author.username)
+
+
+@receiver(post_delete, sender=Follow)
+def forget_unfollowed_author(sender, instance, **kwargs):
+    if instance.author_id:
+        counters.follow_added(instance, delta=-1)
+        follow_changed(instance)
+        timeline.forget(instance.user_id, instance.author_id)
+        feed_cache.expire_profile_feed(instance.author.username)
@@ -0,0 +1,138 @@
+import re
+
+from .constants import SEARCH_TERM_LENGTH
+
+VOWELS: str = "аеиоуыэюя"
+WORD_RE = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    (
+        "а", "без", "бы", "в", "во", "вот", "все", "да", "для", "до", "если",
+        "же", "за", "и", "из", "или", "к", "как", "ко", "ли", "на", "над",
+        "не", "ни", "но", "о", "об", "от", "по", "под", "при", "с", "со",
+        "так", "то", "у", "что", "это",
+    )
+)
+
+PERFECTIVE_GERUND = (
+    ("вшись", "вши", "в"),
+    ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв"),
+)
+ADJECTIVE = (
+    (),
+    (
+        "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое",
+        "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую",
+        "юю", "ая", "яя", "ою", "ею",
+    ),
+)
+PARTICIPLE = (("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+REFLEXIVE = ((), ("ся", "сь"))
+VERB = (
+    (
+        "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но",
+        "ет", "ют", "ны", "ть", "й", "л", "н",
+    ),
+    (
+        "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило",
+        "ыло", "ено", "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй",
+        "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю",
+    ),
+)
+NOUN = (
+    (),
+    (
+        "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие",
+        "ье", "еи", "ии", "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах",
+        "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у", "ы",
+        "ь", "ю", "я",
+    ),
+)
+SUPERLATIVE = ((), ("ейше", "ейш"))
+DERIVATIONAL = ((), ("ость", "ост"))
+
+
+def _regions(word):
+    """Границы RV и R2 из алгоритма Snowball для русского языка."""
+    rv = r1 = r2 = len(word)
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS:
+            rv = index
+            break
+    for index in range(rv + 1, len(word)):
+        if word[index - 1] not in VOWELS and word[index - 2] in VOWELS:
+            r1 = index
+            break
+    for index in range(r1 + 2, len(word) + 1):
+        if word[index - 1] not in VOWELS and word[index - 2] in VOWELS:
+            r2 = index
+            break
+    return rv, r2
+
+
+def _strip(word, start, endings):
+    """Срезает самое длинное окончание из endings, лежащее после start.
+
+    Окончания первой группы допустимы только после «а» или «я».
+    """
+    after_a, plain = endings
+    longest = max(
+        (
+            (len(suffix), suffix in after_a)
+            for suffix in after_a + plain
+            if word.endswith(suffix) and len(word) - len(suffix) >= start
+        ),
+        default=None,
+    )
+    if longest is None:
+        return None
+    length, needs_a = longest
+    stem = word[:-length]
+    if needs_a and (len(stem) <= start or stem[-1] not in "ая"):
+        return None
+    return stem
+
+
+def stem(word):
+    """Основа русского слова по алгоритму Портера (Snowball)."""
+    word = word.lower().replace("ё", "е")
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        stripped = _strip(word, rv, ADJECTIVE)
+        if stripped is not None:
+            stripped = _strip(stripped, rv, PARTICIPLE) or stripped
+        else:
+            stripped = _strip(word, rv, VERB) or _strip(word, rv, NOUN)
+    word = stripped or word
+
+    if word.endswith("и") and len(word) > rv:
+        word = word[:-1]
+    word = _strip(word, r2, DERIVATIONAL) or word
+
+    if word.endswith("нн") and len(word) - 1 > rv:
+        return word[:-1]
+    stripped = _strip(word, rv, SUPERLATIVE)
+    if stripped is not None:
+        if stripped.endswith("нн") and len(stripped) - 1 > rv:
+            return stripped[:-1]
+        return stripped
+    if word.endswith("ь") and len(word) > rv:
+        return word[:-1]
+    return word
+
+
+def terms(text):
+    """Поисковые термы текста: слова в нижнем регистре, приведённые к основе.
+
+    Служебные слова и слишком длинные «слова» (ссылки, base64) в индекс
+    не попадают.
+    """
+    return [
+        stem(word)
+        for word in WORD_RE.findall(text.lower().replace("ё", "е"))
+        if word not in STOP_WORDS and len(word) <= SEARCH_TERM_LENGTH
+    ]
@@ -0,0 +1,14 @@
+from django import template
+
+from ..fragments import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def card_fragments(context, page_obj):
+    return render_cards(
+        page_obj,
+        is_author_hidden=context.get("is_author_hidden", False),
+        to_show_groups=context.get("to_show_groups", False),
+    )
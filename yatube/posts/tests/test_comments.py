@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..constants import COMMENTS_PER_PAGE
+from ..models import Comment, Post, User
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.post = Post.objects.create(author=cls.author, text="Пост")
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f"Комментарий {index}"
+            )
+            for index in range(COMMENTS_PER_PAGE + 5)
+        ]
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def fetch(self, **params):
+        post_id = CommentPaginationTests.post.pk
+        return CommentPaginationTests.guest.get(
+            reverse("posts:post_comments", args=[post_id]),
+            {"format": "json", **params},
+        ).json()
+
+    def test_post_detail_shows_first_page_and_count(self):
+        """post_detail показывает первую страницу и число из поста."""
+        response = CommentPaginationTests.guest.get(
+            reverse(
+                "posts:post_detail", args=[CommentPaginationTests.post.pk]
+            )
+        )
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0], CommentPaginationTests.comments[-1])
+        self.assertIsNotNone(response.context["next_cursor"])
+        self.assertContains(
+            response, f"Комментарии: {COMMENTS_PER_PAGE + 5}"
+        )
+
+    def test_keyset_pages_cover_all_comments(self):
+        """Страницы по курсору after идут без пропусков и повторов."""
+        for order, expected in (
+            ("new", CommentPaginationTests.comments[::-1]),
+            ("old", CommentPaginationTests.comments),
+        ):
+            with self.subTest(order=order):
+                first = self.fetch(order=order)
+                second = self.fetch(order=order, after=first["next"])
+                ids = [
+                    comment["id"]
+                    for comment in first["comments"] + second["comments"]
+                ]
+                self.assertEqual(ids, [comment.pk for comment in expected])
+                self.assertIsNone(second["next"])
+
+    def test_html_fragment_links_next_page(self):
+        """Фрагмент содержит ссылку на следующую страницу."""
+        response = CommentPaginationTests.guest.get(
+            reverse(
+                "posts:post_comments", args=[CommentPaginationTests.post.pk]
+            )
+        )
+        self.assertTemplateUsed(response, "posts/includes/comment_list.html")
+        self.assertContains(response, "data-comments-more")
+        self.assertContains(response, "after=")
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text="Пост"
+        )
+        cls.feed_urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=["test-group"]),
+            reverse("posts:profile", args=["author"]),
+        )
+        cls.detail_url = reverse("posts:post_detail", args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def revalidate(self, url, response):
+        return self.guest.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_pages_return_304_without_queries(self):
+        """Неизменённая страница отдаёт 304 без запросов к БД."""
+        urls = (*ConditionalGetTests.feed_urls, ConditionalGetTests.detail_url)
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("no-cache", response["Cache-Control"])
+                self.assertTrue(response.has_header("Last-Modified"))
+                with self.assertNumQueries(0):
+                    revalidated = self.revalidate(url, response)
+                self.assertEqual(revalidated.status_code, 304)
+                not_modified = self.guest.get(
+                    url,
+                    HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+                )
+                self.assertEqual(not_modified.status_code, 304)
+
+    def test_new_post_changes_feed_etags(self):
+        """Новый пост меняет ETag лент автора и группы."""
+        responses = {
+            url: self.guest.get(url) for url in ConditionalGetTests.feed_urls
+        }
+        Post.objects.create(
+            author=ConditionalGetTests.author,
+            group=ConditionalGetTests.group,
+            text="Новый пост",
+        )
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.revalidate(url, response).status_code, 200
+                )
+
+    def test_comment_changes_post_detail_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        url = ConditionalGetTests.detail_url
+        response = self.guest.get(url)
+        Comment.objects.create(
+            post=ConditionalGetTests.post,
+            author=ConditionalGetTests.author,
+            text="Комментарий",
+        )
+        revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertContains(revalidated, "Комментарий")
+
+    def test_authenticated_responses_are_not_conditional(self):
+        """Персональные страницы вошедших не получают ETag."""
+        client = Client()
+        client.force_login(ConditionalGetTests.author)
+        response = client.get(ConditionalGetTests.detail_url)
+        self.assertFalse(response.has_header("ETag"))
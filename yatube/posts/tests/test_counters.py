@@ -0,0 +1,132 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User, UserCounters
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.other_group = Group.objects.create(
+            title="Другая группа",
+            slug="other-group",
+            description="Тестовое описание",
+        )
+
+    def counters_of(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_counters_follow_posts_comments_and_follows(self):
+        """Счётчики меняются при создании и удалении объектов."""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        comment = Comment.objects.create(
+            text="Комментарий", post=post, author=CountersTests.reader
+        )
+        follow = Follow.objects.create(
+            user=CountersTests.reader, author=CountersTests.author
+        )
+        post.refresh_from_db()
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(CountersTests.group.posts_count, 1)
+        self.assertEqual(self.counters_of(CountersTests.author).posts_count, 1)
+        self.assertEqual(
+            self.counters_of(CountersTests.author).followers_count, 1
+        )
+        self.assertEqual(
+            self.counters_of(CountersTests.reader).following_count, 1
+        )
+
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(
+            self.counters_of(CountersTests.author).followers_count, 0
+        )
+
+        post.group = CountersTests.other_group
+        post.save()
+        CountersTests.other_group.refresh_from_db()
+        self.assertEqual(CountersTests.other_group.posts_count, 1)
+
+        post.delete()
+        CountersTests.other_group.refresh_from_db()
+        self.assertEqual(CountersTests.other_group.posts_count, 0)
+        self.assertEqual(self.counters_of(CountersTests.author).posts_count, 0)
+
+    def test_save_keeps_counters(self):
+        """save() загруженного объекта не затирает счётчики."""
+        group = Group.objects.get(pk=CountersTests.group.pk)
+        Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        group.description = "Новое описание"
+        group.save()
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 1)
+        self.assertEqual(group.description, "Новое описание")
+
+    def test_rebuild_counters_command(self):
+        """rebuild_counters восстанавливает рассинхронизированные счётчики."""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        Comment.objects.create(
+            text="Комментарий", post=post, author=CountersTests.reader
+        )
+        UserCounters.objects.all().delete()
+        Group.objects.update(posts_count=42)
+        Post.objects.update(comments_count=42)
+
+        call_command("rebuild_counters", stdout=StringIO())
+
+        post.refresh_from_db()
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(CountersTests.group.posts_count, 1)
+        self.assertEqual(self.counters_of(CountersTests.author).posts_count, 1)
+
+    def test_profile_and_detail_run_no_aggregates(self):
+        """Профиль и страница поста не выполняют COUNT-запросов."""
+        post = Post.objects.create(
+            text="Тестовый пост", author=CountersTests.author
+        )
+        client = Client()
+        urls = (
+            reverse(
+                "posts:profile",
+                kwargs={"username": CountersTests.author.username},
+            ),
+            reverse("posts:post_detail", kwargs={"post_id": post.id}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(2) as queries:
+                    response = client.get(url)
+                self.assertContains(response, "Всего постов")
+                self.assertFalse(
+                    any(
+                        "COUNT(" in query["sql"]
+                        for query in queries.captured_queries
+                    )
+                )
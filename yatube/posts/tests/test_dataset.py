@@ -0,0 +1,334 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search, thumbnails
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f"Пост {index}"
+            )
+            for index in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text="Комментарий"
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def export(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("export_yatube", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_ndjson_export_covers_all_datasets(self):
+        """NDJSON содержит все наборы данных в порядке id."""
+        output, _ = self.export()
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(
+            [row["model"] for row in rows],
+            ["groups"] + ["posts"] * 5 + ["comments", "follows"],
+        )
+        post = rows[1]
+        self.assertEqual(post["author"], "author")
+        self.assertEqual(post["group"], "test-group")
+        self.assertEqual(rows[-1]["user"], "reader")
+
+    def test_export_resumes_from_id(self):
+        """Выгрузку можно продолжить с последнего id."""
+        first, last = ExportTests.posts[1].pk, ExportTests.posts[3].pk
+        output, progress = self.export(
+            "posts",
+            "--after-id",
+            str(first),
+            "--until-id",
+            str(last),
+            "--chunk-size",
+            "1",
+        )
+        ids = [json.loads(line)["id"] for line in output.splitlines()]
+        self.assertEqual(ids, [first + 1, last])
+        self.assertIn(f"последний id {last}", progress)
+
+    def test_csv_export(self):
+        """CSV выгружает один набор с заголовком."""
+        output, _ = self.export("comments", "--format", "csv")
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["author"], "reader")
+        self.assertEqual(rows[0]["post"], str(ExportTests.posts[0].pk))
+
+    def test_admin_action_streams_selected_rows(self):
+        """Действие админки отдаёт выбранные посты потоком."""
+        client = Client()
+        client.force_login(ExportTests.admin)
+        selected = [post.pk for post in ExportTests.posts[:2]]
+        response = client.post(
+            reverse("admin:posts_post_changelist"),
+            {"action": "export_ndjson", "_selected_action": selected},
+        )
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["id"] for row in rows], selected)
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Старая группа",
+            slug="old-group",
+            description="Тестовое описание",
+        )
+        cls.tmp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def write(self, name, lines):
+        path = os.path.join(ImportTests.tmp_dir, name)
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            output.writelines(lines)
+        return path
+
+    def load(self, path, *args):
+        stdout = io.StringIO()
+        call_command(
+            "import_yatube", path, *args, stdout=stdout, stderr=io.StringIO()
+        )
+        return stdout.getvalue()
+
+    def test_ndjson_import_runs_deferred_maintenance(self):
+        """Импорт связывает строки и обновляет счётчики, поиск и ленты."""
+        records = [
+            {
+                "model": "groups",
+                "id": 7,
+                "title": "Новая группа",
+                "slug": "new-group",
+                "description": "Описание",
+            },
+            {
+                "model": "posts",
+                "id": 100,
+                "author": "legacy",
+                "group": "new-group",
+                "text": "Старинные рукописи",
+                "pub_date": "2015-03-01T10:00:00+00:00",
+                "image": "",
+            },
+            {
+                "model": "posts",
+                "id": 101,
+                "author": "legacy",
+                "group": "old-group",
+                "text": "Второй пост",
+                "pub_date": "2015-03-02T10:00:00+00:00",
+                "image": "",
+            },
+            {
+                "model": "comments",
+                "id": 5,
+                "post": 100,
+                "author": "reader",
+                "text": "Комментарий",
+                "created": "2015-03-03T10:00:00+00:00",
+            },
+            {
+                "model": "comments",
+                "id": 6,
+                "post": 999,
+                "author": "reader",
+                "text": "Без поста",
+                "created": "2015-03-03T10:00:00+00:00",
+            },
+            {
+                "model": "follows",
+                "id": 1,
+                "user": "reader",
+                "author": "legacy",
+            },
+        ]
+        output = self.load(
+            self.write(
+                "dump.ndjson",
+                (json.dumps(record) + "\n" for record in records),
+            ),
+            "--batch-size",
+            "1",
+        )
+        self.assertIn("строк/с", output)
+        self.assertIn("comments: загружено 1, пропущено 1", output)
+
+        legacy = User.objects.get(username="legacy")
+        old_post = Post.objects.get(text="Старинные рукописи")
+        self.assertEqual(old_post.group.slug, "new-group")
+        self.assertEqual(old_post.pub_date.year, 2015)
+        self.assertEqual(old_post.comments_count, 1)
+        self.assertEqual(old_post.comments.get().created.day, 3)
+        self.assertEqual(legacy.counters.posts_count, 2)
+        ImportTests.group.refresh_from_db()
+        self.assertEqual(ImportTests.group.posts_count, 1)
+        self.assertEqual(
+            search.search_posts("старинную рукописям"), [old_post.pk]
+        )
+        self.assertEqual(ImportTests.reader.timeline_entries.count(), 2)
+
+    def test_csv_import_and_image_copy(self):
+        """CSV загружается по --dataset, картинки копируются в MEDIA."""
+        source_media = os.path.join(ImportTests.tmp_dir, "source")
+        target_media = os.path.join(ImportTests.tmp_dir, "target")
+        os.makedirs(os.path.join(source_media, "posts"))
+        with open(os.path.join(source_media, "posts", "a.gif"), "wb") as f:
+            f.write(b"GIF89a")
+        path = self.write(
+            "posts.csv",
+            [
+                "id,author,group,text,pub_date,image\r\n",
+                "1,reader,,Пост из CSV,2016-01-01T00:00:00+00:00,"
+                "posts/a.gif\r\n",
+            ],
+        )
+        with override_settings(MEDIA_ROOT=target_media), mock.patch.object(
+            thumbnails, "get_queue"
+        ) as get_queue:
+            self.load(
+                path,
+                "--format",
+                "csv",
+                "--dataset",
+                "posts",
+                "--media-from",
+                source_media,
+            )
+        post = Post.objects.get(text="Пост из CSV")
+        self.assertIsNone(post.group)
+        self.assertTrue(
+            os.path.exists(os.path.join(target_media, "posts", "a.gif"))
+        )
+        get_queue.return_value.put.assert_called_once_with(
+            {"post_id": post.pk, "image": "posts/a.gif"}
+        )
+
+
+class RoundTripTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.tmp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def dump(self, dataset):
+        path = os.path.join(RoundTripTests.tmp_dir, f"{dataset}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            call_command(
+                "export_yatube",
+                dataset,
+                "--format",
+                "csv",
+                stdout=output,
+                stderr=io.StringIO(),
+            )
+        return path
+
+    def load(self, path, dataset):
+        call_command(
+            "import_yatube",
+            path,
+            "--format",
+            "csv",
+            "--dataset",
+            dataset,
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+
+    def test_csv_datasets_import_in_separate_runs(self):
+        """Посты и комментарии из отдельных CSV связываются и сохраняют
+        даты."""
+        post = Post.objects.create(
+            author=RoundTripTests.author, text="Пост из прошлого"
+        )
+        Comment.objects.create(
+            post=post, author=RoundTripTests.author, text="Ответ"
+        )
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=post.pub_date.replace(year=2015)
+        )
+        posts_csv, comments_csv = self.dump("posts"), self.dump("comments")
+        Post.objects.all().delete()
+
+        self.load(posts_csv, "posts")
+        self.load(comments_csv, "comments")
+        restored = Post.objects.get(text="Пост из прошлого")
+        self.assertEqual(restored.pub_date.year, 2015)
+        self.assertEqual(restored.comments.get().text, "Ответ")
+        self.assertEqual(restored.comments_count, 1)
+
+        self.load(posts_csv, "posts")
+        self.load(comments_csv, "comments")
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertTrue(Post._meta.get_field("pub_date").auto_now_add)
+
+    def test_legacy_ids_do_not_clash_with_local_posts(self):
+        """Пост выгрузки с занятым локально id загружается под новым id,
+        и его комментарии не попадают к чужому посту."""
+        legacy = Post.objects.create(
+            author=RoundTripTests.author, text="Пост из выгрузки"
+        )
+        Comment.objects.create(
+            post=legacy, author=RoundTripTests.author, text="К выгрузке"
+        )
+        posts_csv, comments_csv = self.dump("posts"), self.dump("comments")
+        Post.objects.all().delete()
+        Post.objects.create(
+            pk=legacy.pk, author=RoundTripTests.author, text="Локальный пост"
+        )
+
+        self.load(posts_csv, "posts")
+        self.load(comments_csv, "comments")
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertFalse(Comment.objects.filter(post_id=legacy.pk).exists())
+        self.assertEqual(
+            Post.objects.get(text="Пост из выгрузки").comments.get().text,
+            "К выгрузке",
+        )
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..fragments import render_cards
+from ..models import Group, Post, User
+
+
+class CardFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            text="Тестовый текст", author=cls.user, group=cls.group
+        )
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self):
+        return Post.objects.select_related("author", "group")
+
+    def test_cached_cards_skip_template_rendering(self):
+        """Повторный рендер страницы берёт карточки из кэша."""
+        first = render_cards(self.posts(), to_show_groups=True)
+        Post.objects.update(text="Изменено в обход модели")
+        second = render_cards(self.posts(), to_show_groups=True)
+        self.assertEqual(first, second)
+        self.assertIn("Тестовый текст", second[0])
+
+    def test_post_edit_renders_fresh_card(self):
+        """Правка поста меняет updated_at и ключ карточки."""
+        render_cards(self.posts())
+        post = Post.objects.get(pk=CardFragmentTests.post.pk)
+        post.text = "Новый текст"
+        post.save()
+        self.assertIn("Новый текст", render_cards(self.posts())[0])
+
+    def test_group_rename_and_author_rename_expire_cards(self):
+        """Переименование группы и автора сбрасывает карточки."""
+        render_cards(self.posts(), to_show_groups=True)
+        group = CardFragmentTests.group
+        group.title = "Новое имя группы"
+        group.save()
+        self.assertIn(
+            "Новое имя группы",
+            render_cards(self.posts(), to_show_groups=True)[0],
+        )
+        user = CardFragmentTests.user
+        user.first_name = "Лев"
+        user.last_name = "Толстой"
+        user.save()
+        self.assertIn("Лев Толстой", render_cards(self.posts())[0])
+
+    def test_index_page_renders_cached_cards(self):
+        """Главная страница выводит карточки постов."""
+        response = CardFragmentTests.guest_client.get(reverse("posts:index"))
+        self.assertContains(response, "Тестовый текст")
+        self.assertContains(response, "Все записи группы: Тестовая группа")
@@ -0,0 +1,91 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..constants import POSTS_PER_PAGE
+from ..models import Comment, Follow, Group, Post, User
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+$")
+
+
+class QueryPlanTests(TestCase):
+    """Запросы лент читают данные по индексам, без полного прохода и
+    сортировки во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="reader")
+        cls.author = User.objects.create_user(username="writer")
+        cls.client_logged = Client()
+        cls.client_logged.force_login(cls.user)
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for number in range(POSTS_PER_PAGE + 3):
+            cls.post = Post.objects.create(
+                text=f"Пост {number}", author=cls.author, group=cls.group
+            )
+        Comment.objects.create(
+            text="Комментарий", post=cls.post, author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def query_plans(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = QueryPlanTests.client_logged.get(url, params)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if "posts_" not in query["sql"]:
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.extend(
+                    (query["sql"], row[-1]) for row in cursor.fetchall()
+                )
+        return response, plans
+
+    def assert_indexed(self, url, **params):
+        response, plans = self.query_plans(url, **params)
+        for sql, detail in plans:
+            with self.subTest(url=url, sql=sql, detail=detail):
+                self.assertNotRegex(detail, FULL_SCAN)
+                self.assertNotIn("TEMP B-TREE", detail)
+        return response
+
+    def test_feed_queries_use_indexes(self):
+        """Первая и следующая страницы лент читаются по индексам."""
+        urls = (
+            reverse("posts:index"),
+            reverse(
+                "posts:group_list",
+                kwargs={"slug": QueryPlanTests.group.slug},
+            ),
+            reverse(
+                "posts:profile",
+                kwargs={"username": QueryPlanTests.author.username},
+            ),
+            reverse("posts:follow_index"),
+        )
+        for url in urls:
+            response = self.assert_indexed(url)
+            cursor = response.context["page_obj"].next_cursor
+            self.assert_indexed(url, cursor=cursor)
+
+    def test_post_detail_queries_use_indexes(self):
+        """Страница поста и её комментарии читаются по индексам."""
+        self.assert_indexed(
+            reverse(
+                "posts:post_detail",
+                kwargs={"post_id": QueryPlanTests.post.id},
+            )
+        )
@@ -0,0 +1,134 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import tasks
+
+from .. import search, timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+TASKS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(TASKS_DB=f"{TASKS_DIR}/tasks.sqlite3")
+class DeferredSideEffectsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TASKS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        # TestCase не фиксирует транзакцию: выполняем on_commit сразу.
+        patcher = mock.patch.object(
+            tasks.transaction, "on_commit", lambda func: func()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.table = tasks.get_table()
+        tasks.drain(self.table)
+
+    def test_post_create_defers_fan_out_and_indexing(self):
+        """Лента подписчика и поиск обновляются воркером, не запросом."""
+        Follow.objects.create(
+            user=DeferredSideEffectsTests.reader,
+            author=DeferredSideEffectsTests.author,
+        )
+        tasks.drain(self.table)
+        DeferredSideEffectsTests.author_client.post(
+            reverse("posts:post_create"), {"text": "Отложенный пост"}
+        )
+        post = Post.objects.get(text="Отложенный пост")
+        self.assertEqual(post.author.counters.posts_count, 1)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(search.search_posts("отложенный"), [])
+
+        self.assertEqual(tasks.drain(self.table), 2)
+        self.assertTrue(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(search.search_posts("отложенный"), [post.pk])
+
+    def test_follow_defers_backfill(self):
+        """Подписка дозаполняет ленту в воркере."""
+        Post.objects.create(
+            text="Старый", author=DeferredSideEffectsTests.author
+        )
+        tasks.drain(self.table)
+        DeferredSideEffectsTests.reader_client.get(
+            reverse("posts:profile_follow", args=["author"])
+        )
+        entries = TimelineEntry.objects.filter(
+            user=DeferredSideEffectsTests.reader
+        )
+        self.assertFalse(entries.exists())
+        self.assertEqual(tasks.drain(self.table), 1)
+        self.assertEqual(entries.count(), 1)
+
+    def test_unfollow_before_worker_skips_backfill(self):
+        """Снятая до запуска задачи подписка ленту не заполняет."""
+        Post.objects.create(
+            text="Старый", author=DeferredSideEffectsTests.author
+        )
+        tasks.drain(self.table)
+        for name in ("posts:profile_follow", "posts:profile_unfollow"):
+            DeferredSideEffectsTests.reader_client.get(
+                reverse(name, args=["author"])
+            )
+        tasks.drain(self.table)
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                user=DeferredSideEffectsTests.reader
+            ).exists()
+        )
+
+    def test_unfollow_during_backfill_clears_entries(self):
+        """Отписка, прошедшая до вставки записей, их не оставляет."""
+        Post.objects.create(
+            text="Старый", author=DeferredSideEffectsTests.author
+        )
+        DeferredSideEffectsTests.reader_client.get(
+            reverse("posts:profile_follow", args=["author"])
+        )
+        backfill = timeline.backfill
+
+        def unfollow_first(user_id, author_id):
+            DeferredSideEffectsTests.reader_client.get(
+                reverse("posts:profile_unfollow", args=["author"])
+            )
+            backfill(user_id, author_id)
+
+        with mock.patch.object(timeline, "backfill", unfollow_first):
+            tasks.drain(self.table)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                user=DeferredSideEffectsTests.reader
+            ).exists()
+        )
+
+    def test_repeated_edits_are_indexed_once(self):
+        """Правки до запуска воркера сливаются в одну задачу индекса."""
+        post = Post.objects.create(
+            text="Первый", author=DeferredSideEffectsTests.author
+        )
+        tasks.drain(self.table)
+        for text in ("Второй", "Третий"):
+            DeferredSideEffectsTests.author_client.post(
+                reverse("posts:post_edit", args=[post.pk]), {"text": text}
+            )
+        self.assertEqual(tasks.drain(self.table), 1)
+        self.assertEqual(search.search_posts("третий"), [post.pk])
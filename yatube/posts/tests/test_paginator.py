@@ -1,8 +1,10 @@
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from ..constants import POSTS_PER_PAGE
 from ..models import Group, Post, User
+from ..paginators import decode_cursor
 
 
 class PaginatorViewsTest(TestCase):
@@ -30,6 +32,9 @@ class PaginatorViewsTest(TestCase):
                 group=cls.group,
             )
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """Проверка: на первой странице должно быть POSTS_PER_PAGE постов."""
         urls_quantity = (
@@ -81,3 +86,64 @@ class PaginatorViewsTest(TestCase):
                     reverse_name + "?page=2"
                 )
             self.assertEqual(len(response.context["page_obj"]), quantity)
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+        url = reverse("posts:index")
+        first = PaginatorViewsTest.authorized_client.get(url)
+        first_ids = [post.id for post in first.context["page_obj"]]
+        next_cursor = first.context["page_obj"].next_cursor
+
+        second = PaginatorViewsTest.authorized_client.get(
+            url, {"cursor": next_cursor}
+        )
+        second_page = second.context["page_obj"]
+        self.assertEqual(len(second_page), self.REMAINDER)
+        self.assertFalse(second_page.has_next())
+        self.assertTrue(second_page.has_previous())
+        self.assertFalse(
+            set(first_ids) & {post.id for post in second_page}
+        )
+
+        back = PaginatorViewsTest.authorized_client.get(
+            url, {"cursor": second_page.previous_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in back.context["page_obj"]], first_ids
+        )
+
+    def test_cursor_page_does_not_count_rows(self):
+        """Страница по курсору читается одним запросом без COUNT(*)."""
+        url = reverse(
+            "posts:group_list",
+            kwargs={"slug": f"{PaginatorViewsTest.group.slug}"},
+        )
+        response = PaginatorViewsTest.authorized_client.get(url)
+        cursor = response.context["page_obj"].next_cursor
+        with self.assertNumQueries(4) as queries:
+            PaginatorViewsTest.authorized_client.get(url, {"cursor": cursor})
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_last_and_broken_cursors(self):
+        """Курсор «последняя» и битый курсор отдают корректные страницы."""
+        url = reverse("posts:index")
+        response = PaginatorViewsTest.authorized_client.get(url)
+        last = PaginatorViewsTest.authorized_client.get(
+            url, {"cursor": response.context["page_obj"].last_cursor}
+        )
+        self.assertEqual(len(last.context["page_obj"]), POSTS_PER_PAGE)
+        self.assertFalse(last.context["page_obj"].has_next())
+        broken = PaginatorViewsTest.authorized_client.get(
+            url, {"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(len(broken.context["page_obj"]), POSTS_PER_PAGE)
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+
+    def test_legacy_page_links_to_cursor(self):
+        """Старая ссылка ?page=N отдаёт курсор на соседние страницы."""
+        response = PaginatorViewsTest.authorized_client.get(
+            reverse("posts:index") + "?page=1"
+        )
+        self.assertIsNotNone(response.context["page_obj"].next_cursor)
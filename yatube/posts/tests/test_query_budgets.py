@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetTestMixin, budgets
+
+from ..constants import POSTS_PER_PAGE
+from ..models import Comment, Follow, Group, Post, User
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        for number in range(POSTS_PER_PAGE + 1):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f"Пост {number}"
+            )
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text="Комментарий"
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_views_stay_within_query_budget(self):
+        """Виды posts укладываются в бюджет запросов при холодном кэше."""
+        post_id = QueryBudgetTests.post.pk
+        requests = (
+            ("get", "posts:index", {}, None),
+            ("get", "posts:group_list", {"slug": "test-group"}, None),
+            ("get", "posts:profile", {"username": "author"}, None),
+            ("get", "posts:post_detail", {"post_id": post_id}, None),
+            ("get", "posts:post_comments", {"post_id": post_id}, None),
+            ("get", "posts:follow_index", {}, None),
+            ("get", "posts:search", {}, {"q": "пост"}),
+            (
+                "get",
+                "posts:user_fragments",
+                {},
+                {"path": reverse("posts:profile", args=["author"])},
+            ),
+            ("get", "posts:post_create", {}, None),
+            ("post", "posts:post_create", {}, {"text": "Новый"}),
+            ("post", "posts:add_comment", {"post_id": post_id}, {"text": "К"}),
+            ("get", "posts:profile_unfollow", {"username": "author"}, None),
+            ("get", "posts:profile_follow", {"username": "author"}, None),
+        )
+        for method, name, kwargs, data in requests:
+            with self.subTest(view=name, method=method):
+                cache.clear()
+                response = getattr(QueryBudgetTests.reader_client, method)(
+                    reverse(name, kwargs=kwargs), data
+                )
+                self.assertWithinQueryBudget(response)
+
+    def test_post_edit_stays_within_query_budget(self):
+        """Редактирование поста укладывается в бюджет запросов."""
+        url = reverse(
+            "posts:post_edit", kwargs={"post_id": QueryBudgetTests.post.pk}
+        )
+        for data in (None, {"text": "Правка"}):
+            with self.subTest(data=data):
+                method = "post" if data else "get"
+                response = getattr(QueryBudgetTests.author_client, method)(
+                    url, data
+                )
+                self.assertWithinQueryBudget(response)
+
+    def test_every_posts_url_has_budget(self):
+        """У каждого URL приложения posts есть бюджет запросов."""
+        from ..urls import urlpatterns
+
+        for pattern in urlpatterns:
+            with self.subTest(name=pattern.name):
+                self.assertIn(f"posts:{pattern.name}", budgets)
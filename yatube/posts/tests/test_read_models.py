@@ -0,0 +1,60 @@
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+
+from ..constants import COMMENTS_PER_PAGE
+from ..forms import CommentForm
+from ..models import Comment, Group, Post, User
+from ..read_models import PostDetail
+
+DETAIL_QUERIES: int = 2
+
+
+class PostDetailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.lonely_post = Post.objects.create(author=cls.author, text="Пост")
+        cls.popular_post = Post.objects.create(
+            author=cls.author, group=cls.group, text="Популярный пост"
+        )
+        for index in range(COMMENTS_PER_PAGE + 5):
+            Comment.objects.create(
+                post=cls.popular_post,
+                author=User.objects.create_user(username=f"reader{index}"),
+                text=f"Комментарий {index}",
+            )
+        cls.request = RequestFactory().get("/")
+        cls.request.user = AnonymousUser()
+
+    def test_query_count_does_not_depend_on_data(self):
+        """Загрузка и рендер страницы поста — всегда два запроса."""
+        posts = (PostDetailTests.lonely_post, PostDetailTests.popular_post)
+        for post in posts:
+            for order in ("new", "old"):
+                with self.subTest(post=post.text, order=order):
+                    with self.assertNumQueries(DETAIL_QUERIES):
+                        detail = PostDetail.load(post.pk, order)
+                        html = render_to_string(
+                            "posts/post_detail.html",
+                            {**detail.context(), "form": CommentForm()},
+                            PostDetailTests.request,
+                        )
+                    self.assertIn(post.text, html)
+
+    def test_detail_uses_denormalized_counters(self):
+        """Числа постов автора и комментариев берутся из счётчиков."""
+        detail = PostDetail.load(PostDetailTests.popular_post.pk, "new")
+        self.assertEqual(detail.post.author.counters.posts_count, 2)
+        self.assertEqual(detail.post.comments_count, COMMENTS_PER_PAGE + 5)
+        self.assertEqual(len(detail.comments), COMMENTS_PER_PAGE)
+        self.assertEqual(
+            detail.comments[0].author.username,
+            f"reader{COMMENTS_PER_PAGE + 4}",
+        )
@@ -0,0 +1,158 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import search
+from ..models import Comment, Post, SearchPosting
+from ..stemming import stem, terms
+
+User = get_user_model()
+
+
+class StemmingTests(TestCase):
+    def test_word_forms_share_stem(self):
+        """Словоформы приводятся к одной основе."""
+        for forms in (
+            ("книга", "книги", "книгами", "книгу"),
+            ("читать", "читали", "читаю"),
+            ("ёлка", "елки"),
+        ):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(word) for word in forms}), 1)
+
+    def test_terms_skip_too_long_words(self):
+        """В термы не попадают слишком длинные слова."""
+        self.assertEqual(terms("Кошки " + "x" * 100), [stem("кошки")])
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.cats = Post.objects.create(
+            author=SearchIndexTests.user, text="Кошки любят рыбу и кошек"
+        )
+        self.dogs = Post.objects.create(
+            author=SearchIndexTests.user, text="Собаки охраняют дом"
+        )
+        self.comment = Comment.objects.create(
+            post=self.dogs,
+            author=SearchIndexTests.user,
+            text="А моя кошка боится собак",
+        )
+
+    def check_index(self):
+        self.assertEqual(
+            search.search_posts("кошку"), [self.cats.pk, self.dogs.pk]
+        )
+        self.assertEqual(search.search_posts("собаку в доме"), [self.dogs.pk])
+        self.assertEqual(search.search_comments("кошка"), [self.comment.pk])
+        self.assertEqual(search.search_posts("жираф"), [])
+
+        self.cats.text = "Жирафы едят листья"
+        self.cats.save()
+        self.comment.delete()
+        self.assertEqual(search.search_posts("кошка"), [])
+        self.assertEqual(search.search_posts("жирафу"), [self.cats.pk])
+        self.dogs.delete()
+        self.assertEqual(search.search_posts("собака"), [])
+
+    def test_fts_index_is_maintained(self):
+        """Индекс FTS5 обновляется при сохранении и удалении."""
+        self.assertIsInstance(search.get_index(), search.FtsIndex)
+        self.check_index()
+
+    def test_token_index_is_maintained(self):
+        """Запасной индекс в таблице ведёт себя так же, как FTS5."""
+        token_index = search.TokenIndex(SearchPosting)
+        search.rebuild(
+            token_index,
+            Post.objects.values_list("pk", "text"),
+            Comment.objects.values_list("pk", "post_id", "text"),
+        )
+        with mock.patch.object(search, "get_index", return_value=token_index):
+            self.check_index()
+        self.assertFalse(SearchPosting.objects.filter(term=stem("собак")))
+
+    def test_fts_limit_is_applied_in_sql(self):
+        """FTS5 отбирает лучшие посты в SQL, а не дочитывает курсор."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                search.search_posts("кошку", limit=1), [self.cats.pk]
+            )
+        self.assertIn("LIMIT 1", queries[-1]["sql"])
+
+    def test_token_index_caches_term_frequencies(self):
+        """Частоты термов не пересчитываются на каждом запросе."""
+        token_index = search.TokenIndex(SearchPosting)
+        search.rebuild(
+            token_index,
+            Post.objects.values_list("pk", "text"),
+            Comment.objects.values_list("pk", "post_id", "text"),
+        )
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                token_index.posts(terms("кошка"), 10),
+                [self.cats.pk, self.dogs.pk],
+            )
+        with self.assertNumQueries(1):
+            token_index.posts(terms("кошка"), 10)
+
+    def test_search_page_shows_ranked_posts(self):
+        """Страница поиска выводит найденные посты."""
+        response = Client().get(reverse("posts:search"), {"q": "собаки"})
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            [self.dogs.pk],
+        )
+        self.assertContains(response, "Собаки охраняют дом")
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через индекс и понимает словоформы."""
+        client = Client()
+        client.force_login(SearchIndexTests.admin)
+        response = client.get(
+            reverse("admin:posts_post_changelist"), {"q": "кошкам"}
+        )
+        self.assertEqual(
+            set(response.context["cl"].result_list),
+            {self.cats, self.dogs},
+        )
+
+    def test_admin_search_is_not_limited(self):
+        """Админка находит все совпадения, сверх SEARCH_RESULTS_LIMIT."""
+        client = Client()
+        client.force_login(SearchIndexTests.admin)
+        token_index = search.TokenIndex(SearchPosting)
+        search.rebuild(
+            token_index,
+            Post.objects.values_list("pk", "text"),
+            Comment.objects.values_list("pk", "post_id", "text"),
+        )
+        for index in (search.get_index(), token_index):
+            with self.subTest(index=type(index).__name__):
+                with mock.patch.object(
+                    search, "get_index", return_value=index
+                ), mock.patch.object(
+                    search.search_posts, "__defaults__", (1,)
+                ):
+                    response = client.get(
+                        reverse("admin:posts_post_changelist"),
+                        {"q": "кошкам"},
+                    )
+                self.assertEqual(
+                    set(response.context["cl"].result_list),
+                    {self.cats, self.dogs},
+                )
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+
+@override_settings(EDGE_SHELL=True, EDGE_SHELL_MAX_AGE=30)
+class EdgeShellTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=group, text="Пост"
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.profile_url = reverse("posts:profile", args=["author"])
+        cls.detail_url = reverse("posts:post_detail", args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(EdgeShellTests.reader)
+        self.author_client = Client()
+        self.author_client.force_login(EdgeShellTests.author)
+
+    def fragments(self, client, path):
+        response = client.get(
+            reverse("posts:user_fragments"), {"path": path}
+        )
+        self.assertIn("private", response["Cache-Control"])
+        return response.json()
+
+    def test_public_pages_are_one_anonymous_shell(self):
+        """Вошедший получает ту же публичную оболочку, что и гость."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=["test-group"]),
+            EdgeShellTests.profile_url,
+            EdgeShellTests.detail_url,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                response = self.author_client.get(url)
+                guest = Client().get(url)
+                self.assertEqual(
+                    response["Cache-Control"], "public, max-age=30"
+                )
+                self.assertFalse(response.has_header("Vary"))
+                self.assertNotIn("csrftoken", response.cookies)
+                self.assertNotContains(response, "Выйти")
+                self.assertContains(response, 'data-user-fragment="nav"')
+                self.assertContains(response, reverse("posts:user_fragments"))
+                self.assertEqual(response.content, guest.content)
+
+    def test_post_detail_shell_has_no_personal_parts(self):
+        """Автор не видит в оболочке формы и ссылки на правку."""
+        response = self.author_client.get(EdgeShellTests.detail_url)
+        self.assertNotContains(response, "csrfmiddlewaretoken")
+        self.assertNotContains(response, "Редактировать запись")
+        self.assertContains(response, 'data-user-fragment="comment_form"')
+        self.assertContains(response, 'data-user-fragment="edit_link"')
+
+    def test_fragments_for_post_detail(self):
+        """Автору приходят меню, форма комментария и ссылка на правку."""
+        fragments = self.fragments(
+            self.author_client, EdgeShellTests.detail_url
+        )
+        self.assertEqual(
+            set(fragments), {"nav", "edit_link", "comment_form"}
+        )
+        self.assertIn("Выйти", fragments["nav"])
+        self.assertIn("Редактировать запись", fragments["edit_link"])
+        self.assertIn("csrfmiddlewaretoken", fragments["comment_form"])
+        reader = self.fragments(self.reader_client, EdgeShellTests.detail_url)
+        self.assertNotIn("Редактировать запись", reader["edit_link"])
+
+    def test_fragments_for_profile(self):
+        """Подписчику приходит кнопка «Отписаться», гостю — меню входа."""
+        fragments = self.fragments(
+            self.reader_client, EdgeShellTests.profile_url
+        )
+        self.assertIn("Отписаться", fragments["follow"])
+        guest = self.fragments(Client(), EdgeShellTests.profile_url)
+        self.assertIn("Войти", guest["nav"])
+        self.assertIn("Подписаться", guest["follow"])
+
+    def test_unknown_path_is_404(self):
+        """Фрагменты для несуществующей страницы не отдаются."""
+        response = self.reader_client.get(
+            reverse("posts:user_fragments"), {"path": "/no/such/page/"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(EDGE_SHELL=False)
+    def test_pages_stay_personal_without_shell(self):
+        """Без EDGE_SHELL страница персональна, как раньше."""
+        response = self.author_client.get(EdgeShellTests.detail_url)
+        self.assertContains(response, "Редактировать запись")
+        self.assertContains(response, "Выйти")
+        self.assertNotIn("public", response.get("Cache-Control", ""))
@@ -0,0 +1,242 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from core.spool import DirectoryQueue
+
+from .. import thumbnails, variants
+from ..constants import (
+    CARD_THUMBNAIL,
+    IMAGE_VARIANTS,
+    THUMBNAIL_SIZES,
+    VARIANT_WIDTHS,
+)
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_QUEUE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_QUEUE_DIR=TEMP_QUEUE_DIR
+)
+class ThumbnailPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(TEMP_QUEUE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.queue = DirectoryQueue(TEMP_QUEUE_DIR)
+
+    def create_post(self):
+        # TestCase не фиксирует транзакцию: выполняем on_commit сразу.
+        with mock.patch.object(
+            thumbnails.transaction, "on_commit", lambda func: func()
+        ):
+            ThumbnailPipelineTests.authorized_client.post(
+                reverse("posts:post_create"),
+                data={
+                    "text": "Пост с картинкой",
+                    "image": SimpleUploadedFile(
+                        "small.gif", SMALL_GIF, content_type="image/gif"
+                    ),
+                },
+            )
+        return Post.objects.get(text="Пост с картинкой")
+
+    def test_post_create_enqueues_and_worker_builds_thumbnails(self):
+        """Создание поста ставит задачу, воркер строит миниатюру."""
+        post = self.create_post()
+        self.assertEqual(len(self.queue), 1)
+        self.assertIsNone(post.card_thumbnail)
+
+        self.assertEqual(thumbnails.drain(self.queue), 1)
+        post.refresh_from_db()
+        self.assertIn("url", post.card_thumbnail)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_pages_do_not_call_thumbnail_engine(self):
+        """Страницы выводят готовые миниатюры без обращения к sorl."""
+        post = self.create_post()
+        thumbnails.drain(self.queue)
+        post.refresh_from_db()
+        with mock.patch(
+            "sorl.thumbnail.base.ThumbnailBackend.get_thumbnail",
+            side_effect=AssertionError("PIL во время запроса"),
+        ):
+            for url in (
+                reverse("posts:index"),
+                reverse("posts:post_detail", kwargs={"post_id": post.id}),
+            ):
+                with self.subTest(url=url):
+                    response = ThumbnailPipelineTests.authorized_client.get(
+                        url
+                    )
+                    self.assertContains(response, post.card_thumbnail["url"])
+
+    def test_worker_builds_variants_and_cards_render_srcset(self):
+        """Воркер строит варианты картинки, карточка выводит srcset."""
+        post = self.create_post()
+        thumbnails.drain(self.queue)
+        post.refresh_from_db()
+        built = post.thumbnail(IMAGE_VARIANTS)
+        self.assertIn("image/jpeg", built)
+        for mime, _, extension in variants.supported_formats():
+            with self.subTest(mime=mime):
+                variant = built[mime][0]
+                self.assertEqual(variant["width"], VARIANT_WIDTHS[0])
+                self.assertTrue(variant["url"].endswith(f".{extension}"))
+        response = ThumbnailPipelineTests.authorized_client.get(
+            reverse("posts:index")
+        )
+        for source in post.card_sources:
+            self.assertContains(response, f'srcset="{source["srcset"]}"')
+
+    def test_variants_cover_widths_up_to_source(self):
+        """Ширины вариантов не превышают ширину оригинала."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), "red").save(buffer, "JPEG")
+        post = Post.objects.create(
+            author=ThumbnailPipelineTests.user,
+            text="Большая картинка",
+            image=SimpleUploadedFile("big.jpg", buffer.getvalue()),
+        )
+        built = variants.build_variants(post.image)
+        widths = [variant["width"] for variant in built["image/jpeg"]]
+        self.assertEqual(
+            widths, [width for width in VARIANT_WIDTHS if width <= 800]
+        )
+        for variant in built["image/jpeg"]:
+            path = os.path.join(
+                TEMP_MEDIA_ROOT,
+                variant["url"][len(settings.MEDIA_URL):],
+            )
+            with Image.open(path) as image:
+                self.assertEqual(
+                    image.size,
+                    (variant["width"], round(variant["width"] * 339 / 960)),
+                )
+
+    def test_rebuilt_variants_keep_their_names(self):
+        """Повторная сборка вариантов не оставляет копий с суффиксами."""
+        post = self.create_post()
+        first = variants.build_variants(post.image)
+        directory = os.path.join(TEMP_MEDIA_ROOT, "posts")
+        files = sorted(os.listdir(directory))
+        self.assertEqual(variants.build_variants(post.image), first)
+        self.assertEqual(sorted(os.listdir(directory)), files)
+
+    def test_image_changed_outside_views_is_rescheduled(self):
+        """Смена картинки через ORM (админка, shell) сбрасывает миниатюры
+        и ставит задачу; пост без картинки очередь не трогает."""
+        with mock.patch.object(
+            thumbnails.transaction, "on_commit", lambda func: func()
+        ):
+            with CaptureQueriesContext(connection) as captured:
+                post = Post.objects.create(
+                    author=ThumbnailPipelineTests.user, text="Без картинки"
+                )
+            self.assertFalse(
+                any(
+                    query["sql"].startswith("UPDATE")
+                    and "thumbnails" in query["sql"]
+                    for query in captured
+                )
+            )
+            self.assertEqual(len(self.queue), 0)
+
+            post.image = SimpleUploadedFile(
+                "late.gif", SMALL_GIF, content_type="image/gif"
+            )
+            post.save()
+            self.assertEqual(len(self.queue), 1)
+            post.text = "Правка текста"
+            post.save()
+            self.assertEqual(len(self.queue), 1)
+        thumbnails.drain(self.queue)
+        post.refresh_from_db()
+        self.assertIsNotNone(post.thumbnail(CARD_THUMBNAIL))
+
+    def test_stale_job_does_not_overwrite_new_image(self):
+        """Задача для заменённой картинки ничего не записывает."""
+        post = self.create_post()
+        Post.objects.filter(pk=post.pk).update(image="posts/other.gif")
+        thumbnails.drain(self.queue)
+        post.refresh_from_db()
+        self.assertIsNone(post.thumbnail(CARD_THUMBNAIL))
+
+    def test_pages_enqueue_legacy_posts_once(self):
+        """Пост без готовых миниатюр страница ставит воркеру один раз,
+        а воркер находит миниатюру, которую sorl построил раньше."""
+        post = self.create_post()
+        legacy = get_thumbnail(
+            post.image, CARD_THUMBNAIL, **THUMBNAIL_SIZES[CARD_THUMBNAIL]
+        )
+        for name, _ in self.queue.claim(10):
+            self.queue.done(name)
+        cache.clear()
+        with mock.patch(
+            "sorl.thumbnail.base.ThumbnailBackend.get_thumbnail",
+            side_effect=AssertionError("sorl во время запроса"),
+        ):
+            for url in (
+                reverse("posts:index"),
+                reverse("posts:profile", args=["author"]),
+            ):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(self.queue), 1)
+        thumbnails.drain(self.queue)
+        post.refresh_from_db()
+        self.assertEqual(post.card_thumbnail["url"], legacy.url)
+
+    def test_legacy_card_links_to_thumbnail_not_original(self):
+        """Карточка поста без миниатюр не ссылается на оригинал,
+        а адрес миниатюры перенаправляет на уменьшенную копию sorl."""
+        post = self.create_post()
+        response = self.client.get(reverse("posts:index"))
+        thumbnail_url = reverse(
+            "posts:post_thumbnail", kwargs={"post_id": post.pk}
+        )
+        self.assertContains(response, thumbnail_url)
+        self.assertNotContains(response, post.image.url)
+
+        response = self.client.get(thumbnail_url)
+        card = get_thumbnail(
+            post.image, CARD_THUMBNAIL, **THUMBNAIL_SIZES[CARD_THUMBNAIL]
+        )
+        self.assertRedirects(
+            response, card.url, fetch_redirect_response=False
+        )
+        self.assertIn("max-age", response["Cache-Control"])
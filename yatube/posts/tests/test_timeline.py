@@ -0,0 +1,169 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="reader")
+        cls.author = User.objects.create_user(username="writer")
+        cls.celebrity = User.objects.create_user(username="celebrity")
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def setUp(self):
+        cache.clear()
+
+    def feed_texts(self):
+        response = TimelineTests.reader_client.get(
+            reverse("posts:follow_index")
+        )
+        return [post.text for post in response.context["page_obj"]]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост автора попадает в материализованную ленту подписчика."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        post = Post.objects.create(text="Свежий", author=TimelineTests.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.reader, post=post
+            ).exists()
+        )
+        self.assertEqual(self.feed_texts(), ["Свежий"])
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        """Подписка дозаполняет ленту, отписка очищает её."""
+        Post.objects.create(text="Старый", author=TimelineTests.author)
+        TimelineTests.reader_client.get(
+            reverse(
+                "posts:profile_follow",
+                kwargs={"username": TimelineTests.author.username},
+            )
+        )
+        self.assertEqual(self.feed_texts(), ["Старый"])
+        TimelineTests.reader_client.get(
+            reverse(
+                "posts:profile_unfollow",
+                kwargs={"username": TimelineTests.author.username},
+            )
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+        self.assertEqual(self.feed_texts(), [])
+
+    @mock.patch("posts.timeline.TIMELINE_LENGTH", 2)
+    def test_timeline_is_trimmed(self):
+        """Лента обрезается до TIMELINE_LENGTH самых свежих записей."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        for number in range(4):
+            Post.objects.create(
+                text=f"Пост {number}", author=TimelineTests.author
+            )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).count(), 2
+        )
+        self.assertEqual(self.feed_texts(), ["Пост 3", "Пост 2"])
+
+    @mock.patch("posts.timeline.TIMELINE_LENGTH", 2)
+    def test_trim_skips_timelines_within_length(self):
+        """Обрезка не трогает ленты, которые не длиннее TIMELINE_LENGTH."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        for number in range(2):
+            Post.objects.create(
+                text=f"Пост {number}", author=TimelineTests.author
+            )
+        user_ids = [TimelineTests.reader.pk, TimelineTests.celebrity.pk]
+        with self.assertNumQueries(1):
+            timeline.trim(user_ids)
+        post = Post.objects.create(
+            text="Мимо fan_out", author=TimelineTests.celebrity
+        )
+        TimelineEntry.objects.create(
+            user=TimelineTests.reader, post=post, pub_date=post.pub_date
+        )
+        with self.assertNumQueries(2):
+            timeline.trim(user_ids)
+        self.assertEqual(self.feed_texts(), ["Мимо fan_out", "Пост 1"])
+
+    @mock.patch("posts.timeline.TIMELINE_FAN_OUT_LIMIT", 1)
+    def test_popular_author_is_read_at_request_time(self):
+        """Посты популярного автора не пишутся в ленты, а читаются при
+        запросе."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.celebrity
+        )
+        Post.objects.create(text="Звезда", author=TimelineTests.celebrity)
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+        self.assertEqual(self.feed_texts(), ["Звезда"])
+
+    @mock.patch("posts.timeline.TIMELINE_LENGTH", 2)
+    def test_rebuild_collects_newest_posts_of_followed_authors(self):
+        """rebuild() собирает ленту из свежих постов всех подписок."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.celebrity
+        )
+        for number, author in enumerate(
+            (TimelineTests.author, TimelineTests.celebrity) * 2
+        ):
+            Post.objects.create(text=f"Пост {number}", author=author)
+        TimelineEntry.objects.all().delete()
+
+        timeline.rebuild([TimelineTests.reader.pk])
+        self.assertEqual(self.feed_texts(), ["Пост 3", "Пост 2"])
+
+    @mock.patch("posts.timeline.TIMELINE_FAN_OUT_LIMIT", 2)
+    def test_author_losing_popularity_is_backfilled(self):
+        """Посты, написанные в период популярности, не теряются, когда
+        автор перестаёт быть популярным."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.celebrity
+        )
+        fan = Follow.objects.create(
+            user=TimelineTests.author, author=TimelineTests.celebrity
+        )
+        self.assertTrue(timeline.is_popular(TimelineTests.celebrity.pk))
+        Post.objects.create(text="Звезда", author=TimelineTests.celebrity)
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+        self.assertEqual(self.feed_texts(), ["Звезда"])
+
+        fan.delete()
+        self.assertFalse(timeline.is_popular(TimelineTests.celebrity.pk))
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).count(), 1
+        )
+        self.assertEqual(self.feed_texts(), ["Звезда"])
+
+    @mock.patch("posts.timeline.TIMELINE_FAN_OUT_LIMIT", 1)
+    def test_popular_author_ids_are_cached_until_follow(self):
+        """Популярные подписки читаются из кэша до новой подписки."""
+        self.assertEqual(timeline.popular_author_ids(TimelineTests.reader), [])
+        with self.assertNumQueries(0):
+            timeline.popular_author_ids(TimelineTests.reader)
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.celebrity
+        )
+        self.assertEqual(
+            timeline.popular_author_ids(TimelineTests.reader),
+            [TimelineTests.celebrity.pk],
+        )
@@ -1,3 +1,4 @@
+import os
 import shutil
 import tempfile
 
@@ -13,7 +14,10 @@ from ..models import Comment, Follow, Group, Post, User
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    THUMBNAIL_QUEUE_DIR=os.path.join(TEMP_MEDIA_ROOT, "queue"),
+)
 class PostsPagesTests(TestCase):
 
     ONE: int = 1
@@ -281,7 +285,7 @@ class PostsCacheTests(TestCase):
 
         response_0 = self.authorized_client.get(index_url)
         self.assertIn(self.post, response_0.context["page_obj"])
-        self.post.delete()
+        Post.objects.filter(pk=self.post.pk).update(text="Обход сигналов")
         response_1 = self.authorized_client.get(index_url)
         self.assertIn(post_text_in_bytes, response_1.content)
 
@@ -289,6 +293,86 @@ class PostsCacheTests(TestCase):
         response_2 = self.authorized_client.get(index_url)
         self.assertNotIn(post_text_in_bytes, response_2.content)
 
+    def test_cached_feed_is_not_shared_between_users(self):
+        """Закэшированная лента не отдаёт одному зрителю копию другого."""
+        alice = User.objects.create_user(username="alice")
+        Follow.objects.create(user=alice, author=self.user)
+        alice_client = Client()
+        alice_client.force_login(alice)
+        bob = User.objects.create_user(username="bob")
+        bob_client = Client()
+        bob_client.force_login(bob)
+        urls = (
+            reverse("posts:index"),
+            reverse(
+                "posts:profile", kwargs={"username": self.user.username}
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(
+                    alice_client.get(url), "Пользователь: alice"
+                )
+                response = bob_client.get(url)
+                self.assertContains(response, "Пользователь: bob")
+                self.assertNotContains(response, "alice")
+                self.assertNotContains(response, "Отписаться")
+                response = Client().get(url)
+                self.assertNotContains(response, "alice")
+                self.assertNotContains(response, "Выйти")
+
+    def test_cached_feed_is_not_kept_by_browser(self):
+        """Вошедшему пользователю лента приходит без браузерного срока
+        жизни — и из вида, и из кэша."""
+        urls = (
+            reverse("posts:index"),
+            reverse(
+                "posts:profile", kwargs={"username": self.user.username}
+            ),
+        )
+        for url in urls:
+            for attempt in ("miss", "hit"):
+                with self.subTest(url=url, attempt=attempt):
+                    response = self.authorized_client.get(url)
+                    self.assertFalse(response.has_header("Expires"))
+                    self.assertEqual(
+                        response["Cache-Control"],
+                        "private, no-cache, max-age=0",
+                    )
+
+    def test_feed_caches_expire_on_content_change(self):
+        """Изменения постов и групп сразу сбрасывают кэш всех страниц лент."""
+        group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-group",
+            description="Тестовое описание",
+        )
+        self.post.group = group
+        self.post.save()
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:index") + "?page=1",
+            reverse("posts:group_list", kwargs={"slug": group.slug}),
+            reverse(
+                "posts:profile", kwargs={"username": self.user.username}
+            ),
+        )
+        for url in urls:
+            self.authorized_client.get(url)
+
+        group.title = "Переименованная группа"
+        group.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIsNotNone(response.context)
+
+        self.post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertNotContains(response, "Тестовый текст")
+
 
 class PostsFollowTests(TestCase):
     @classmethod
@@ -0,0 +1,180 @@
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from core.spool import DirectoryQueue
+
+from .constants import (
+    CARD_THUMBNAIL,
+    IMAGE_VARIANTS,
+    THUMBNAIL_JOB_ATTEMPTS,
+    THUMBNAIL_SIZES,
+)
+from .conditional import expire_post
+from .feed_cache import expire_post_feeds
+from .metrics import THUMBNAIL_SECONDS
+from .models import Post
+from .variants import build_variants
+
+logger = logging.getLogger(__name__)
+
+
+def get_queue():
+    return DirectoryQueue(settings.THUMBNAIL_QUEUE_DIR)
+
+
+def schedule(post, created=False):
+    """Сбрасывает устаревшие миниатюры и ставит пост в очередь воркера.
+
+    У нового поста сбрасывать нечего, а без картинки нечего и строить.
+    """
+    if created and not post.image:
+        return
+    if not created:
+        Post.objects.filter(pk=post.pk).update(thumbnails="")
+        post.thumbnails = ""
+        expire_post(post.pk)
+    if post.image:
+        transaction.on_commit(lambda: _put(post))
+
+
+def queued_key(post):
+    return f"thumbnails:queued:{post.pk}:{post.image.name}"
+
+
+def _put(post):
+    get_queue().put({"post_id": post.pk, "image": post.image.name})
+    # Без срока: задача лежит в очереди на диске, пока её не выполнят.
+    cache.set(queued_key(post), True, None)
+
+
+def describe(thumbnail):
+    return {
+        "url": thumbnail.url,
+        "width": thumbnail.width,
+        "height": thumbnail.height,
+    }
+
+
+def card_url(post):
+    """Миниатюра карточки: сохранённая воркером или от sorl сейчас."""
+    stored = post.card_thumbnail
+    if stored:
+        return stored["url"]
+    return get_thumbnail(
+        post.image, CARD_THUMBNAIL, **THUMBNAIL_SIZES[CARD_THUMBNAIL]
+    ).url
+
+
+def build(post_id, image):
+    post = Post.objects.filter(pk=post_id, image=image).first()
+    if post is None:
+        return False
+    started = time.perf_counter()
+    thumbnails = {}
+    for geometry, options in THUMBNAIL_SIZES.items():
+        thumbnails[geometry] = describe(
+            get_thumbnail(post.image, geometry, **options)
+        )
+    thumbnails[IMAGE_VARIANTS] = build_variants(post.image)
+    THUMBNAIL_SECONDS.observe(time.perf_counter() - started)
+    updated = Post.objects.filter(pk=post_id, image=image).update(
+        thumbnails=json.dumps(thumbnails), updated_at=timezone.now()
+    )
+    if updated:
+        expire_post_feeds(post)
+        expire_post(post_id)
+    return bool(updated)
+
+
+def enqueue_missing(posts):
+    """Ставит воркеру посты страницы, у которых ещё нет миниатюр.
+
+    Это посты, появившиеся до фонового воркера: он найдёт их миниатюры
+    sorl через get_thumbnail и сохранит в thumbnails, как у новых, а до
+    тех пор карточка ссылается на card_url(). Отметка в кэше не даёт
+    ставить пост повторно — на страницу уходит один get_many.
+    """
+    missing = {
+        queued_key(post): post
+        for post in posts
+        if post.image and not post.thumbnails
+    }
+    if not missing:
+        return posts
+    for key in missing.keys() - cache.get_many(missing).keys():
+        _put(missing[key])
+    return posts
+
+
+def _start_worker_process():
+    django.setup()
+    connections.close_all()
+
+
+def _build_job(payload):
+    try:
+        return build(payload["post_id"], payload["image"])
+    finally:
+        connections.close_all()
+
+
+def _finish(queue, name, payload, error):
+    if error is None:
+        queue.done(name)
+        return
+    attempts = payload.get("attempts", 0) + 1
+    logger.warning(
+        "Миниатюры поста %s: попытка %s не удалась: %s",
+        payload.get("post_id"),
+        attempts,
+        error,
+    )
+    if attempts >= THUMBNAIL_JOB_ATTEMPTS:
+        queue.fail(name)
+    else:
+        queue.retry(name, {**payload, "attempts": attempts})
+
+
+def drain(queue=None, limit=100):
+    """Обрабатывает задачи в текущем процессе: для тестов и отладки."""
+    queue = queue or get_queue()
+    processed = 0
+    for name, payload in queue.claim(limit):
+        error = None
+        try:
+            build(payload["post_id"], payload["image"])
+        except Exception as exc:
+            error = exc
+        _finish(queue, name, payload, error)
+        processed += 1
+    return processed
+
+
+def run_worker(queue=None, processes=2, poll_interval=1.0, once=False):
+    """Раздаёт задачи из очереди пулу процессов, пока его не остановят."""
+    queue = queue or get_queue()
+    queue.recover()
+    with ProcessPoolExecutor(
+        processes, initializer=_start_worker_process
+    ) as pool:
+        while True:
+            jobs = queue.claim(processes * 2)
+            futures = [
+                (name, payload, pool.submit(_build_job, payload))
+                for name, payload in jobs
+            ]
+            for name, payload, future in futures:
+                _finish(queue, name, payload, future.exception())
+            if once:
+                return len(jobs)
+            if not jobs:
+                time.sleep(poll_interval)
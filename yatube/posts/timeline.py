@@ -0,0 +1,193 @@
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from .constants import (
+    POPULAR_AUTHORS_CACHE_TIMEOUT,
+    TIMELINE_FAN_OUT_LIMIT,
+    TIMELINE_LENGTH,
+)
+from .models import Follow, Post, TimelineEntry, UserCounters
+from .paginators import CursorPaginator, TimelinePaginator
+from .versions import bump, current, version_key
+
+# Сдвигается, когда любой автор становится популярным или перестаёт им быть.
+POPULARITY_VERSION = version_key("popularity", "authors")
+
+
+def following_version(user_id):
+    return version_key("following", user_id)
+
+
+def is_popular(author_id):
+    return UserCounters.objects.filter(
+        user_id=author_id, is_popular=True
+    ).exists()
+
+
+def update_popularity(author_id):
+    """Сверяет флаг is_popular автора с числом подписчиков.
+
+    Флаг, а не сравнение счётчика с порогом, решает, раскладывать ли
+    посты по лентам или читать при запросе: запись и чтение видят одно
+    и то же. Возвращает новое значение флага, если он изменился, иначе
+    None.
+    """
+    counters = (
+        UserCounters.objects.filter(user_id=author_id)
+        .values_list("followers_count", "is_popular")
+        .first()
+    )
+    if counters is None:
+        return None
+    followers_count, was_popular = counters
+    popular = followers_count >= TIMELINE_FAN_OUT_LIMIT
+    if popular == was_popular:
+        return None
+    UserCounters.objects.filter(user_id=author_id).update(is_popular=popular)
+    bump(POPULARITY_VERSION)
+    return popular
+
+
+def popular_author_ids(user):
+    """id популярных авторов среди подписок user.
+
+    Кэшируется до подписки или отписки user и до смены популярности
+    любого автора.
+    """
+    keys = (following_version(user.pk), POPULARITY_VERSION)
+    versions = current(keys)
+    cache_key = "popular_authors:{}:{}:{}".format(
+        user.pk, *(versions[key] for key in keys)
+    )
+    author_ids = cache.get(cache_key)
+    if author_ids is None:
+        author_ids = list(
+            UserCounters.objects.filter(
+                user__following__user=user, is_popular=True
+            ).values_list("user_id", flat=True)
+        )
+        cache.set(cache_key, author_ids, POPULAR_AUTHORS_CACHE_TIMEOUT)
+    return author_ids
+
+
+def trim(user_ids):
+    """Обрезает ленты до TIMELINE_LENGTH записей.
+
+    Сначала одним GROUP BY находит переполненные ленты: после fan_out
+    их единицы, и коррелированный подзапрос идёт только по ним.
+    """
+    overfull = list(
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(total=Count("pk"))
+        .filter(total__gt=TIMELINE_LENGTH)
+        .values_list("user_id", flat=True)
+    )
+    if not overfull:
+        return
+    newest = (
+        TimelineEntry.objects.filter(user_id=OuterRef("user_id"))
+        .order_by("-pub_date", "-post_id")
+        .values("pk")[:TIMELINE_LENGTH]
+    )
+    TimelineEntry.objects.filter(user_id__in=overfull).exclude(
+        pk__in=Subquery(newest)
+    ).delete()
+
+
+def fan_out(post):
+    """Кладёт новый пост в ленты подписчиков автора."""
+    if is_popular(post.author_id):
+        return
+    follower_ids = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in follower_ids
+        ),
+        ignore_conflicts=True,
+    )
+    trim(follower_ids)
+
+
+def backfill(user_id, author_id):
+    if is_popular(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        "pk", "pub_date"
+    )[:TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ),
+        ignore_conflicts=True,
+    )
+    trim([user_id])
+
+
+def rebuild(user_ids):
+    """Собирает ленты пользователей заново: по одному чтению на ленту.
+
+    Дешевле череды backfill(), когда у пользователя сразу много новых
+    подписок или постов, — например, после bulk-импорта.
+    """
+    for user_id in user_ids:
+        authors = Follow.objects.filter(user_id=user_id).exclude(
+            author__counters__is_popular=True
+        )
+        posts = (
+            Post.objects.filter(author_id__in=authors.values("author_id"))
+            .order_by("-pub_date", "-pk")
+            .values_list("pk", "pub_date")[:TIMELINE_LENGTH]
+        )
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        )
+
+
+def backfill_followers(author_id):
+    """Раскладывает посты автора, переставшего быть популярным.
+
+    Пока автор был популярным, его посты не писались в ленты, а новые
+    подписчики не получали backfill; при запросе их больше не подмешивают.
+    """
+    follower_ids = Follow.objects.filter(author_id=author_id).values_list(
+        "user_id", flat=True
+    )
+    for user_id in follower_ids.iterator():
+        backfill(user_id, author_id)
+
+
+def forget(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def feed_source(user):
+    """Лента подписок и пагинатор для неё.
+
+    Обычно это диапазон по материализованным записям TimelineEntry.
+    Посты популярных авторов (is_popular: TIMELINE_FAN_OUT_LIMIT
+    подписчиков и больше) не раскладываются по лентам при записи — если
+    пользователь подписан на таких авторов, их посты подмешиваются в
+    момент запроса.
+    """
+    popular = popular_author_ids(user)
+    if not popular:
+        entries = TimelineEntry.objects.filter(user=user).select_related(
+            "post__author", "post__group"
+        )
+        return entries, TimelinePaginator
+    posts = Post.objects.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values("post_id"))
+        | Q(author_id__in=popular)
+    ).select_related("author", "group")
+    return posts, CursorPaginator
@@ -9,6 +9,20 @@ urlpatterns = [
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
     path("profile/<str:username>/", views.profile, name="profile"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
+    path(
+        "posts/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments",
+    ),
+    path(
+        "posts/<int:post_id>/thumbnail/",
+        views.post_thumbnail,
+        name="post_thumbnail",
+    ),
+    path("search/", views.search, name="search"),
+    path(
+        "fragments/user/", views.user_fragments, name="user_fragments"
+    ),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path(
@@ -0,0 +1,58 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .constants import CARD_THUMBNAIL, VARIANT_FORMATS, VARIANT_WIDTHS
+
+QUALITY: int = 80
+
+
+def supported_formats():
+    """Форматы из VARIANT_FORMATS, которые умеет сохранять этот Pillow."""
+    Image.init()
+    return [
+        (mime, pil_format, extension)
+        for mime, pil_format, extension in VARIANT_FORMATS
+        if pil_format in Image.SAVE
+    ]
+
+
+def _crop_size(width, geometry=CARD_THUMBNAIL):
+    crop_width, crop_height = (int(side) for side in geometry.split("x"))
+    return width, round(width * crop_height / crop_width)
+
+
+def build_variants(image):
+    """Режет картинку поста под карточку в нескольких ширинах и форматах.
+
+    Файлы ложатся рядом с оригиналом: posts/<имя>-<ширина>w.<формат>.
+    Ширины больше исходной не строятся, кроме самой маленькой. Повторная
+    сборка перезаписывает те же имена, а не плодит копии с суффиксами.
+    """
+    with image.open("rb"):
+        source = Image.open(image)
+        source.load()
+    source = ImageOps.exif_transpose(source).convert("RGB")
+    widths = [
+        width for width in VARIANT_WIDTHS if width <= source.width
+    ] or [VARIANT_WIDTHS[0]]
+    directory, filename = os.path.split(image.name)
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    for width in widths:
+        resized = ImageOps.fit(
+            source, _crop_size(width), Image.LANCZOS, centering=(0.5, 0.5)
+        )
+        for mime, pil_format, extension in supported_formats():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, quality=QUALITY)
+            name = os.path.join(directory, f"{stem}-{width}w.{extension}")
+            default_storage.delete(name)
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            variants.setdefault(mime, []).append(
+                {"url": default_storage.url(name), "width": width}
+            )
+    return variants
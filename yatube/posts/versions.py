@@ -0,0 +1,27 @@
+import time
+
+from django.core.cache import cache
+
+
+def version_key(kind, pk):
+    return f"version:{kind}:{pk}"
+
+
+def bump(*keys):
+    """Сдвигает версии: всё, что было закэшировано под старыми, устаревает.
+
+    Версия — момент времени в наносекундах, а не счётчик: если ключ
+    вытеснен из кэша, новое значение всё равно не совпадёт со старым.
+    """
+    now = time.time_ns()
+    cache.set_many({key: now for key in keys}, None)
+
+
+def current(keys):
+    keys = set(keys)
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys - versions.keys()}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
@@ -1,21 +1,56 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_cache_control
 
-from .constants import PAGE_CACHE_INTERVAL, POSTS_PER_PAGE
+from .conditional import conditional, feed_state, post_state
+from .constants import (
+    COMMENT_ORDERINGS,
+    COMMENTS_PER_PAGE,
+    POSTS_PER_PAGE,
+    THUMBNAIL_REDIRECT_MAX_AGE,
+)
+from .feed_cache import cache_feed, group_scope, index_scope, profile_scope
 from .forms import CommentForm, PostForm
+from .metrics import UPLOAD_BYTES
 from .models import Follow, Group, Post, User
+from .paginators import CursorPaginator, comment_page, legacy_page
+from .read_models import PostDetail, comments_of
+from .search import search_posts
+from .shell import NAV_FRAGMENT, PAGE_FRAGMENTS, public_shell
+from .thumbnails import card_url
+from .thumbnails import enqueue_missing as enqueue_missing_thumbnails
+from .timeline import feed_source
 
 
-def create_paginator(request, post_list, posts_per_page):
-    paginator = Paginator(post_list, posts_per_page)
+def create_paginator(
+    request, post_list, posts_per_page, paginator_class=CursorPaginator
+):
     page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    if page_number is not None and "cursor" not in request.GET:
+        page_obj = legacy_page(
+            post_list, posts_per_page, page_number, paginator_class
+        )
+    else:
+        paginator = paginator_class(post_list, posts_per_page)
+        page_obj = paginator.get_page(request.GET.get("cursor"))
+    enqueue_missing_thumbnails(page_obj.object_list)
     return page_obj
 
 
-@cache_page(timeout=PAGE_CACHE_INTERVAL, key_prefix="index_page")
+def comment_order(request):
+    order = request.GET.get("order")
+    if order in COMMENT_ORDERINGS:
+        return order
+    return next(iter(COMMENT_ORDERINGS))
+
+
+@public_shell
+@conditional(feed_state(index_scope))
+@cache_feed(index_scope)
 def index(request):
     post_list = (
         Post.objects.all().select_related("author", "group")
@@ -29,6 +64,9 @@ def index(request):
     return render(request, "posts/index.html", context)
 
 
+@public_shell
+@conditional(feed_state(group_scope))
+@cache_feed(group_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     post_list = group.posts.all().select_related("author")
@@ -41,8 +79,13 @@ def group_posts(request, slug):
     return render(request, "posts/group_list.html", context)
 
 
+@public_shell
+@conditional(feed_state(profile_scope))
+@cache_feed(profile_scope)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related("counters"), username=username
+    )
     post_list = author.posts.all().select_related("group")
     page_obj = create_paginator(request, post_list, POSTS_PER_PAGE)
 
@@ -61,16 +104,119 @@ def profile(request, username):
     return render(request, "posts/profile.html", context)
 
 
+def search(request):
+    query = request.GET.get("q", "").strip()
+    paginator = Paginator(search_posts(query), POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    posts = Post.objects.select_related("author", "group").in_bulk(
+        page_obj.object_list
+    )
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    enqueue_missing_thumbnails(page_obj.object_list)
+    context = {
+        "page_obj": page_obj,
+        "query": query,
+        "to_show_groups": True,
+    }
+    return render(request, "posts/search.html", context)
+
+
+@public_shell
+@conditional(post_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm()
-    comments = post.comments.all().select_related("author")
+    detail = PostDetail.load(post_id, comment_order(request))
+    context = {**detail.context(), "form": CommentForm()}
+    return render(request, "posts/post_detail.html", context)
+
+
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или ?format=json."""
+    post = get_object_or_404(Post.objects.only("pk"), pk=post_id)
+    order = comment_order(request)
+    comments, next_cursor = comment_page(
+        comments_of(post.pk),
+        COMMENT_ORDERINGS[order],
+        request.GET.get("after"),
+        COMMENTS_PER_PAGE,
+    )
+    if request.GET.get("format") == "json":
+        return JsonResponse(
+            {
+                "comments": [
+                    {
+                        "id": comment.pk,
+                        "author": comment.author.username,
+                        "text": comment.text,
+                        "created": comment.created.isoformat(),
+                    }
+                    for comment in comments
+                ],
+                "next": next_cursor,
+            }
+        )
     context = {
         "comments": comments,
-        "form": form,
+        "next_cursor": next_cursor,
+        "order": order,
         "post": post,
     }
-    return render(request, "posts/post_detail.html", context)
+    return render(request, "posts/includes/comment_list.html", context)
+
+
+def post_thumbnail(request, post_id):
+    """Миниатюра карточки поста, до которого ещё не дошёл воркер.
+
+    Карточка ссылается сюда вместо оригинала: картинку уменьшает sorl
+    при первом запросе этого адреса, а не при рендере ленты.
+    """
+    post = get_object_or_404(
+        Post.objects.only("pk", "image", "thumbnails"), pk=post_id
+    )
+    if not post.image:
+        raise Http404
+    response = redirect(card_url(post))
+    patch_cache_control(response, max_age=THUMBNAIL_REDIRECT_MAX_AGE)
+    return response
+
+
+def user_fragments(request):
+    """Персональные части оболочки EDGE_SHELL для страницы ?path=."""
+    try:
+        match = resolve(request.GET.get("path", ""))
+    except Resolver404:
+        raise Http404
+    context = {"view_name": match.view_name}
+    if match.view_name == "posts:profile":
+        author = get_object_or_404(
+            User.objects.only("pk", "username"),
+            username=match.kwargs["username"],
+        )
+        context["author"] = author
+        context["following"] = (
+            request.user.is_authenticated
+            and Follow.objects.filter(
+                user=request.user, author=author
+            ).exists()
+        )
+    elif match.view_name == "posts:post_detail":
+        context["post"] = get_object_or_404(
+            Post.objects.only("pk", "author_id"), pk=match.kwargs["post_id"]
+        )
+        context["form"] = CommentForm()
+    templates = {
+        "nav": NAV_FRAGMENT,
+        **PAGE_FRAGMENTS.get(match.view_name, {}),
+    }
+    response = JsonResponse(
+        {
+            name: render_to_string(template, context, request)
+            for name, template in templates.items()
+        }
+    )
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
@@ -80,6 +226,8 @@ def post_create(request):
         post = form.save(False)
         post.author = request.user
         post.save()
+        if "image" in request.FILES:
+            UPLOAD_BYTES.observe(request.FILES["image"].size)
         return redirect("posts:profile", username=request.user.username)
     return render(request, "posts/create_post.html", {"form": form})
 
@@ -96,6 +244,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if "image" in request.FILES:
+            UPLOAD_BYTES.observe(request.FILES["image"].size)
         return redirect("posts:post_detail", post_id)
     context = {
         "post": post_editable,
@@ -119,12 +269,10 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    user = request.user
-    post_list = (
-        Post.objects.filter(author__following__user=user)
-        .select_related("group", "author")
+    post_list, paginator_class = feed_source(request.user)
+    page_obj = create_paginator(
+        request, post_list, POSTS_PER_PAGE, paginator_class
     )
-    page_obj = create_paginator(request, post_list, POSTS_PER_PAGE)
     context = {"page_obj": page_obj, "to_show_groups": True}
     return render(request, "posts/follow.html", context)
 
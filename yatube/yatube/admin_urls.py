@@ -0,0 +1,12 @@
+"""URL админки.
+
+Модуль подключается в yatube.urls строкой, поэтому импортируется при
+первом разрешении или обращении к /admin/. При SimpleAdminConfig
+(профиль production) здесь же регистрируются модели из admin.py
+приложений.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.urls[0]
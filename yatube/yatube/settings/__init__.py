@@ -0,0 +1,3 @@
+# Профиль по умолчанию — разработка. В бою:
+# DJANGO_SETTINGS_MODULE=yatube.settings.production.
+from .development import *  # noqa: F401,F403
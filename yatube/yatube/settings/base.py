@@ -0,0 +1,213 @@
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Общие настройки. Профили: development (по умолчанию, yatube.settings)
+# и production (DJANGO_SETTINGS_MODULE=yatube.settings.production).
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = '2)+8gna8l$1%8ti$^f_j6u&c9arv))7bengt4$=w-=op=1-d!s'
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.profiling.SamplingProfilerMiddleware',
+    'core.metrics.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            # Скомпилированные шаблоны живут в памяти процесса; при DEBUG
+            # изменённые файлы перечитываются. Проверка синтаксиса всех
+            # шаблонов при выкладке: `manage.py precompile_templates`.
+            'loaders': [
+                (
+                    'core.template_loader.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# Бэкенды core.db.backends.* — стандартные бэкенды Django с пулом
+# соединений (core.db.pool): соединение не закрывается в конце запроса,
+# а возвращается в пул. POOL: MAX_SIZE, TIMEOUT и CHECK_AFTER (через
+# сколько секунд простоя соединение проверяется SELECT 1 перед выдачей).
+DATABASES = {
+    'default': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'YATUBE_DB_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('YATUBE_DB_POOL_SIZE', 10)),
+        },
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Очередь задач для `manage.py run_thumbnail_worker`.
+THUMBNAIL_QUEUE_DIR = os.getenv(
+    'YATUBE_THUMBNAIL_QUEUE', os.path.join(BASE_DIR, 'thumbnail_queue')
+)
+
+# Отложенные задачи записи (ленты подписчиков, поисковый индекс). С путём
+# к SQLite-файлу виды ставят их в таблицу, а выполняет
+# `manage.py run_yatube_worker`; без переменной задачи выполняются сразу.
+TASKS_DB = os.getenv('YATUBE_TASKS_DB', '')
+
+# Сэмплирующий профайлер: каждый N-й запрос процесса, 0 — выключен.
+# Отчёт: `manage.py dump_profiles`.
+PROFILE_SAMPLE_RATE = int(os.getenv('YATUBE_PROFILE_EVERY', 0))
+PROFILE_INTERVAL = 0.005
+PROFILE_DIR = os.getenv('YATUBE_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+# Метрики для /metrics. Без каталога значения живут в памяти процесса;
+# с несколькими воркерами каждый пишет свой mmap-файл в каталог, а
+# /metrics суммирует их. Каталог очищают перед запуском воркеров.
+METRICS_DIR = os.getenv('YATUBE_METRICS_DIR', '')
+
+# Режим для CDN и прокси: публичные страницы отдаются всем одной
+# анонимной оболочкой с Cache-Control: public, а персональные части
+# (меню, подписка, форма комментария) подгружаются с /fragments/user/.
+EDGE_SHELL = os.getenv('YATUBE_EDGE_SHELL', '') == '1'
+EDGE_SHELL_MAX_AGE = int(os.getenv('YATUBE_EDGE_SHELL_MAX_AGE', 60))
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Общий кэш для всех воркеров: redis://host:port/db (Redis или локальный
+# `manage.py run_cache_server`) либо file:///path. Без переменной каждый
+# процесс держит свой LocMemCache.
+CACHE_URL = os.getenv('YATUBE_CACHE_URL', '')
+
+if CACHE_URL.startswith('redis://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.backends.RedisCache',
+            'LOCATION': CACHE_URL,
+            'OPTIONS': {
+                'MAX_CONNECTIONS': int(os.getenv('YATUBE_CACHE_POOL', 50)),
+            },
+        }
+    }
+elif CACHE_URL.startswith('file://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len('file://'):],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
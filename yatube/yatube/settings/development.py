@@ -0,0 +1,17 @@
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+# debug_toolbar инструментирует каждый запрос — только для разработки.
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+# app_directories.Loader подключён внутри core.template_loader.Loader,
+# а debug_toolbar ищет только APP_DIRS.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
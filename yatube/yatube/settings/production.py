@@ -0,0 +1,61 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, INSTALLED_APPS, TEMPLATES
+
+# Профиль для боя: без отладочных приложений и с быстрым стартом
+# воркера — его время до первого ответа меряет benchmarks.startup.
+DEBUG = False
+
+SECRET_KEY = os.environ['YATUBE_SECRET_KEY']
+
+ALLOWED_HOSTS = os.getenv('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Админка не импортирует admin.py приложений при старте: autodiscover
+# выполняется в yatube.admin_urls при первом обращении к /admin/.
+INSTALLED_APPS = [
+    'django.contrib.admin.apps.SimpleAdminConfig'
+    if app == 'django.contrib.admin'
+    else app
+    for app in INSTALLED_APPS
+]
+
+# Без контекст-процессора debug; кэш шаблонов без проверки mtime, так
+# как DEBUG выключен.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+        },
+    },
+]
+
+# Postgres, если задано имя базы, иначе SQLite из base. Соединения
+# берутся из пула и возвращаются в него в конце запроса, поэтому
+# CONN_MAX_AGE по умолчанию 0; значение больше нуля закрепляет
+# соединение за потоком на это время.
+if os.getenv('YATUBE_POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.postgresql',
+            'NAME': os.environ['YATUBE_POSTGRES_DB'],
+            'USER': os.getenv('YATUBE_POSTGRES_USER', ''),
+            'PASSWORD': os.getenv('YATUBE_POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('YATUBE_POSTGRES_HOST', ''),
+            'PORT': os.getenv('YATUBE_POSTGRES_PORT', ''),
+            'POOL': DATABASES['default']['POOL'],
+        },
+    }
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.getenv('YATUBE_CONN_MAX_AGE', 0)),
+    },
+}
@@ -1,10 +1,14 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib import admin
 from django.urls import include, path
 
+from core.metrics.views import metrics
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    # Кортеж (модуль, app_name, namespace) со строкой вместо модуля:
+    # админка импортируется только при обращении к ней.
+    path("admin/", ("yatube.admin_urls", "admin", "admin")),
+    path("metrics", metrics, name="metrics"),
     path("", include("posts.urls", namespace="posts")),
     path("about/", include("about.urls", namespace="about")),
     path("auth/", include("users.urls", namespace="users")),